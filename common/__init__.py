@@ -0,0 +1 @@
+"""Helpers shared by the day-wise agents (import with the repository root on sys.path)."""
@@ -0,0 +1,91 @@
+"""Benchmark: repeated research runs with and without the shared search cache.
+
+A fake search with fixed latency stands in for Tavily. Each run searches a
+topic's questions; topics repeat across runs the way semesters reuse
+reading lists. Also checks TTL expiry and size-based eviction.
+
+Usage: python common/bench_search_cache.py --runs 20 --topics 5 --latency 0.05
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from common.search_cache import SearchCache
+
+
+class FakeSearch:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, query: str):
+        self.calls += 1
+        time.sleep(self.latency)
+        return {"query": query, "results": [{"title": f"{query} {i}", "url": f"https://example.edu/{i}",
+                                             "content": "x" * 500} for i in range(5)]}
+
+
+def run(queries, search, cache):
+    start = time.perf_counter()
+    for query in queries:
+        if cache is None:
+            search(query)
+        else:
+            cache.fetch(query, {"max_results": 5}, lambda: search(query))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--topics", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake search latency (s)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Questions are regenerated per run, so casing and spacing drift between runs
+    queries = []
+    for _ in range(args.runs):
+        topic = rng.integers(0, args.topics)
+        for q in range(args.questions):
+            queries.append(f"{'What' if rng.random() < 0.5 else 'what'}  is topic {topic} question {q}?")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        uncached = FakeSearch(args.latency)
+        uncached_s = run(queries, uncached, None)
+        cached = FakeSearch(args.latency)
+        cache = SearchCache(os.path.join(tmp, "cache.sqlite3"))
+        cached_s = run(queries, cached, cache)
+        print(f"\n{'mode':<10}{'seconds':>10}{'API calls':>11}")
+        print(f"{'uncached':<10}{uncached_s:>10.2f}{uncached.calls:>11}")
+        print(f"{'cached':<10}{cached_s:>10.2f}{cached.calls:>11}")
+        print(cache.report())
+
+        # A second process reading the same file starts warm
+        warm = SearchCache(os.path.join(tmp, "cache.sqlite3"))
+        reread = FakeSearch(args.latency)
+        run(queries, reread, warm)
+        assert reread.calls == 0, "a new process did not reuse the on-disk cache"
+
+        expiring = SearchCache(os.path.join(tmp, "ttl.sqlite3"), ttl_seconds=0)
+        ttl_search = FakeSearch(0)
+        run(queries[:2] * 2, ttl_search, expiring)
+        assert ttl_search.calls == 4 and expiring.expired == 2, "expired entries were served"
+
+        small = SearchCache(os.path.join(tmp, "small.sqlite3"), max_bytes=20_000)
+        run(queries, FakeSearch(0), small)
+        stats = small.stats()
+        assert stats["bytes"] <= 20_000, "eviction did not bound the cache size"
+        print(f"eviction: {stats['evictions']} entries evicted, {stats['entries']} kept in "
+              f"{stats['bytes'] / 1e3:.1f} kB (max 20 kB); TTL expiry ok; new process reads the same file warm")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Bookkeeping shared by the persistent caches and stores in the repository.
+
+The search, embedding, answer and emotion caches all count hits and misses
+the same way, and the SQLite-backed ones look rows up by long ID lists that
+have to be split to fit in one statement.
+"""
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# SQLite builds before 3.32 reject statements with more than 999 bound parameters
+SQLITE_IN_BATCH = 500
+
+# Size-bounded caches evict down to this fraction of their bound, so the writes
+# right after an eviction (and for the embedding cache, a file compaction)
+# don't trigger another one
+EVICT_TO_FRACTION = 0.9
+
+
+def in_batches(values: Sequence, size: int = SQLITE_IN_BATCH) -> Iterator[Tuple[List, str]]:
+    """Split `values` for `... IN (...)` queries; yields each batch with its "?,?,..." placeholders."""
+    for start in range(0, len(values), size):
+        batch = list(values[start:start + size])
+        yield batch, ",".join("?" * len(batch))
+
+
+class HitCounter:
+    """Hit/miss counters for a cache; call reset_hits() from __init__ and merge hit_stats() into stats()."""
+
+    def reset_hits(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def record_lookups(self, lookups: int, hits: int) -> None:
+        self.hits += hits
+        self.misses += lookups - hits
+
+    def hit_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,61 @@
+"""TavilySearch with a transparent persistent result cache.
+
+CachedTavilySearch is a drop-in replacement for `langchain_tavily.TavilySearch`:
+it is still a LangChain tool (so agents can use it), and `invoke`/`ainvoke`
+consult the shared SearchCache before calling the API. Failed searches are
+not cached.
+"""
+from typing import Any, Dict, Optional
+
+from langchain_tavily import TavilySearch
+from pydantic import Field
+
+from common.search_cache import SearchCache
+
+# Instance settings that change what the API returns, so they are part of the cache key
+RESULT_PARAMS = ("max_results", "topic", "include_domains", "exclude_domains", "search_depth", "include_images",
+                 "time_range", "include_answer", "include_raw_content", "include_image_descriptions", "country",
+                 "include_favicon", "auto_parameters", "exact_match")
+
+_shared_cache: Optional[SearchCache] = None
+
+
+def shared_search_cache() -> SearchCache:
+    """The process-wide cache at the default path (or $SEARCH_CACHE_PATH)."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SearchCache()
+    return _shared_cache
+
+
+def _cacheable(result: Any) -> bool:
+    return isinstance(result, dict) and "error" not in result
+
+
+class CachedTavilySearch(TavilySearch):  # type: ignore[override]
+    search_cache: SearchCache = Field(default_factory=shared_search_cache, exclude=True)
+
+    def _cache_params(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Parameters the search effectively runs with.
+
+        Call arguments equal to their schema default are dropped, so
+        `invoke("q")` and `invoke({"query": "q"})` share an entry, and set
+        instance settings win over call arguments, as in TavilySearch._run.
+        """
+        fields = self.args_schema.model_fields
+        params = {name: value for name, value in kwargs.items()
+                  if value is not None and not (name in fields and value == fields[name].default)}
+        params.update({name: getattr(self, name) for name in RESULT_PARAMS if getattr(self, name, None)})
+        return params
+
+    def _run(self, query: str, run_manager=None, **kwargs: Any) -> Dict[str, Any]:
+        return self.search_cache.fetch(
+            query, self._cache_params(kwargs),
+            lambda: super(CachedTavilySearch, self)._run(query, run_manager=run_manager, **kwargs),
+            cacheable=_cacheable)
+
+    async def _arun(self, query: str, run_manager=None, **kwargs: Any) -> Dict[str, Any]:
+        return await self.search_cache.afetch(
+            query, self._cache_params(kwargs),
+            lambda: super(CachedTavilySearch, self)._arun(query, run_manager=run_manager, **kwargs),
+            cacheable=_cacheable)
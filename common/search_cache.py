@@ -0,0 +1,137 @@
+"""Persistent search-result cache shared by the research agents.
+
+Results are stored in SQLite, keyed by sha256 of the normalized query plus
+the tool parameters that change the results (result count, domains, search
+depth, ...). Entries older than `ttl_seconds` are refetched, and when the
+stored payloads grow past `max_bytes` the least recently used ones are
+evicted. One file is shared by every agent in the repository, so a topic
+researched by one of them is free for the others.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from common.cache_utils import EVICT_TO_FRACTION, HitCounter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATH = os.path.join(REPO_ROOT, ".search_cache", "search_cache.sqlite3")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 256 << 20  # 256 MiB of stored results
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share an entry."""
+    return re.sub(r"\s+", " ", query.lower()).strip()
+
+
+def cache_key(query: str, params: Optional[Dict[str, Any]] = None) -> str:
+    payload = json.dumps([normalize_query(query), params or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchCache(HitCounter):
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path or os.getenv("SEARCH_CACHE_PATH") or DEFAULT_PATH
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # timeout: several agents may share the file at once
+        self.db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, query TEXT, params TEXT, "
+                        "payload TEXT, size INTEGER, created REAL, last_used REAL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self.db.commit()
+        self.reset_hits()
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        key = cache_key(query, params)
+        with self._lock:
+            row = self.db.execute("SELECT payload, created FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None and time.time() - row[1] > self.ttl_seconds:
+                self.db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self.db.commit()
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, query: str, params: Optional[Dict[str, Any]], result: Any) -> None:
+        payload = json.dumps(result, default=str)
+        now = time.time()
+        with self._lock:
+            self.db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (cache_key(query, params), normalize_query(query),
+                             json.dumps(params or {}, sort_keys=True, default=str),
+                             payload, len(payload), now, now))
+            self.db.commit()
+            if self._stored_bytes() > self.max_bytes:
+                self._evict()
+
+    def _stored_bytes(self) -> int:
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache is under EVICT_TO_FRACTION of max_bytes."""
+        excess = self._stored_bytes() - int(self.max_bytes * EVICT_TO_FRACTION)
+        dropped = []
+        for key, size in self.db.execute("SELECT key, size FROM results ORDER BY last_used"):
+            if excess <= 0:
+                break
+            dropped.append((key,))
+            excess -= size
+        self.db.executemany("DELETE FROM results WHERE key = ?", dropped)
+        self.db.commit()
+        self.evictions += len(dropped)
+
+    def fetch(self, query: str, params: Optional[Dict[str, Any]], search: Callable[[], Any],
+              cacheable: Callable[[Any], bool] = lambda result: True) -> Any:
+        """Return the cached result, or run `search` and cache what it returns."""
+        cached = self.get(query, params)
+        if cached is not None:
+            return cached
+        result = search()
+        if cacheable(result):
+            self.put(query, params, result)
+        return result
+
+    async def afetch(self, query: str, params: Optional[Dict[str, Any]], search: Callable[[], Awaitable[Any]],
+                     cacheable: Callable[[Any], bool] = lambda result: True) -> Any:
+        cached = self.get(query, params)
+        if cached is not None:
+            return cached
+        result = await search()
+        if cacheable(result):
+            self.put(query, params, result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, stored = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {
+            **self.hit_stats(),
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": stored,
+        }
+
+    def report(self) -> str:
+        stats = self.stats()
+        return (f"Search cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.0%} hit rate, {stats['hits']} API calls saved), "
+                f"{stats['entries']} entries, {stats['bytes'] / 1e6:.1f} MB")
@@ -0,0 +1,122 @@
+"""Product x aspect x sentiment aggregates maintained during ingest.
+
+Every stored review contributes one row per matched aspect to a SQLite
+table, and a second table keeps the running count per (product, aspect,
+sentiment) cell, updated in the same transaction. Count and ratio questions
+("how many iPhone 14 reviews complain about the battery?") can then be
+answered from the counts, with a few representative review IDs, without
+retrieval or an LLM call.
+"""
+import os
+import re
+import sqlite3
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# Shared helpers live in <repo>/common
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.cache_utils import in_batches
+
+DEFAULT_EXAMPLES = 3  # Representative review IDs returned per sentiment
+
+# Only explicit count/ratio phrasings: bare "share", "count" or "%" also occur in ordinary
+# questions ("Can you share...", "Is it 100% worth it?"), and "how many" only counts reviews
+# when reviews or their authors follow (a product name may come between), not "how many hours"
+_NOT_A_VERB = r"(?!(do|does|did|is|are|was|were|can|could|will|would|should|has|have|had)\b)"
+AGGREGATE_QUESTION_RE = re.compile(
+    rf"\b(how many ({_NOT_A_VERB}\S+ ){{0,3}}(reviews|reviewers|owners|customers|people)"
+    r"|number of (\S+ ){0,3}reviews|what percent(age)? of|(ratio|share|proportion) of)\b",
+    re.IGNORECASE)
+
+
+def is_aggregate_question(question: str) -> bool:
+    """True for count/ratio style questions the aggregate table can answer."""
+    return AGGREGATE_QUESTION_RE.search(question) is not None
+
+
+def review_facts(metadata: Dict) -> List[Tuple[str, str, str]]:
+    """(product, aspect, sentiment) cells a stored review counts towards."""
+    aspects = [a for a in str(metadata.get("aspects_str", "")).split(",") if a]
+    sentiment = str(metadata.get("sentiment", "unknown")).lower()
+    return [(metadata["product"], aspect, sentiment) for aspect in dict.fromkeys(aspects)]
+
+
+class AspectAggregates:
+    def __init__(self, path: str = ":memory:"):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS review_aspects "
+                        "(id TEXT, product TEXT, aspect TEXT, sentiment TEXT, PRIMARY KEY (id, aspect))")
+        self.db.execute("CREATE INDEX IF NOT EXISTS review_aspects_cell "
+                        "ON review_aspects (product, aspect, sentiment)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS counts "
+                        "(product TEXT, aspect TEXT, sentiment TEXT, n INTEGER, "
+                        "PRIMARY KEY (product, aspect, sentiment))")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+
+    @property
+    def complete(self) -> bool:
+        """Whether the table covers every stored review (False for a store that predates it)."""
+        return self.db.execute("SELECT 1 FROM meta WHERE name = 'complete'").fetchone() is not None
+
+    def mark_complete(self) -> None:
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('complete', '1')")
+
+    def _remove(self, ids: List[str]) -> None:
+        for batch, placeholders in in_batches(ids):
+            old = self.db.execute(
+                f"SELECT product, aspect, sentiment, COUNT(*) FROM review_aspects WHERE id IN ({placeholders}) "
+                "GROUP BY product, aspect, sentiment", batch).fetchall()
+            self.db.executemany("UPDATE counts SET n = n - ? WHERE product = ? AND aspect = ? AND sentiment = ?",
+                                [(n, product, aspect, sentiment) for product, aspect, sentiment, n in old])
+            self.db.execute(f"DELETE FROM review_aspects WHERE id IN ({placeholders})", batch)
+        self.db.execute("DELETE FROM counts WHERE n <= 0")
+
+    def add(self, ids: List[str], metadatas: List[Dict]) -> None:
+        """Count reviews; an ID that is already counted is replaced."""
+        rows = [(doc_id, *fact) for doc_id, metadata in zip(ids, metadatas) for fact in review_facts(metadata)]
+        deltas: Dict[Tuple[str, str, str], int] = {}
+        for _, product, aspect, sentiment in rows:
+            deltas[(product, aspect, sentiment)] = deltas.get((product, aspect, sentiment), 0) + 1
+        with self.db:
+            self._remove(list(ids))
+            self.db.executemany("INSERT INTO review_aspects VALUES (?, ?, ?, ?)", rows)
+            self.db.executemany(
+                "INSERT INTO counts VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (product, aspect, sentiment) DO UPDATE SET n = n + excluded.n",
+                [(*cell, n) for cell, n in deltas.items()])
+
+    def remove(self, ids: List[str]) -> None:
+        with self.db:
+            self._remove(list(ids))
+
+    def sentiment_counts(self, products: List[str], aspect: str) -> Dict[str, int]:
+        """Review counts per sentiment for an aspect across the given products."""
+        if not products:
+            return {}
+        placeholders = ",".join("?" * len(products))
+        return dict(self.db.execute(
+            f"SELECT sentiment, SUM(n) FROM counts WHERE aspect = ? AND product IN ({placeholders}) "
+            "GROUP BY sentiment ORDER BY SUM(n) DESC", [aspect.lower(), *products]))
+
+    def examples(self, products: List[str], aspect: str, sentiment: str,
+                 limit: int = DEFAULT_EXAMPLES) -> List[str]:
+        """Representative review IDs for one cell."""
+        placeholders = ",".join("?" * len(products))
+        return [doc_id for (doc_id,) in self.db.execute(
+            f"SELECT id FROM review_aspects WHERE aspect = ? AND sentiment = ? AND product IN ({placeholders}) "
+            "LIMIT ?", [aspect.lower(), sentiment, *products, limit])]
+
+    def summary(self, products: List[str], aspect: str) -> Optional[str]:
+        """One-paragraph count/ratio answer, or None when nothing is counted."""
+        counts = self.sentiment_counts(products, aspect)
+        total = sum(counts.values())
+        if not total:
+            return None
+        breakdown = ", ".join(f"{n} {sentiment} ({n / total:.0%})" for sentiment, n in counts.items())
+        if len(products) == 1:
+            scope = products[0]
+        else:
+            names = ", ".join(products[:5]) + (", ..." if len(products) > 5 else "")
+            scope = f"{len(products)} products ({names})"
+        return f"{total} stored reviews of {scope} mention {aspect.lower()}: {breakdown}."
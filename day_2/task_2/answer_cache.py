@@ -0,0 +1,76 @@
+"""In-process answer cache for the review RAG.
+
+Answers are keyed by the normalized question plus the IDs and content of the
+chunks retrieved for it. Because the key is built after retrieval, a change
+in the stored reviews changes what is retrieved and therefore the key, so
+stale answers are never served; they simply age out through TTL/LRU.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+# Shared helpers live in <repo>/common
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.cache_utils import HitCounter
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 3600
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", question.lower()).strip().rstrip("?!. ")
+
+
+class AnswerCache(HitCounter):
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_hits()
+        self.expired = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(question: str, ids: List[str], docs: List[str], metas: List[Dict]) -> str:
+        # Content is hashed alongside the IDs because positional IDs
+        # ("file.csv_3") can point at different reviews after a rebuild
+        payload = json.dumps([normalize_question(question), ids, docs, metas], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, answer: str) -> None:
+        with self._lock:
+            self._entries[key] = (answer, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        return {
+            **self.hit_stats(),
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+        }
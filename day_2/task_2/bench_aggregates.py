@@ -0,0 +1,95 @@
+"""Benchmark: count/ratio questions from the aspect aggregates vs. retrieval + LLM.
+
+Gemini is replaced with a fake model that takes --llm-seconds per answer.
+The aggregate counts are checked against a pandas group-by of the stored
+chunks, and the cost of maintaining them during ingest is reported.
+
+Usage: python bench_aggregates.py --rows 20000 --questions 30 --llm-seconds 1.0
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+import pandas as pd
+
+from aggregates import AspectAggregates, is_aggregate_question, review_facts
+from main import RAGAmazonReviews
+from synthetic import FakeStreamingModel, HashingEmbeddingFunction, write_reviews_csv
+
+ASPECTS = ["battery", "camera", "screen", "performance", "price", "design"]
+TEMPLATES = ["How many {product} reviews mention the {aspect}?",
+             "What percentage of {product} owners are happy with the {aspect}?",
+             "What is the ratio of positive to negative {aspect} reviews for {product}?"]
+# Mention "share", "count", "%" or "how many" without asking for a review count; these must take the RAG path
+NOT_AGGREGATE = ["Can you share the main {aspect} issues of the {product}?",
+                 "Does the {aspect} of the {product} count as good?",
+                 "Is the {product} 100% worth it for the {aspect}?",
+                 "How many hours does the {aspect} of the {product} last?",
+                 "How many GB of storage does the {product} have for its {aspect}?",
+                 "How many mAh is the {product} {aspect}?",
+                 "How many hours do people get from the {product} {aspect}?"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--questions", type=int, default=30)
+    parser.add_argument("--llm-seconds", type=float, default=1.0, help="fake model latency per answer")
+    args = parser.parse_args()
+
+    rag = RAGAmazonReviews(embedding_function=HashingEmbeddingFunction(), answer_cache_size=0)
+    rag.model = FakeStreamingModel(n_tokens=1, first_token_delay=args.llm_seconds, token_interval=0)
+    with tempfile.TemporaryDirectory() as data_dir:
+        csv_path = write_reviews_csv(os.path.join(data_dir, "reviews.csv"), args.rows)
+        rag.add_reviews(data_dir, ASPECTS, columnar=True)
+        chunks = rag.chunk_reviews(csv_path, ASPECTS, columnar=True)
+
+    # Maintenance cost: the same chunks counted into a fresh table
+    start = time.perf_counter()
+    AspectAggregates().add([str(i) for i in range(len(chunks))], [chunk["metadata"] for chunk in chunks])
+    maintain_s = time.perf_counter() - start
+
+    facts = pd.DataFrame([fact for chunk in chunks for fact in review_facts(chunk["metadata"])],
+                         columns=["product", "aspect", "sentiment"])
+    expected = facts.value_counts().to_dict()
+    stored = {(p, a, s): n for p, a, s, n in rag.aggregates.db.execute("SELECT * FROM counts")}
+    assert stored == expected, "aggregate counts differ from a group-by of the stored chunks"
+
+    products = sorted(facts["product"].unique())
+    for template in TEMPLATES + ["What is the number of {product} reviews about the {aspect}?",
+                                 "What share of {product} reviews praise the {aspect}?",
+                                 "How many {product} owners complain about the {aspect}?",
+                                 "How many people liked the {aspect}?"]:
+        assert is_aggregate_question(template.format(product=products[0], aspect=ASPECTS[0])), template
+    for template in NOT_AGGREGATE:
+        question = template.format(product=products[0], aspect=ASPECTS[0])
+        assert rag._aggregate_answer(question, products[0], ASPECTS[0]) is None, question
+    cases = [(TEMPLATES[i % len(TEMPLATES)], products[i % len(products)], ASPECTS[i % len(ASPECTS)])
+             for i in range(args.questions)]
+    fast, slow = [], []
+    for template, product, aspect in cases:
+        question = template.format(product=product, aspect=aspect)
+        start = time.perf_counter()
+        rag.query(question, product, aspect)
+        fast.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        ids, docs, metas = rag._retrieve(question, product, aspect, 5)
+        if docs:
+            rag._generate_answer(question, ids, docs, metas)
+        slow.append(time.perf_counter() - start)
+
+    print(f"\n{len(chunks)} chunks, {len(stored)} product x aspect x sentiment cells "
+          f"(counts match a pandas group-by)")
+    print(f"{'path':<22}{'p50 ms':>10}{'llm calls':>11}")
+    print(f"{'aggregates':<22}{statistics.median(fast) * 1000:>10.2f}{0:>11}")
+    print(f"{'retrieval + LLM':<22}{statistics.median(slow) * 1000:>10.2f}{rag.model.calls:>11}")
+    print(f"maintaining the table during ingest: {maintain_s:.2f}s "
+          f"({len(chunks) / max(maintain_s, 1e-9):,.0f} reviews/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark: post-filtering vs. where-clause filtering at high selectivity.
+
+The legacy query over-fetched n_results * 2 and filtered product/aspect in
+Python; the filtered query pushes both into Chroma's where clause. For a
+product that owns a small share of the collection, this prints latency and
+how many of the requested n_results each approach actually returns.
+
+Usage: python bench_filtered_query.py --products 200 --rows-per-product 250
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+from main import RAGAmazonReviews
+from synthetic import HashingEmbeddingFunction, make_reviews
+
+ASPECTS = ["battery", "camera", "screen", "performance", "price", "design"]
+QUESTIONS = ["Is it worth the price?", "How long does the battery last?", "Any issues with the screen?"]
+
+
+def legacy_query(rag, query_str, product, aspect, n_results):
+    results = rag.collection.query(query_texts=[query_str], n_results=n_results * 2)
+    unique_results = {}
+    for doc, meta in zip(results['documents'][0], results['metadatas'][0]):
+        meta_aspects = meta.get('aspects_str', '').lower().split(',')
+        if doc not in unique_results and product.lower() in meta['product'] and aspect.lower() in meta_aspects:
+            unique_results[doc] = meta
+    return list(unique_results)
+
+
+def filtered_query(rag, query_str, product, aspect, n_results):
+    results = rag.collection.query(query_texts=[query_str], n_results=n_results,
+                                   where=rag._metadata_filter(product, aspect))
+    return results['documents'][0]
+
+
+def measure(fn, rag, cases, n_results):
+    latencies, returned = [], []
+    for query_str, product, aspect in cases:
+        start = time.perf_counter()
+        docs = fn(rag, query_str, product, aspect, n_results)
+        latencies.append((time.perf_counter() - start) * 1000)
+        returned.append(len(docs))
+    return statistics.median(latencies), statistics.mean(returned)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--rows-per-product", type=int, default=250)
+    parser.add_argument("--n-results", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    rag = RAGAmazonReviews(embedding_function=HashingEmbeddingFunction())
+    with tempfile.TemporaryDirectory() as data_dir:
+        for i in range(args.products):
+            df = make_reviews(args.rows_per_product, seed=i, duplicate_rate=0.0)
+            df["product"] = f"Phone Model {i:04d}"
+            df.to_csv(os.path.join(data_dir, f"product_{i:04d}.csv"), index=False)
+        rag.add_reviews(data_dir, ASPECTS, columnar=True)
+
+    cases = [(f"phone model {i % args.products:04d} {ASPECTS[i % len(ASPECTS)]} {QUESTIONS[i % len(QUESTIONS)]}",
+              f"Phone Model {i % args.products:04d}", ASPECTS[i % len(ASPECTS)])
+             for i in range(args.queries)]
+    total = rag.collection.count()
+    print(f"\n{total} chunks, each product holds ~{100 / args.products:.2f}% of them")
+    print(f"{'mode':<10}{'p50 ms':>10}{'avg returned':>16}  (requested {args.n_results})")
+    for name, fn in [("legacy", legacy_query), ("filtered", filtered_query)]:
+        p50, returned = measure(fn, rag, cases, args.n_results)
+        print(f"{name:<10}{p50:>10.2f}{returned:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark: multi-file ingest throughput vs. number of worker processes.
+
+Reviews go into a real in-memory Chroma collection and are embedded with the
+app's SentenceTransformer model (all-MiniLM-L6-v2), so the numbers include
+the embedding cost the worker processes take off the writer; --hashing swaps
+in the cheap offline embedding function. workers=0 is the serial columnar
+path, where the writer embeds everything itself.
+
+Usage: python bench_parallel_ingest.py --files 16 --rows 5000 --workers 0 1 2 4 8
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+from main import RAGAmazonReviews
+from synthetic import HashingEmbeddingFunction, write_reviews_csv
+
+ASPECTS = ["battery", "camera", "screen", "performance", "price", "design"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=5_000, help="rows per file")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--batch-size", type=int, default=1000, help="chunks per embedded batch")
+    parser.add_argument("--hashing", action="store_true", help="offline hashing embeddings instead of the model")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for i in range(args.files):
+            write_reviews_csv(os.path.join(data_dir, f"product_{i:04d}.csv"), args.rows, seed=i)
+
+        results = []
+        for workers in args.workers:
+            rag = RAGAmazonReviews(embedding_function=HashingEmbeddingFunction() if args.hashing else None)
+            start = time.perf_counter()
+            rag.add_reviews(data_dir, ASPECTS, columnar=True, workers=workers, batch_size=args.batch_size)
+            results.append((workers, time.perf_counter() - start, rag.collection.count()))
+            rag.client.delete_collection("amazon_reviews")  # In-memory clients share one store per process
+
+    assert len({count for _, _, count in results}) == 1, "worker counts stored different numbers of reviews"
+    total_rows = args.files * args.rows
+    baseline = results[0][1]
+    print(f"\n{'workers':>8}{'seconds':>10}{'rows/sec':>14}{'speedup':>10}")
+    for workers, seconds, _ in results:
+        print(f"{workers:>8}{seconds:>10.2f}{total_rows / seconds:>14,.0f}{baseline / seconds:>9.1f}x")
+    children_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    print(f"{results[0][2]} reviews stored per run; peak worker RSS {children_mb:.0f} MB "
+          f"with {args.batch_size}-chunk batches")
+
+
+if __name__ == "__main__":
+    main()
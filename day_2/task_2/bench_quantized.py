@@ -0,0 +1,144 @@
+"""Benchmark: recall@k and memory of the int8 store vs. Chroma's float index.
+
+Ground truth is an exact float32 scan under the same product/aspect filter;
+hits tied with the k-th true distance count as correct, since the hashing
+embeddings give many reviews identical vectors.
+Memory is the resident vector data: float32 vectors for Chroma (its HNSW
+graph comes on top) and the int8 codes plus per-row columns for the
+quantized store, whose float copy stays on disk for re-ranking. Finally a
+persistent store gets --nights rounds of upserts, as nightly incremental
+ingest does; compaction must keep its rows and float file bounded, and its
+results (also after reopening) must not change.
+
+Usage: python bench_quantized.py --rows 20000 --k 10 --dim 384 --rerank 8 [--embedding minilm]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+import numpy as np
+
+from main import RAGAmazonReviews
+from quantized_store import DEFAULT_RERANK_FACTOR, QuantizedReviewStore
+from synthetic import HashingEmbeddingFunction, make_reviews
+
+ASPECTS = ["battery", "camera", "screen", "performance", "price", "design"]
+QUESTIONS = ["How long does the battery last?", "Is the camera good at night?", "Is the screen bright?",
+             "Does it lag?", "Is it worth the money?", "Does it feel premium?"]
+
+
+def recall(found, distance_of, kth_distance, k):
+    """Share of the k slots holding a true top-k hit; ties with the k-th distance count."""
+    expected = min(k, len(distance_of))
+    hits = sum(distance_of.get(doc_id, np.inf) <= kth_distance + 1e-5 for doc_id in found)
+    return min(hits, expected) / expected if expected else 1.0
+
+
+def check_nightly_upserts(path, everything, embedding_function, nights, queries):
+    """Upsert a fifth of the reviews per night; rows, file size and results must stay put."""
+    ids, documents, metadatas = everything["ids"], everything["documents"], everything["metadatas"]
+    store = QuantizedReviewStore(path, embedding_function)
+    store.add(ids=ids, documents=documents, metadatas=metadatas)
+    # Hashing embeddings give repeated texts identical vectors, so compare distances, not tie order
+    before = [store.query(query_texts=[q], n_results=10)["distances"][0] for q in queries]
+    rng = np.random.default_rng(1)
+    peak_rows = peak_bytes = 0
+    for _ in range(nights):
+        picked = rng.choice(len(ids), len(ids) // 5, replace=False)
+        store.upsert(ids=[ids[i] for i in picked], documents=[documents[i] for i in picked],
+                     metadatas=[metadatas[i] for i in picked])
+        peak_rows = max(peak_rows, store._rows)
+        peak_bytes = max(peak_bytes, os.path.getsize(store.vectors_path))
+    assert peak_rows <= len(ids) / (1 - 0.25) + len(ids) // 5, "dead rows are not compacted"
+    reopened = QuantizedReviewStore(path, embedding_function)
+    for store_ in (store, reopened):
+        after = [store_.query(query_texts=[q], n_results=10)["distances"][0] for q in queries]
+        assert np.allclose(after, before, atol=1e-5), "results changed after upserts and compaction"
+    return peak_rows, peak_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=384, help="hashing embedding size (MiniLM uses 384)")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--rerank", type=int, default=DEFAULT_RERANK_FACTOR,
+                        help="int8 candidates per result re-ranked with float vectors")
+    parser.add_argument("--embedding", choices=["hashing", "minilm"], default="hashing",
+                        help="minilm needs sentence-transformers and downloads the model")
+    parser.add_argument("--nights", type=int, default=10, help="rounds of incremental upserts")
+    args = parser.parse_args()
+
+    embedding_function = HashingEmbeddingFunction(args.dim) if args.embedding == "hashing" else None
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, "data")
+        os.makedirs(data_dir)
+        make_reviews(args.rows, duplicate_rate=0.0).to_csv(os.path.join(data_dir, "reviews.csv"), index=False)
+        stores = {}
+        for name, quantized in (("float", False), ("int8", True)):
+            rag = RAGAmazonReviews(embedding_function=embedding_function, quantized=quantized)
+            start = time.perf_counter()
+            rag.add_reviews(data_dir, ASPECTS, columnar=True)
+            stores[name] = (rag, time.perf_counter() - start)
+
+        # Exact float32 ground truth over everything that was stored
+        everything = stores["float"][0].collection.get(include=["documents", "metadatas"])
+        vectors = np.asarray(stores["float"][0].embedding_function(everything["documents"]), dtype=np.float32)
+        ids = np.array(everything["ids"])
+        products = np.array([m["product"] for m in everything["metadatas"]])
+        aspect_sets = [set(m["aspects_str"].split(",")) for m in everything["metadatas"]]
+
+        rng = np.random.default_rng(0)
+        cases = []
+        for _ in range(args.queries):
+            product = products[rng.integers(0, len(products))]
+            aspect = ASPECTS[rng.integers(0, len(ASPECTS))]
+            cases.append((QUESTIONS[ASPECTS.index(aspect)], product, aspect))
+
+        rows = []
+        # rerank=1 keeps only the int8 ranking, to show what the float re-rank buys
+        configs = [("float", None), ("int8", args.rerank), ("int8 r=1", 1)]
+        for name, rerank in configs:
+            rag, ingest_s = stores[name.split()[0]]
+            if rerank is not None:
+                rag.collection.rerank_factor = rerank
+            recalls, latencies = [], []
+            for question, product, aspect in cases:
+                query_str = f"{product} {aspect} {question}"
+                where = rag._metadata_filter(product, aspect)
+                if where is None:
+                    continue
+                # Product names match by substring, so the filter may cover several models
+                in_products = np.isin(products, rag._resolve_products(product))
+                allowed = np.flatnonzero(in_products & np.array([aspect in a for a in aspect_sets]))
+                query = np.asarray(rag.embedding_function([query_str])[0], dtype=np.float32)
+                distances = ((vectors[allowed] - query) ** 2).sum(axis=1)
+                distance_of = dict(zip(ids[allowed].tolist(), distances.tolist()))
+                kth_distance = np.sort(distances)[min(args.k, len(distances)) - 1] if len(distances) else 0.0
+                start = time.perf_counter()
+                found = rag.collection.query(query_texts=[query_str], n_results=args.k, where=where)["ids"][0]
+                latencies.append(time.perf_counter() - start)
+                recalls.append(recall(found, distance_of, kth_distance, args.k))
+            resident = len(ids) * vectors.shape[1] * 4 if rerank is None else rag.collection.nbytes()
+            rows.append((name, ingest_s, statistics.median(latencies) * 1000, statistics.mean(recalls), resident))
+
+        peak_rows, peak_bytes = check_nightly_upserts(os.path.join(tmp, "nightly"), everything,
+                                                      stores["int8"][0].embedding_function, args.nights,
+                                                      [f"{product} {question}" for question, product, _ in cases])
+
+    print(f"\n{len(ids)} vectors of dim {vectors.shape[1]}")
+    print(f"{'store':<10}{'ingest s':>10}{'p50 ms':>10}{f'recall@{args.k}':>12}{'vector MB':>12}")
+    for name, ingest_s, p50, mean_recall, resident in rows:
+        print(f"{name:<10}{ingest_s:>10.2f}{p50:>10.2f}{mean_recall:>12.3f}{resident / 1e6:>12.2f}")
+    print(f"memory: {rows[0][4] / rows[1][4]:.1f}x smaller with int8")
+    print(f"{args.nights} nights of upserting {len(ids) // 5} reviews: at most {peak_rows} rows "
+          f"({peak_bytes / 1e6:.1f} MB float file) for {len(ids)} reviews, same results after compaction")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark: CLI startup time (`--help`) and warm start of the review RAG.
+
+The warm start builds RAGAmazonReviews on a persisted store and runs the
+incremental ingest over unchanged files, i.e. everything main() does before
+the first prompt. Each measurement is a fresh interpreter, and the median
+must stay under its budget.
+
+Usage: python bench_startup.py --runs 5 --help-budget 1.0 --ready-budget 2.0
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ASPECTS = ["battery", "camera", "screen", "performance", "price", "design"]
+
+PRIME = """
+import os
+os.environ["TQDM_DISABLE"] = "1"
+from main import RAGAmazonReviews
+from synthetic import HashingEmbeddingFunction, write_reviews_csv
+write_reviews_csv(os.path.join({data!r}, "reviews.csv"), {rows})
+rag = RAGAmazonReviews(persist_dir={store!r}, embedding_function=HashingEmbeddingFunction())
+rag.add_reviews({data!r}, {aspects!r}, incremental=True)
+"""
+
+WARM_START = """
+import sys
+from main import RAGAmazonReviews
+rag = RAGAmazonReviews(persist_dir={store!r})
+rag.add_reviews({data!r}, {aspects!r}, incremental=True)
+heavy = [m for m in ("chromadb", "google.generativeai", "sentence_transformers") if m in sys.modules]
+assert not heavy, f"warm start imported {{heavy}}"
+"""
+
+
+def run(args, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=BASE_DIR, check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--help-budget", type=float, default=1.0, help="max median seconds for main.py --help")
+    parser.add_argument("--ready-budget", type=float, default=2.0, help="max median seconds for a warm start")
+    args = parser.parse_args()
+
+    help_s = run(["main.py", "--help"], args.runs)
+    with tempfile.TemporaryDirectory() as tmp:
+        data, store = os.path.join(tmp, "data"), os.path.join(tmp, "store")
+        os.makedirs(data)
+        fill = {"data": data, "store": store, "aspects": ASPECTS, "rows": args.rows}
+        subprocess.run([sys.executable, "-c", PRIME.format(**fill)], cwd=BASE_DIR, check=True, capture_output=True)
+        ready_s = run(["-c", WARM_START.format(**fill)], args.runs)
+    baseline_s = run(["-c", "import chromadb, google.generativeai, pandas, tqdm"], args.runs)
+
+    print(f"\n{'phase':<28}{'median s':>10}{'budget s':>10}")
+    print(f"{'main.py --help':<28}{help_s:>10.2f}{args.help_budget:>10.2f}")
+    print(f"{'warm start to first prompt':<28}{ready_s:>10.2f}{args.ready_budget:>10.2f}")
+    print(f"{'eager imports alone':<28}{baseline_s:>10.2f}{'':>10}")
+    assert help_s <= args.help_budget, f"--help took {help_s:.2f}s (budget {args.help_budget}s)"
+    assert ready_s <= args.ready_budget, f"warm start took {ready_s:.2f}s (budget {args.ready_budget}s)"
+
+
+if __name__ == "__main__":
+    main()
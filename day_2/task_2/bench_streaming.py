@@ -0,0 +1,75 @@
+"""Benchmark: time to first token for query_stream vs. the blocking query.
+
+Gemini is replaced with a fake model that emits tokens on a timer, so the
+numbers show how much sooner a reader sees the start of the answer.
+
+Usage: python bench_streaming.py --queries 5 --tokens 200 --first-token 0.5 --interval 0.02
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+from main import RAGAmazonReviews
+from synthetic import FakeStreamingModel, HashingEmbeddingFunction, write_reviews_csv
+
+ASPECTS = ["battery", "camera", "screen", "performance", "price", "design"]
+QUESTIONS = [
+    ("How long does the battery last?", "iPhone", "battery"),
+    ("Is the camera good in low light?", "Samsung Galaxy", "camera"),
+    ("Does the screen look good outdoors?", "OnePlus", "screen"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--first-token", type=float, default=0.5, help="fake model delay before the first token (s)")
+    parser.add_argument("--interval", type=float, default=0.02, help="fake model delay between tokens (s)")
+    args = parser.parse_args()
+
+    # The answer cache is off so every query pays for generation
+    rag = RAGAmazonReviews(embedding_function=HashingEmbeddingFunction(), answer_cache_size=0)
+    rag.model = FakeStreamingModel(args.tokens, args.first_token, args.interval)
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_reviews_csv(os.path.join(data_dir, "reviews.csv"), args.rows)
+        rag.add_reviews(data_dir, ASPECTS, columnar=True)
+
+    blocking, first_token, ttft_reported, streamed = [], [], [], []
+    for i in range(args.queries):
+        question, product, aspect = QUESTIONS[i % len(QUESTIONS)]
+        start = time.perf_counter()
+        answer, _ = rag.query(question, product, aspect)
+        blocking.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        sources, tokens = rag.query_stream(question, product, aspect)
+        if not sources:
+            continue
+        first = None
+        parts = []
+        for token in tokens:
+            if first is None:
+                first = time.perf_counter() - start
+            parts.append(token)
+        streamed.append(time.perf_counter() - start)
+        first_token.append(first)
+        ttft_reported.append(rag.last_stream_stats["ttft"])
+        assert "".join(parts) == answer, "streamed answer differs from the blocking one"
+
+    print(f"\n{'mode':<22}{'median ms':>12}")
+    print(f"{'blocking query':<22}{statistics.median(blocking) * 1000:>12.0f}")
+    print(f"{'stream first token':<22}{statistics.median(first_token) * 1000:>12.0f}")
+    print(f"{'stream full answer':<22}{statistics.median(streamed) * 1000:>12.0f}")
+    print(f"{'reported TTFT':<22}{statistics.median(ttft_reported) * 1000:>12.0f}")
+    print(f"perceived latency: {statistics.median(blocking) / statistics.median(first_token):.1f}x lower "
+          f"over {len(first_token)} queries of {args.tokens} tokens")
+
+
+if __name__ == "__main__":
+    main()
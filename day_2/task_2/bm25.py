@@ -0,0 +1,170 @@
+"""In-process BM25 inverted index kept alongside the Chroma collection.
+
+Posting lists are pairs of `array` buffers (document numbers and term
+frequencies), so the index stays compact and can be scored with NumPy
+without copying. Documents are added incrementally and removed with
+tombstones; once more than COMPACT_DEAD_FRACTION of the documents are dead
+the postings are rewritten without them. Each document also keeps its
+product and matched aspects in
+compact columns so searches honour the same product/aspect filter as the
+dense query.
+"""
+import re
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ingest import aspect_mask
+
+TOKEN_RE = re.compile(r"\w+")
+COMPACT_DEAD_FRACTION = 0.25  # Share of removed documents that triggers a compaction
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.ids: List[str] = []
+        self.doc_numbers: Dict[str, int] = {}
+        self.doc_lengths = array("I")
+        self.alive = bytearray()
+        self.doc_products = array("I")
+        self.doc_aspects = array("Q")  # Bitmask over self.aspect_codes
+        self.product_codes: Dict[str, int] = {}
+        self.aspect_codes: Dict[str, int] = {}
+        self.total_length = 0
+        self.live_docs = 0
+
+    def __len__(self) -> int:
+        return self.live_docs
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict]) -> None:
+        """Index documents; an ID that is already present is replaced."""
+        self.remove(i for i in ids if i in self.doc_numbers)
+        for doc_id, text, metadata in zip(ids, texts, metadatas):
+            number = len(self.ids)
+            tokens = tokenize(text)
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                entry = self.postings.get(token)
+                if entry is None:
+                    entry = self.postings[token] = (array("I"), array("H"))
+                entry[0].append(number)
+                entry[1].append(min(tf, 0xFFFF))
+            self.ids.append(doc_id)
+            self.doc_numbers[doc_id] = number
+            self.doc_lengths.append(len(tokens))
+            self.alive.append(1)
+            product = metadata.get("product", "")
+            self.doc_products.append(self.product_codes.setdefault(product, len(self.product_codes)))
+            self.doc_aspects.append(aspect_mask(metadata, self.aspect_codes))
+            self.total_length += len(tokens)
+            self.live_docs += 1
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """Tombstone documents; their postings are skipped at query time."""
+        for doc_id in list(ids):
+            number = self.doc_numbers.pop(doc_id, None)
+            if number is None:
+                continue
+            self.alive[number] = 0
+            self.total_length -= self.doc_lengths[number]
+            self.live_docs -= 1
+        if len(self.ids) - self.live_docs > COMPACT_DEAD_FRACTION * len(self.ids):
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop removed documents from the postings and columns, renumbering the live ones."""
+        alive = np.frombuffer(self.alive, dtype=np.uint8).astype(bool)
+        renumbered = (np.cumsum(alive) - 1).astype(np.uint32)
+        for token, (docs, tfs) in list(self.postings.items()):
+            numbers = np.frombuffer(docs, dtype=np.uint32)
+            keep = alive[numbers]
+            if not keep.any():
+                del self.postings[token]
+            elif not keep.all():
+                self.postings[token] = (array("I", renumbered[numbers[keep]].tobytes()),
+                                        array("H", np.frombuffer(tfs, dtype=np.uint16)[keep].tobytes()))
+            else:
+                self.postings[token] = (array("I", renumbered[numbers].tobytes()), tfs)
+        for name, dtype in (("doc_lengths", np.uint32), ("doc_products", np.uint32), ("doc_aspects", np.uint64)):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, np.frombuffer(column, dtype=dtype)[alive].tobytes()))
+        self.ids = [doc_id for doc_id, live in zip(self.ids, alive) if live]
+        self.doc_numbers = {doc_id: number for number, doc_id in enumerate(self.ids)}
+        self.alive = bytearray(b"\x01" * len(self.ids))
+
+    def search(self, query: str, n_results: int, products: Optional[List[str]] = None,
+               aspect_field: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Return up to n_results (id, score) pairs, best first."""
+        if not self.live_docs:
+            return []
+        alive = np.frombuffer(self.alive, dtype=np.uint8).astype(bool)
+        if products is not None:
+            codes = [self.product_codes[p] for p in products if p in self.product_codes]
+            alive &= np.isin(np.frombuffer(self.doc_products, dtype=np.uint32), codes)
+        if aspect_field is not None:
+            code = self.aspect_codes.get(aspect_field)
+            if code is None:
+                return []
+            alive &= (np.frombuffer(self.doc_aspects, dtype=np.uint64) >> np.uint64(code)) & np.uint64(1) == 1
+
+        doc_lengths = np.frombuffer(self.doc_lengths, dtype=np.uint32)
+        avg_length = self.total_length / self.live_docs
+        matched, partial = [], []
+        for token in set(tokenize(query)):
+            entry = self.postings.get(token)
+            if entry is None:
+                continue
+            docs = np.frombuffer(entry[0], dtype=np.uint32)
+            tfs = np.frombuffer(entry[1], dtype=np.uint16).astype(np.float32)
+            keep = alive[docs]
+            docs, tfs = docs[keep], tfs[keep]
+            if not docs.size:
+                continue
+            df = docs.size
+            idf = np.log(1 + (self.live_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * doc_lengths[docs] / avg_length)
+            matched.append(docs)
+            partial.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+        if not matched:
+            return []
+        docs, inverse = np.unique(np.concatenate(matched), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(partial))
+        if scores.size > n_results:
+            # Everything tied with the n-th best score stays a candidate, so ties break the same way at any depth
+            cutoff = scores[np.argpartition(-scores, n_results - 1)[n_results - 1]]
+            candidates = np.flatnonzero(scores >= cutoff)
+        else:
+            candidates = np.arange(scores.size)
+        # Best first; equal scores in insertion order (docs is sorted by document number)
+        top = candidates[np.lexsort((candidates, -scores[candidates]))][:n_results]
+        return [(self.ids[docs[i]], float(scores[i])) for i in top]
+
+    def nbytes(self) -> int:
+        """Approximate size of the posting arrays and per-document columns."""
+        postings = sum(d.itemsize * len(d) + t.itemsize * len(t) for d, t in self.postings.values())
+        columns = sum(a.itemsize * len(a) for a in (self.doc_lengths, self.doc_products, self.doc_aspects))
+        return postings + columns + len(self.alive)
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60,
+                           weights: Optional[List[float]] = None) -> List[str]:
+    """Merge ranked ID lists; IDs ranked high by either list come first.
+
+    Each list's 1/(k + rank) contributions are scaled by its weight (1 each
+    by default).
+    """
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights or [1.0] * len(rankings)):
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
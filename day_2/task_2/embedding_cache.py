@@ -0,0 +1,185 @@
+"""Persistent, content-addressed embedding cache for the review RAG.
+
+Vectors are appended to a flat float32 file that is memory-mapped for reads;
+a small SQLite index maps sha256(model name + text) to a row in that file and
+tracks when each entry was last used. When the vector file grows past
+`max_bytes` the least recently used entries are evicted and the file is
+compacted.
+"""
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+# Shared helpers live in <repo>/common
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.cache_utils import EVICT_TO_FRACTION, HitCounter, in_batches
+
+DEFAULT_MAX_BYTES = 1 << 30  # 1 GiB of vectors
+
+
+def text_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache(HitCounter):
+    """Disk-bounded vector cache for one embedding model, with hit/miss counters."""
+
+    def __init__(self, cache_dir: str, model_name: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.dir = os.path.join(cache_dir, model_name.replace("/", "__"))
+        os.makedirs(self.dir, exist_ok=True)
+        self.vectors_path = os.path.join(self.dir, "vectors.f32")
+        self.db = sqlite3.connect(os.path.join(self.dir, "index.sqlite3"))
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER, last_used REAL)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        row = self.db.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+        self.dim: Optional[int] = int(row[0]) if row else None
+        self._mmap: Optional[np.memmap] = None
+        self.reset_hits()
+        self.evictions = 0
+
+    def _rows(self) -> int:
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (4 * self.dim)
+
+    def _vectors(self) -> np.memmap:
+        """Read-only memmap of the vector file, reopened when it has grown."""
+        rows = self._rows()
+        if self._mmap is None or self._mmap.shape[0] != rows:
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self._mmap
+
+    def _lookup_slots(self, keys: List[str]) -> Dict[str, int]:
+        slots: Dict[str, int] = {}
+        for batch, placeholders in in_batches(keys):
+            slots.update(self.db.execute(
+                f"SELECT key, slot FROM entries WHERE key IN ({placeholders})", batch).fetchall())
+        return slots
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up cached vectors; returns None for each miss."""
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        if self.dim is None or not texts:
+            self.record_lookups(len(texts), 0)
+            return results
+        keys = [text_key(self.model_name, text) for text in texts]
+        slots = self._lookup_slots(keys)
+        if slots:
+            vectors = self._vectors()
+            for i, key in enumerate(keys):
+                if key in slots:
+                    results[i] = np.array(vectors[slots[key]])
+            now = time.time()
+            self.db.executemany("UPDATE entries SET last_used = ? WHERE key = ?",
+                                [(now, key) for key in slots])
+            self.db.commit()
+        self.record_lookups(len(texts), sum(r is not None for r in results))
+        return results
+
+    def put_many(self, texts: List[str], vectors: List) -> None:
+        """Append vectors for texts not cached yet, then enforce the size bound."""
+        if not texts:
+            return
+        block = np.asarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            self.dim = block.shape[1]
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('dim', ?)", (str(self.dim),))
+        keys = [text_key(self.model_name, text) for text in texts]
+        seen = set(self._lookup_slots(keys))
+        fresh = []
+        for i, key in enumerate(keys):
+            if key not in seen:
+                seen.add(key)
+                fresh.append(i)
+        if not fresh:
+            return
+        first_slot = self._rows()
+        with open(self.vectors_path, "ab") as f:
+            f.write(block[fresh].tobytes())
+        now = time.time()
+        self.db.executemany(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+            [(keys[i], first_slot + n, now) for n, i in enumerate(fresh)])
+        self.db.commit()
+        if self._rows() * 4 * self.dim > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Drop least recently used entries and compact the vector file."""
+        row_bytes = 4 * self.dim
+        keep_rows = int(self.max_bytes * EVICT_TO_FRACTION) // row_bytes
+        entries = self.db.execute(
+            "SELECT key, slot, last_used FROM entries ORDER BY last_used DESC").fetchall()
+        kept, dropped = entries[:keep_rows], entries[keep_rows:]
+        old = self._vectors()
+        tmp_path = self.vectors_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for start in range(0, len(kept), 10_000):
+                slots = [slot for _, slot, _ in kept[start:start + 10_000]]
+                f.write(np.ascontiguousarray(old[slots]).tobytes())
+        self._mmap = None
+        del old
+        os.replace(tmp_path, self.vectors_path)
+        self.db.execute("DELETE FROM entries")
+        self.db.executemany("INSERT INTO entries VALUES (?, ?, ?)",
+                            [(key, new_slot, last_used)
+                             for new_slot, (key, _, last_used) in enumerate(kept)])
+        self.db.commit()
+        self.evictions += len(dropped)
+
+    def stats(self) -> Dict:
+        return {
+            **self.hit_stats(),
+            "evictions": self.evictions,
+            "entries": self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0],
+            "bytes": self._rows() * 4 * (self.dim or 0),
+        }
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Chroma embedding function that only embeds texts missing from the cache."""
+
+    def __init__(self, embedding_function: EmbeddingFunction, cache: EmbeddingCache):
+        self.embedding_function = embedding_function
+        self.cache = cache
+
+    def __call__(self, input: Documents) -> Embeddings:
+        cached = self.cache.get_many(list(input))
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if missing:
+            texts = [input[i] for i in missing]
+            fresh = self.embedding_function(texts)
+            self.cache.put_many(texts, fresh)
+            for i, vector in zip(missing, fresh):
+                cached[i] = np.asarray(vector, dtype=np.float32)
+        return cached
+
+
+class LazyEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Chroma embedding function that builds the real one on its first call.
+
+    Loading a SentenceTransformer takes seconds, and a warm start that only
+    skips unchanged files never needs it.
+    """
+
+    def __init__(self, factory: Callable[[], EmbeddingFunction]):
+        self.factory = factory
+        self.embedding_function: Optional[EmbeddingFunction] = None
+
+    def __call__(self, input: Documents) -> Embeddings:
+        if self.embedding_function is None:
+            self.embedding_function = self.factory()
+        return self.embedding_function(input)
+
+    def __getstate__(self) -> Dict:
+        # Pool workers get the factory and load their own model instead of a pickled copy
+        return {"factory": self.factory, "embedding_function": None}
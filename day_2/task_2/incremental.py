@@ -0,0 +1,102 @@
+"""File fingerprints and stable review IDs for incremental re-ingest.
+
+The manifest is a SQLite file next to the persistent Chroma store. It holds
+one fingerprint per CSV (size, mtime and sha256 of its bytes) and, for every
+review ingested from it, a stable ID derived from the review text plus a
+digest of the stored document and metadata. Comparing a fresh pass against
+the manifest yields exactly the reviews to upsert and delete. The manifest
+also keeps the catalog of normalized product names used by query filters.
+"""
+import hashlib
+import io
+import json
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+HASH_BLOCK = 1 << 20
+
+
+def review_id(filename: str, text: str) -> str:
+    """ID that survives row reordering and appends: file name + text hash."""
+    return f"{filename}:{hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]}"
+
+
+def chunk_digest(chunk: Dict) -> str:
+    payload = json.dumps([chunk["text"], chunk["metadata"]], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def hash_file(path: str, prefix_bytes: Optional[int] = None) -> Tuple[str, Optional[str]]:
+    """Return (sha256 of the whole file, sha256 of its first prefix_bytes)."""
+    full = hashlib.sha256()
+    prefix_digest = None
+    read = 0
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(HASH_BLOCK)
+            if not block:
+                break
+            if prefix_bytes is not None and read < prefix_bytes <= read + len(block):
+                head = full.copy()
+                head.update(block[:prefix_bytes - read])
+                prefix_digest = head.hexdigest()
+            full.update(block)
+            read += len(block)
+    if prefix_bytes == 0:
+        prefix_digest = hashlib.sha256().hexdigest()
+    return full.hexdigest(), prefix_digest
+
+
+def read_appended_rows(path: str, offset: int) -> pd.DataFrame:
+    """Parse only the rows written after `offset`, reusing the file's header."""
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(offset)
+        tail = f.read()
+    return pd.read_csv(io.BytesIO(header + tail))
+
+
+class IngestManifest:
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS files (name TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT)")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS reviews (file TEXT, id TEXT, digest TEXT, PRIMARY KEY (file, id))")
+        self.db.execute("CREATE TABLE IF NOT EXISTS products (name TEXT PRIMARY KEY)")
+
+    def files(self) -> List[str]:
+        return [name for (name,) in self.db.execute("SELECT name FROM files")]
+
+    def fingerprint(self, filename: str) -> Optional[Dict]:
+        row = self.db.execute(
+            "SELECT size, mtime_ns, sha256 FROM files WHERE name = ?", (filename,)).fetchone()
+        return dict(zip(("size", "mtime_ns", "sha256"), row)) if row else None
+
+    def review_digests(self, filename: str) -> Dict[str, str]:
+        return dict(self.db.execute("SELECT id, digest FROM reviews WHERE file = ?", (filename,)))
+
+    def products(self) -> List[str]:
+        return [name for (name,) in self.db.execute("SELECT name FROM products")]
+
+    def add_products(self, names) -> None:
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO products VALUES (?)", [(name,) for name in names])
+
+    def record(self, filename: str, size: int, mtime_ns: int, sha256: str,
+               upserted: Dict[str, str], deleted: List[str]) -> None:
+        """Store a file's new fingerprint and review delta in one transaction."""
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                            (filename, size, mtime_ns, sha256))
+            self.db.executemany("INSERT OR REPLACE INTO reviews VALUES (?, ?, ?)",
+                                [(filename, rid, digest) for rid, digest in upserted.items()])
+            self.db.executemany("DELETE FROM reviews WHERE file = ? AND id = ?",
+                                [(filename, rid) for rid in deleted])
+
+    def forget(self, filename: str) -> None:
+        with self.db:
+            self.db.execute("DELETE FROM files WHERE name = ?", (filename,))
+            self.db.execute("DELETE FROM reviews WHERE file = ?", (filename,))
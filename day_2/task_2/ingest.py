@@ -0,0 +1,236 @@
+"""Columnar ingest helpers for the Amazon reviews RAG.
+
+The legacy `RAGAmazonReviews.chunk_reviews` walks the CSV row by row. The
+functions here do the same work (product normalization, aspect matching and
+duplicate removal) as whole-column pandas/NumPy operations and read the CSV
+in fixed-size blocks, so arbitrarily large files are processed in bounded
+memory.
+"""
+import re
+import time
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from near_dup import NearDuplicateFilter
+
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_EMBED_BATCH = 5000  # Chunks a pool worker embeds and hands to the writer at a time
+
+
+def aspect_field(aspect: str) -> str:
+    """Metadata key of the boolean flag stored for each matched aspect."""
+    return f"aspect_{aspect.lower()}"
+
+
+def aspect_mask(metadata: Dict, aspect_codes: Dict[str, int]) -> int:
+    """The chunk's aspect flags as a 64-bit mask; unseen flags get the next bit in `aspect_codes`.
+
+    The in-memory indexes (bm25.py, quantized_store.py) keep one such mask
+    per document so aspect filters are a shift and an AND.
+    """
+    mask = 0
+    for key, value in metadata.items():
+        if key.startswith("aspect_") and value is True:
+            code = aspect_codes.setdefault(key, len(aspect_codes))
+            if code >= 64:
+                raise ValueError("At most 64 aspect keywords can be indexed")
+            mask |= 1 << code
+    return mask
+
+
+class AspectMatcher:
+    """Match every aspect keyword against a column of reviews in one pass.
+
+    A single compiled regex (a lookahead alternation, longest keyword first)
+    finds the longest keyword starting at every position. Keywords that are
+    substrings of a matched keyword are then filled in through a closure
+    matrix, so the result is identical to testing `kw in review` for each
+    keyword separately.
+    """
+
+    def __init__(self, aspect_keywords: List[str]):
+        # Keep the caller's order (lowercased, de-duplicated) for aspects_str
+        self.keywords = list(dict.fromkeys(kw.lower() for kw in aspect_keywords))
+        by_length = sorted(self.keywords, key=len, reverse=True)
+        self.pattern = re.compile("(?=(" + "|".join(re.escape(kw) for kw in by_length) + "))")
+        # closure[i, j] is True when keyword j is contained in keyword i
+        self.closure = np.array(
+            [[inner in outer for inner in self.keywords] for outer in self.keywords],
+            dtype=bool,
+        )
+
+    def match(self, reviews: pd.Series) -> np.ndarray:
+        """Return a (len(reviews), len(keywords)) boolean matrix of matches."""
+        mask = np.zeros((len(reviews), len(self.keywords)), dtype=bool)
+        if not self.keywords or reviews.empty:
+            return mask
+        found = reviews.str.lower().reset_index(drop=True).str.findall(self.pattern).explode().dropna()
+        if found.empty:
+            return mask
+        rows = found.index.to_numpy()
+        cols = pd.Categorical(found.to_numpy(), categories=self.keywords).codes
+        mask[rows, cols] = True
+        # Propagate matches to keywords contained in the matched ones
+        return (mask.astype(np.uint8) @ self.closure.astype(np.uint8)) > 0
+
+    def join(self, mask: np.ndarray) -> np.ndarray:
+        """Serialize each row of a match matrix to a comma-separated string."""
+        joined = np.full(mask.shape[0], "", dtype=object)
+        for j, kw in enumerate(self.keywords):
+            joined = joined + np.where(mask[:, j], kw + ",", "")
+        return np.array([s[:-1] for s in joined], dtype=object)
+
+
+class SeenReviews:
+    """Exact duplicate filter over 64-bit review text hashes.
+
+    Hashes are kept in a few sorted runs that are merged when they reach a
+    similar size, so lookups stay logarithmic without re-sorting everything
+    seen so far on every block.
+    """
+
+    def __init__(self):
+        self._runs: List[np.ndarray] = []
+
+    def _contains(self, hashes: np.ndarray) -> np.ndarray:
+        found = np.zeros(hashes.size, dtype=bool)
+        for run in self._runs:
+            pos = np.searchsorted(run, hashes)
+            pos[pos == run.size] = 0
+            found |= run[pos] == hashes
+        return found
+
+    def filter_new(self, reviews: pd.Series) -> np.ndarray:
+        """Return a mask of first occurrences and remember them."""
+        hashes = pd.util.hash_pandas_object(reviews, index=False).to_numpy()
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        if self._runs:
+            keep &= ~self._contains(hashes)
+        run = np.sort(hashes[keep])
+        if run.size == 0:  # Nothing new; an empty run would break the lookups in _contains
+            return keep
+        while self._runs and self._runs[-1].size <= 2 * run.size:
+            run = np.sort(np.concatenate([self._runs.pop(), run]), kind="mergesort")
+        self._runs.append(run)
+        return keep
+
+    def __len__(self) -> int:
+        return sum(run.size for run in self._runs)
+
+
+def chunk_frame(df: pd.DataFrame, matcher: AspectMatcher, seen: Optional[SeenReviews] = None,
+                near_dups: Optional[NearDuplicateFilter] = None) -> List[Dict]:
+    """Columnar equivalent of the per-row loop in `chunk_reviews`.
+
+    When `near_dups` is given, reviews that survive exact de-duplication are
+    also checked against it and near-duplicates are dropped.
+    """
+    df = df.dropna(subset=["review_text"])
+    reviews = df["review_text"].astype(str)
+    mask = matcher.match(reviews)
+    has_aspect = mask.any(axis=1)
+
+    reviews = reviews[has_aspect]
+    df = df[has_aspect]
+    mask = mask[has_aspect]
+    if seen is None:
+        seen = SeenReviews()
+    keep = seen.filter_new(reviews)
+    if near_dups is not None:
+        keep[keep] = near_dups.filter_new(reviews[keep].tolist())
+    reviews = reviews[keep]
+    df = df[keep]
+    mask = mask[keep]
+
+    products = df["product"].astype(str).str.lower().tolist()
+    reviewer_ids = df["reviewer_id"].tolist()
+    if "sentiment" in df.columns:
+        sentiments = df["sentiment"].fillna("unknown").tolist()
+    else:
+        sentiments = ["unknown"] * len(df)
+    aspects = matcher.join(mask)
+    fields = [aspect_field(kw) for kw in matcher.keywords]
+
+    return [
+        {
+            "text": text,
+            "metadata": {
+                "product": product,
+                "reviewer_id": reviewer_id,
+                "sentiment": sentiment,
+                "aspects_str": aspects_str,
+                **{fields[j]: True for j in np.flatnonzero(row)},
+            },
+        }
+        for text, product, reviewer_id, sentiment, aspects_str, row in zip(
+            reviews.tolist(), products, reviewer_ids, sentiments, aspects, mask
+        )
+    ]
+
+
+def iter_review_chunks(csv_path: str, aspect_keywords: List[str], chunksize: int = DEFAULT_CHUNKSIZE,
+                       near_dups: Optional[NearDuplicateFilter] = None) -> Iterator[List[Dict]]:
+    """Yield chunk lists block by block, de-duplicating across the whole file."""
+    matcher = AspectMatcher(aspect_keywords)
+    seen = SeenReviews()
+    for block in pd.read_csv(csv_path, chunksize=chunksize):
+        yield chunk_frame(block, matcher, seen, near_dups)
+
+
+_batches = None  # The writer's bounded queue of embedded batches, set in each pool worker by init_worker
+
+
+def init_worker(batches) -> None:
+    """ProcessPoolExecutor initializer: keep the queue embed_csv_file puts its batches on."""
+    global _batches
+    _batches = batches
+
+
+def embed_csv_file(csv_path: str, aspect_keywords: List[str], chunksize: int = DEFAULT_CHUNKSIZE,
+                   near_dup_threshold: Optional[float] = None, embedding_function=None,
+                   batch_size: int = DEFAULT_EMBED_BATCH) -> Dict:
+    """Chunk one CSV and embed it in batches of `batch_size` chunks; the unit of work for a process pool.
+
+    Each batch is put on the writer's queue (see init_worker) as soon as it
+    is ready, as {"path", "offset", "chunks", "embeddings"}, where offset is
+    the index of its first chunk in the file and embeddings is a float32
+    matrix (None without an embedding function). The queue is bounded, so a
+    worker waits while the writer is behind and memory does not grow with the
+    file. Returns the file's totals and timings once every batch is queued.
+    """
+    start = time.perf_counter()
+    matcher = AspectMatcher(aspect_keywords)
+    seen = SeenReviews()
+    near_dups = NearDuplicateFilter(near_dup_threshold) if near_dup_threshold else None
+    rows = offset = 0
+    embed_seconds = 0.0
+    pending: List[Dict] = []
+
+    def flush(batch: List[Dict]) -> None:
+        nonlocal offset, embed_seconds
+        embeddings = None
+        if embedding_function is not None:
+            embed_start = time.perf_counter()
+            embeddings = np.asarray(embedding_function([chunk["text"] for chunk in batch]), dtype=np.float32)
+            embed_seconds += time.perf_counter() - embed_start
+        _batches.put({"path": csv_path, "offset": offset, "chunks": batch, "embeddings": embeddings})
+        offset += len(batch)
+
+    for block in pd.read_csv(csv_path, chunksize=chunksize):
+        rows += len(block)
+        pending.extend(chunk_frame(block, matcher, seen, near_dups))
+        while len(pending) >= batch_size:
+            flush(pending[:batch_size])
+            pending = pending[batch_size:]
+    if pending:
+        flush(pending)
+    return {
+        "path": csv_path,
+        "rows": rows,
+        "chunks": offset,
+        "seconds": time.perf_counter() - start,
+        "embed_seconds": embed_seconds,
+        "near_duplicates": near_dups.dropped if near_dups else 0,
+    }
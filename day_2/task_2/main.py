@@ -1,32 +1,197 @@
+import argparse
+import json
 import os
-import chromadb
-from chromadb.utils import embedding_functions
-import google.generativeai as genai
-from typing import List, Dict, Tuple
-import pandas as pd
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, List, Dict, Iterator, Optional, Tuple
 from dotenv import load_dotenv
-from tqdm import tqdm
+from aggregates import AspectAggregates, is_aggregate_question
+from answer_cache import DEFAULT_MAX_ENTRIES, DEFAULT_TTL_SECONDS, AnswerCache
+
+# chromadb, Gemini, pandas and the helpers built on them are imported where
+# they are first needed, so `--help` and a warm start skip seconds of imports
+if TYPE_CHECKING:
+    import numpy as np
+    from chromadb.api.types import EmbeddingFunction
 
 load_dotenv()
 
+DEFAULT_BATCH_SIZE = 5000  # Max chunks per collection.add call
+HYBRID_CANDIDATE_FACTOR = 2  # Dense and BM25 candidates per requested result before fusion
+# BM25 is there for exact terms (model numbers) that embeddings blur, so its ranks weigh more in the
+# fusion. With equal weights, or deeper candidate lists, dense misses displaced BM25 hits and hybrid
+# ranked below BM25 alone in bench_hybrid.py; now dense ranks reorder and fill in the BM25 hits
+HYBRID_LEXICAL_WEIGHT = 1.5
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+NO_RESULTS_ANSWER = "No relevant reviews found for the specified product and aspect. Try adjusting your query or adding more data."
+
+
+def load_question_batch(path: str) -> List[Dict[str, str]]:
+    """Read (question, product, aspect) triples from a .jsonl or .csv file."""
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        import pandas as pd
+        rows = pd.read_csv(path, dtype=str).fillna("").to_dict("records")
+    return [{"question": row["question"], "product": row["product"], "aspect": row["aspect"]} for row in rows]
+
 class RAGAmazonReviews:
-    def __init__(self, model_name: str = "gemini-1.5-flash"):
-        print("🔧 Initializing Gemini AI model...")
-        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        self.model = genai.GenerativeModel(model_name)
+    def __init__(self, model_name: str = "gemini-1.5-flash", embedding_cache_dir: Optional[str] = None,
+                 embedding_cache_max_bytes: Optional[int] = None, persist_dir: Optional[str] = None,
+                 embedding_function: Optional["EmbeddingFunction"] = None,
+                 answer_cache_size: int = DEFAULT_MAX_ENTRIES, answer_cache_ttl: float = DEFAULT_TTL_SECONDS,
+                 hybrid: bool = False, quantized: bool = False):
+        # Gemini, the embedding model and the vector store are created on first use
+        self.model_name = model_name
+        self._model = None
+        # Repeat questions over the same retrieved reviews skip the LLM call
+        self.answer_cache = AnswerCache(answer_cache_size, answer_cache_ttl) if answer_cache_size > 0 else None
         
-        print("🗄️ Setting up ChromaDB vector store...")
-        self.client = chromadb.Client()
-        self.collection = self.client.create_collection(
-            name="amazon_reviews",
-            embedding_function=embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name="all-MiniLM-L6-v2"
-            )
-        )
+        self.embedding_cache = None
+        self._embedding_function = embedding_function
+        self._embedding_cache_dir = embedding_cache_dir
+        self._embedding_cache_max_bytes = embedding_cache_max_bytes
+        self.persist_dir = persist_dir
+        # int8 vectors in RAM with a float re-rank from disk instead of Chroma's float32 index
+        self.quantized = quantized
+        self._client = None
+        self._collection = None
+        self.manifest = None
+        if persist_dir:
+            # The manifest is plain SQLite, so unchanged files are skipped without opening Chroma
+            from incremental import IngestManifest
+            os.makedirs(persist_dir, exist_ok=True)
+            self.manifest = IngestManifest(os.path.join(persist_dir, "ingest_manifest.sqlite3"))
+        # Product x aspect x sentiment counts that answer count/ratio questions without the LLM
+        self.aggregates = AspectAggregates(
+            os.path.join(persist_dir, "aspect_aggregates.sqlite3") if persist_dir else ":memory:")
+        if not persist_dir:
+            self.aggregates.mark_complete()
+        self.near_duplicates_skipped = 0
+        self.last_stream_stats: Optional[Dict] = None
+        # Normalized product names seen at ingest, used to resolve query filters
+        self.products = set(self.manifest.products()) if self.manifest else set()
+        # Lexical index fused with dense retrieval for exact terms like model numbers.
+        # A persisted index is rebuilt on the first hybrid query rather than at startup.
+        self.bm25 = None
+        self._bm25_loaded = not persist_dir
+        if hybrid:
+            from bm25 import BM25Index
+            self.bm25 = BM25Index()
+
+    @property
+    def model(self):
+        if self._model is None:
+            import google.generativeai as genai
+            print("🔧 Initializing Gemini AI model...")
+            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+
+    @property
+    def embedding_function(self) -> "EmbeddingFunction":
+        if self._embedding_function is None:
+            from embedding_cache import LazyEmbeddingFunction
+            # The SentenceTransformer weights load on the first embedding call, not here
+            self._embedding_function = LazyEmbeddingFunction(self._load_sentence_transformer)
+        if self._embedding_cache_dir and self.embedding_cache is None:
+            from embedding_cache import DEFAULT_MAX_BYTES, CachedEmbeddingFunction, EmbeddingCache
+            # Reuse embeddings from earlier runs for reviews that have not changed
+            print(f"🧊 Using embedding cache at {self._embedding_cache_dir}")
+            max_bytes = self._embedding_cache_max_bytes or DEFAULT_MAX_BYTES
+            self.embedding_cache = EmbeddingCache(self._embedding_cache_dir, EMBEDDING_MODEL, max_bytes)
+            self._embedding_function = CachedEmbeddingFunction(self._embedding_function, self.embedding_cache)
+        return self._embedding_function
+
+    @staticmethod
+    def _load_sentence_transformer() -> "EmbeddingFunction":
+        from chromadb.utils import embedding_functions
+        print(f"🧠 Loading embedding model {EMBEDDING_MODEL}...")
+        return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=EMBEDDING_MODEL)
+
+    @property
+    def collection(self):
+        if self._collection is None and self.quantized:
+            from quantized_store import QuantizedReviewStore
+            print("🗜️ Setting up int8 quantized review store...")
+            self._collection = QuantizedReviewStore(self.persist_dir, self.embedding_function)
+        if self._collection is None:
+            import chromadb
+            print("🗄️ Setting up ChromaDB vector store...")
+            if self.persist_dir:
+                # Keep the collection on disk so incremental re-ingest has something to diff against
+                print(f"💽 Using persistent store at {self.persist_dir}")
+                self._client = chromadb.PersistentClient(path=self.persist_dir)
+                self._collection = self._client.get_or_create_collection(
+                    name="amazon_reviews",
+                    embedding_function=self.embedding_function
+                )
+            else:
+                self._client = chromadb.Client()
+                self._collection = self._client.create_collection(
+                    name="amazon_reviews",
+                    embedding_function=self.embedding_function
+                )
+        return self._collection
+
+    @collection.setter
+    def collection(self, collection):
+        self._collection = collection
+
+    @property
+    def client(self):
+        self.collection
+        return self._client
+
+    def _ensure_bm25(self):
+        """Rebuild the BM25 index from a persisted collection before its first use."""
+        if self.bm25 is not None and not self._bm25_loaded:
+            self._bm25_loaded = True
+            if self.collection.count():
+                self._load_bm25(DEFAULT_BATCH_SIZE)
     
-    def chunk_reviews(self, csv_path: str, aspect_keywords: List[str]) -> List[Dict]:
-        """Chunk reviews by product, sentiment and aspect, avoiding duplicates."""
+    def _ensure_aggregates(self):
+        """Backfill the aggregate table from a persisted collection that predates it."""
+        if self.aggregates.complete:
+            return
+        if self.collection.count():
+            print("📊 Building aspect aggregates from the stored reviews...")
+            offset = 0
+            while True:
+                page = self.collection.get(limit=DEFAULT_BATCH_SIZE, offset=offset, include=["metadatas"])
+                if not page["ids"]:
+                    break
+                self.aggregates.add(page["ids"], page["metadatas"])
+                offset += len(page["ids"])
+        self.aggregates.mark_complete()
+
+    def chunk_reviews(self, csv_path: str, aspect_keywords: List[str], columnar: bool = False,
+                      chunksize: Optional[int] = None, near_dup_threshold: Optional[float] = None) -> List[Dict]:
+        """Chunk reviews by product, sentiment and aspect, avoiding duplicates.
+
+        With columnar=True the CSV is read in blocks of `chunksize` rows and each
+        block is processed with whole-column operations (see ingest.py);
+        chunksize defaults to ingest.DEFAULT_CHUNKSIZE.
+        near_dup_threshold (columnar only) also drops reviews whose estimated
+        Jaccard similarity to an earlier review reaches the threshold.
+        """
         print(f"📄 Processing CSV: {os.path.basename(csv_path)}")
+        if columnar:
+            chunks = []
+            for batch in self.iter_chunk_batches(csv_path, aspect_keywords, chunksize, near_dup_threshold):
+                chunks.extend(batch)
+            print(f"✅ {len(chunks)} unique chunks found in {csv_path}")
+            return chunks
+        import pandas as pd
+        from tqdm import tqdm
+        from ingest import aspect_field
         df = pd.read_csv(csv_path)
         chunks = []
         seen_reviews = set()  # Track unique review texts to avoid duplicates
@@ -45,13 +210,105 @@ class RAGAmazonReviews:
                         "product": product,
                         "reviewer_id": reviewer_id,
                         "sentiment": sentiment,
-                        "aspects_str": aspects_str  # String version for storage
+                        "aspects_str": aspects_str,  # String version for storage
+                        # One boolean per aspect so the vector store can filter on it
+                        **{aspect_field(aspect): True for aspect in dict.fromkeys(matching_aspects)}
                     }
                 })
         print(f"✅ {len(chunks)} unique chunks found in {csv_path}")
         return chunks
 
-    def add_reviews(self, data_dir: str, aspect_keywords: List[str]):
+    def iter_chunk_batches(self, csv_path: str, aspect_keywords: List[str], chunksize: Optional[int] = None,
+                           near_dup_threshold: Optional[float] = None) -> Iterator[List[Dict]]:
+        """Stream columnar chunk batches so large CSVs never sit fully in memory."""
+        import pandas as pd
+        from tqdm import tqdm
+        from ingest import DEFAULT_CHUNKSIZE, AspectMatcher, SeenReviews, chunk_frame
+        from near_dup import NearDuplicateFilter
+        chunksize = chunksize or DEFAULT_CHUNKSIZE
+        matcher = AspectMatcher(aspect_keywords)
+        seen = SeenReviews()
+        near_dups = NearDuplicateFilter(near_dup_threshold) if near_dup_threshold else None
+        with tqdm(desc="🔍 Chunking reviews", unit=" rows") as progress:
+            for block in pd.read_csv(csv_path, chunksize=chunksize):
+                progress.update(len(block))
+                yield chunk_frame(block, matcher, seen, near_dups)
+        if near_dups is not None:
+            self._count_near_duplicates(near_dups.dropped)
+
+    def _count_near_duplicates(self, dropped: int):
+        self.near_duplicates_skipped += dropped
+        if dropped:
+            print(f"🧬 Skipped {dropped} near-duplicate reviews ({dropped} embeddings saved)")
+
+    def _add_chunks(self, chunks: List[Dict], ids: List[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                    upsert: bool = False, embeddings: Optional["np.ndarray"] = None):
+        """Add (or upsert) chunks to the collection in bounded batches.
+
+        Precomputed `embeddings` (one row per chunk) are stored as given;
+        otherwise the collection embeds the texts.
+        """
+        self._ensure_bm25()
+        self._ensure_aggregates()
+        write = self.collection.upsert if upsert else self.collection.add
+        new_products = {ch["metadata"]["product"] for ch in chunks} - self.products
+        if new_products:
+            self.products.update(new_products)
+            if self.manifest is not None:
+                self.manifest.add_products(new_products)
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start:start + batch_size]
+            vectors = {} if embeddings is None else {"embeddings": embeddings[start:start + batch_size]}
+            write(
+                documents=[ch["text"] for ch in batch],
+                metadatas=[ch["metadata"] for ch in batch],
+                ids=ids[start:start + batch_size],
+                **vectors
+            )
+            if self.bm25 is not None:
+                self.bm25.add(ids[start:start + batch_size], [ch["text"] for ch in batch],
+                              [ch["metadata"] for ch in batch])
+            self.aggregates.add(ids[start:start + batch_size], [ch["metadata"] for ch in batch])
+
+    def _delete_ids(self, ids: List[str], batch_size: int = DEFAULT_BATCH_SIZE):
+        if not ids:
+            return
+        self._ensure_bm25()
+        self._ensure_aggregates()
+        for start in range(0, len(ids), batch_size):
+            self.collection.delete(ids=ids[start:start + batch_size])
+        if self.bm25 is not None:
+            self.bm25.remove(ids)
+        self.aggregates.remove(ids)
+
+    def _load_bm25(self, batch_size: int):
+        """Rebuild the in-process BM25 index from a persistent collection."""
+        print("📚 Building BM25 index from the stored reviews...")
+        offset = 0
+        while True:
+            page = self.collection.get(limit=batch_size, offset=offset, include=["documents", "metadatas"])
+            if not page["ids"]:
+                break
+            self.bm25.add(page["ids"], page["documents"], page["metadatas"])
+            offset += len(page["ids"])
+
+    def add_reviews(self, data_dir: str, aspect_keywords: List[str], columnar: bool = False,
+                    chunksize: Optional[int] = None, workers: int = 0,
+                    batch_size: int = DEFAULT_BATCH_SIZE, incremental: bool = False,
+                    near_dup_threshold: Optional[float] = None):
+        """Chunk every CSV in data_dir and add it to the vector store.
+
+        With workers > 0 files are chunked (columnar) and embedded in a
+        process pool and this process is the single writer, see
+        `_add_reviews_parallel`.
+        With incremental=True (requires persist_dir) only reviews that were
+        appended, changed or deleted since the last run are written, see
+        `_add_reviews_incremental`.
+        near_dup_threshold enables MinHash near-duplicate removal within each
+        file for the columnar, parallel and incremental paths.
+        """
+        from ingest import DEFAULT_CHUNKSIZE
+        chunksize = chunksize or DEFAULT_CHUNKSIZE
         print(f"📁 Scanning directory: {data_dir}")
         if not os.path.exists(data_dir):
             print(f"⚠️ Directory '{data_dir}' not found! Creating it now.")
@@ -60,70 +317,501 @@ class RAGAmazonReviews:
             return
         
         csv_files = [f for f in os.listdir(data_dir) if f.endswith('.csv')]
+        if incremental:
+            if self.manifest is None:
+                raise ValueError("Incremental ingest needs a persistent store; pass persist_dir.")
+            return self._add_reviews_incremental(data_dir, csv_files, aspect_keywords, chunksize, batch_size,
+                                                 near_dup_threshold)
         if not csv_files:
             print("⚠️ No CSV files found in the directory!")
             return
         
         print(f"📚 Found {len(csv_files)} CSV files to process")
+        if workers > 0:
+            return self._add_reviews_parallel(data_dir, csv_files, aspect_keywords, chunksize, workers, batch_size,
+                                              near_dup_threshold)
         for filename in csv_files:
             file_path = os.path.join(data_dir, filename)
+            if columnar:
+                # Add block by block instead of materializing the whole file
+                offset = 0
+                for chunks in self.iter_chunk_batches(file_path, aspect_keywords, chunksize, near_dup_threshold):
+                    if not chunks:
+                        continue
+                    print(f"💾 Adding {len(chunks)} chunks to vector store...")
+                    self._add_chunks(chunks, [f"{filename}_{offset + i}" for i in range(len(chunks))], batch_size)
+                    offset += len(chunks)
+                continue
             chunks = self.chunk_reviews(file_path, aspect_keywords)
             print(f"💾 Adding {len(chunks)} chunks to vector store...")
-            self.collection.add(
-                documents=[ch["text"] for ch in chunks],
-                metadatas=[ch["metadata"] for ch in chunks],
-                ids=[f"{filename}_{i}" for i in range(len(chunks))]
-            )
+            self._add_chunks(chunks, [f"{filename}_{i}" for i in range(len(chunks))], batch_size)
         print("🎉 All CSVs processed and added to the knowledge base!")
 
-    def query(self, question: str, product: str, aspect: str, n_results: int = 5) -> Tuple[str, List[Dict]]:
-        print("🔍 Searching for relevant reviews...")
-        query_str = f"{product} {aspect} {question}"
-        # Normalize inputs to lowercase for case-insensitive matching
-        normalized_product = product.lower()
-        normalized_aspect = aspect.lower()
-        results = self.collection.query(
-            query_texts=[query_str],
-            n_results=n_results * 2,  # Fetch more to account for potential duplicates
-            # Filter by product using exact match (case-sensitive), we'll handle case-insensitivity post-query
-        )
-        # De-duplicate and manually filter by product and aspect (case-insensitive)
-        unique_results = {}
-        for doc, meta in zip(results['documents'][0], results['metadatas'][0]):
-            meta_product = meta.get('product', '').lower()
-            meta_aspects = meta.get('aspects_str', '').lower().split(',')
-            if doc not in unique_results and normalized_product in meta_product and normalized_aspect in meta_aspects:
-                unique_results[doc] = meta
-        unique_docs = list(unique_results.keys())
-        unique_metas = list(unique_results.values())
-        print(f"📊 Found {len(unique_docs)} unique relevant chunks (after de-duplication and aspect filter)")
-        
-        if not unique_docs:
-            return "No relevant reviews found for the specified product and aspect. Try adjusting your query or adding more data.", []
-        
+    def _worker_embedding_function(self) -> Optional["EmbeddingFunction"]:
+        """The embedding function pool workers call, or None to leave embedding to the writer.
+
+        With an embedding cache the writer keeps embedding through it: the
+        cache's files are not safe to share between processes, and its hits
+        cost no model time.
+        """
+        return None if self._embedding_cache_dir else self.embedding_function
+
+    def _add_reviews_parallel(self, data_dir: str, csv_files: List[str], aspect_keywords: List[str],
+                              chunksize: int, workers: int, batch_size: int,
+                              near_dup_threshold: Optional[float] = None) -> List[Dict]:
+        """Chunk and embed files in a process pool and stream the batches to one writer.
+
+        Workers hand over embedded batches of `batch_size` chunks through a
+        queue of at most 2 * workers batches, so memory stays bounded whatever
+        the file sizes; this process only writes them. Returns per-file
+        throughput stats.
+        """
+        import multiprocessing
+        import queue
+        import threading
+        from ingest import embed_csv_file, init_worker
+        embedding_function = self._worker_embedding_function()
+        print(f"⚙️ Chunking{' and embedding' if embedding_function else ''} with {workers} worker processes...")
+        context = multiprocessing.get_context()
+        batches = context.Queue(maxsize=2 * workers)
+        received: Dict[str, int] = {}
+        write_seconds: Dict[str, float] = {}
+        finished: Dict[str, Dict] = {}  # Worker totals of files whose last batches may still be queued
+        stats = []
+        total_rows = 0
+        start = time.perf_counter()
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker,
+                                   initargs=(batches,))
+        try:
+            in_flight = {pool.submit(embed_csv_file, os.path.join(data_dir, filename), aspect_keywords, chunksize,
+                                     near_dup_threshold, embedding_function, batch_size)
+                         for filename in csv_files}
+            while in_flight or finished:
+                try:
+                    batch = batches.get(timeout=0.05)
+                except queue.Empty:
+                    batch = None
+                if batch is not None:
+                    filename = os.path.basename(batch["path"])
+                    chunks = batch["chunks"]
+                    write_start = time.perf_counter()
+                    self._add_chunks(chunks, [f"{filename}_{batch['offset'] + i}" for i in range(len(chunks))],
+                                     batch_size, embeddings=batch["embeddings"])
+                    write_seconds[filename] = write_seconds.get(filename, 0.0) + time.perf_counter() - write_start
+                    received[filename] = received.get(filename, 0) + len(chunks)
+                for future in [future for future in in_flight if future.done()]:
+                    in_flight.remove(future)
+                    result = future.result()  # Re-raises a worker's exception
+                    finished[os.path.basename(result["path"])] = result
+                for filename, result in list(finished.items()):
+                    if received.get(filename, 0) < result["chunks"]:
+                        continue
+                    del finished[filename]
+                    rows_per_sec = result["rows"] / max(result["seconds"], 1e-9)
+                    print(f"📈 {filename}: {result['rows']} rows -> {result['chunks']} chunks | "
+                          f"processed in {result['seconds']:.2f}s ({rows_per_sec:,.0f} rows/sec, "
+                          f"{result['embed_seconds']:.2f}s embedding), "
+                          f"written in {write_seconds.get(filename, 0.0):.2f}s")
+                    total_rows += result["rows"]
+                    self._count_near_duplicates(result["near_duplicates"])
+                    stats.append({
+                        "file": filename,
+                        "rows": result["rows"],
+                        "chunks": result["chunks"],
+                        "seconds": result["seconds"],
+                        "embed_seconds": result["embed_seconds"],
+                        "write_seconds": write_seconds.get(filename, 0.0),
+                    })
+        finally:
+            # A worker exits only once its queued batches are read, so keep draining while the pool shuts down
+            closing = threading.Thread(target=pool.shutdown, kwargs={"cancel_futures": True})
+            closing.start()
+            while closing.is_alive():
+                try:
+                    batches.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+        elapsed = time.perf_counter() - start
+        print(f"🎉 {len(stats)} CSVs ({total_rows} rows) ingested in {elapsed:.2f}s "
+              f"({total_rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+        return stats
+
+    def _add_reviews_incremental(self, data_dir: str, csv_files: List[str], aspect_keywords: List[str],
+                                 chunksize: int, batch_size: int,
+                                 near_dup_threshold: Optional[float] = None) -> Dict[str, int]:
+        """Upsert/delete only the reviews that differ from the manifest.
+
+        Unchanged files are skipped from their size/mtime (or, failing that,
+        their sha256). When a file only grew and its old bytes are intact, just
+        the appended rows are parsed. Otherwise the file is re-chunked and
+        diffed against the stored per-review digests.
+        """
+        import pandas as pd
+        from incremental import chunk_digest, hash_file, read_appended_rows, review_id
+        from ingest import AspectMatcher, SeenReviews, chunk_frame
+        from near_dup import NearDuplicateFilter
+        totals = {"skipped_files": 0, "upserted": 0, "deleted": 0}
+        for filename in sorted(set(self.manifest.files()) - set(csv_files)):
+            stale = list(self.manifest.review_digests(filename))
+            print(f"🗑️ {filename} was removed, deleting {len(stale)} reviews")
+            self._delete_ids(stale, batch_size)
+            self.manifest.forget(filename)
+            totals["deleted"] += len(stale)
+
+        for filename in csv_files:
+            file_path = os.path.join(data_dir, filename)
+            stat = os.stat(file_path)
+            previous = self.manifest.fingerprint(filename)
+            if previous and (previous["size"], previous["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                totals["skipped_files"] += 1
+                continue
+            prefix_bytes = previous["size"] if previous and stat.st_size > previous["size"] else None
+            sha256, prefix_sha256 = hash_file(file_path, prefix_bytes)
+            if previous and sha256 == previous["sha256"]:
+                # Touched but not modified
+                self.manifest.record(filename, stat.st_size, stat.st_mtime_ns, sha256, {}, [])
+                totals["skipped_files"] += 1
+                continue
+            old_digests = self.manifest.review_digests(filename) if previous else {}
+
+            appended = prefix_sha256 is not None and prefix_sha256 == previous["sha256"]
+            if appended:
+                with open(file_path, "rb") as f:
+                    f.seek(previous["size"] - 1)
+                    appended = f.read(1) == b"\n"
+            matcher = AspectMatcher(aspect_keywords)
+            near_dups = NearDuplicateFilter(near_dup_threshold) if near_dup_threshold else None
+            if appended:
+                # Near-duplicates are only detected within the appended rows here
+                print(f"➕ {filename}: parsing {stat.st_size - previous['size']} appended bytes")
+                chunks = chunk_frame(read_appended_rows(file_path, previous["size"]), matcher, near_dups=near_dups)
+            else:
+                print(f"🔄 {filename}: re-chunking and diffing against the manifest")
+                seen = SeenReviews()
+                chunks = [chunk for block in pd.read_csv(file_path, chunksize=chunksize)
+                          for chunk in chunk_frame(block, matcher, seen, near_dups)]
+            if near_dups is not None:
+                self._count_near_duplicates(near_dups.dropped)
+
+            new_digests = {}
+            changed_chunks = []
+            for chunk in chunks:
+                rid = review_id(filename, chunk["text"])
+                if appended and rid in old_digests:
+                    continue  # Repeats a review already stored from the old part of the file
+                digest = chunk_digest(chunk)
+                new_digests[rid] = digest
+                if old_digests.get(rid) != digest:
+                    changed_chunks.append((rid, chunk))
+            deleted = [] if appended else [rid for rid in old_digests if rid not in new_digests]
+
+            if changed_chunks:
+                self._add_chunks([chunk for _, chunk in changed_chunks], [rid for rid, _ in changed_chunks],
+                                 batch_size, upsert=True)
+            self._delete_ids(deleted, batch_size)
+            self.manifest.record(filename, stat.st_size, stat.st_mtime_ns, sha256,
+                                 {rid: new_digests[rid] for rid, _ in changed_chunks}, deleted)
+            print(f"✅ {filename}: {len(changed_chunks)} upserted, {len(deleted)} deleted")
+            totals["upserted"] += len(changed_chunks)
+            totals["deleted"] += len(deleted)
+
+        print(f"🎉 Incremental ingest done: {totals['upserted']} upserted, {totals['deleted']} deleted, "
+              f"{totals['skipped_files']} files unchanged")
+        return totals
+
+    def _resolve_products(self, product: str) -> List[str]:
+        normalized_product = product.lower().strip()
+        return sorted(p for p in self.products if normalized_product in p)
+
+    def _metadata_filter(self, product: str, aspect: str) -> Optional[Dict]:
+        """Build the where clause for a product/aspect query.
+
+        Products match case-insensitively by substring ("iphone" matches
+        "iphone 14"), resolved against the ingest-time product catalog into an
+        $in list. Returns None when nothing can match.
+        """
+        from ingest import aspect_field
+        products = self._resolve_products(product)
+        if not products:
+            return None
+        product_clause = {"product": products[0]} if len(products) == 1 else {"product": {"$in": products}}
+        return {"$and": [product_clause, {aspect_field(aspect.strip()): True}]}
+
+    def _candidate_count(self, n_results: int) -> int:
+        """How many dense hits to fetch: extra candidates are only needed for fusion."""
+        return n_results * HYBRID_CANDIDATE_FACTOR if self.bm25 is not None else n_results
+
+    def _fuse(self, query_str: str, product: str, aspect: str, ids: List[str], docs: List[str],
+              metas: List[Dict], n_results: int) -> Tuple[List[str], List[str], List[Dict]]:
+        """Merge dense hits with BM25 hits under the same filter (reciprocal rank fusion)."""
+        from bm25 import reciprocal_rank_fusion
+        from ingest import aspect_field
+        self._ensure_bm25()
+        lexical = self.bm25.search(query_str, self._candidate_count(n_results),
+                                   products=self._resolve_products(product),
+                                   aspect_field=aspect_field(aspect.strip()))
+        fused = reciprocal_rank_fusion([ids, [doc_id for doc_id, _ in lexical]],
+                                       weights=[1.0, HYBRID_LEXICAL_WEIGHT])[:n_results]
+        known = {doc_id: (doc, meta) for doc_id, doc, meta in zip(ids, docs, metas)}
+        missing = [doc_id for doc_id in fused if doc_id not in known]
+        if missing:
+            fetched = self.collection.get(ids=missing, include=["documents", "metadatas"])
+            known.update({doc_id: (doc, meta) for doc_id, doc, meta in
+                          zip(fetched["ids"], fetched["documents"], fetched["metadatas"])})
+        fused = [doc_id for doc_id in fused if doc_id in known]
+        return fused, [known[doc_id][0] for doc_id in fused], [known[doc_id][1] for doc_id in fused]
+
+    def _build_prompt(self, question: str, docs: List[str], metas: List[Dict]) -> str:
         context = "\n\n".join([
             f"{meta['product']} | Reviewer {meta['reviewer_id']} | Sentiment: {meta['sentiment']} | Aspects: {meta['aspects_str']}\n{text}"
-            for text, meta in zip(unique_docs, unique_metas)
+            for text, meta in zip(docs, metas)
         ])
-        print("🤖 Generating Gemini response...")
-        prompt = (
+        return (
             "Summarize the main pros and cons about the product, referencing reviewer IDs and aspects:\n"
             f"Context:\n{context}\n\n"
             f"Question: {question}\n"
             "Please cite product name and reviewer ID in your answer. Focus on common issues if asked."
         )
-        response = self.model.generate_content(prompt)
-        return response.text, unique_metas
+
+    def print_answer_cache_stats(self):
+        if self.answer_cache is None:
+            return
+        stats = self.answer_cache.stats()
+        print(f"⚡ Answer cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries")
+
+    def _generate_answer(self, question: str, ids: List[str], docs: List[str], metas: List[Dict]) -> str:
+        """Generate an answer from retrieved chunks, going through the answer cache."""
+        key = None
+        if self.answer_cache is not None:
+            key = AnswerCache.key(question, ids, docs, metas)
+            cached = self.answer_cache.get(key)
+            if cached is not None:
+                print("⚡ Answer served from cache")
+                return cached
+        print("🤖 Generating Gemini response...")
+        answer = self.model.generate_content(self._build_prompt(question, docs, metas)).text
+        if key is not None:
+            self.answer_cache.put(key, answer)
+        return answer
+
+    def _aggregate_answer(self, question: str, product: str, aspect: str) -> Optional[Tuple[str, List[Dict]]]:
+        """Answer count/ratio questions from the aggregate table, or None to take the RAG path.
+
+        Sources are a few representative reviews per sentiment.
+        """
+        if not is_aggregate_question(question):
+            return None
+        products = self._resolve_products(product)
+        if not products:
+            return None
+        self._ensure_aggregates()
+        summary = self.aggregates.summary(products, aspect.strip())
+        if summary is None:
+            return None
+        ids = [doc_id for sentiment in self.aggregates.sentiment_counts(products, aspect.strip())
+               for doc_id in self.aggregates.examples(products, aspect.strip(), sentiment)]
+        sources = self.collection.get(ids=ids, include=["metadatas"])["metadatas"] if ids else []
+        print("📊 Answered from the aspect aggregates (no LLM call)")
+        return summary, sources
+
+    def _retrieve(self, question: str, product: str, aspect: str,
+                  n_results: int) -> Tuple[List[str], List[str], List[Dict]]:
+        print("🔍 Searching for relevant reviews...")
+        query_str = f"{product} {aspect} {question}"
+        where = self._metadata_filter(product, aspect)
+        if where is None:
+            print("📊 No stored reviews match that product and aspect")
+            return [], [], []
+        # Product and aspect are filtered inside the vector store, so every hit is usable
+        results = self.collection.query(
+            query_texts=[query_str],
+            n_results=self._candidate_count(n_results),
+            where=where
+        )
+        ids = results['ids'][0]
+        docs = results['documents'][0]
+        metas = results['metadatas'][0]
+        if self.bm25 is not None:
+            ids, docs, metas = self._fuse(query_str, product, aspect, ids, docs, metas, n_results)
+        print(f"📊 Found {len(docs)} relevant chunks")
+        return ids, docs, metas
+
+    def query(self, question: str, product: str, aspect: str, n_results: int = 5) -> Tuple[str, List[Dict]]:
+        aggregated = self._aggregate_answer(question, product, aspect)
+        if aggregated is not None:
+            return aggregated
+        ids, docs, metas = self._retrieve(question, product, aspect, n_results)
+        if not docs:
+            return NO_RESULTS_ANSWER, []
+        
+        return self._generate_answer(question, ids, docs, metas), metas
+
+    def query_stream(self, question: str, product: str, aspect: str,
+                     n_results: int = 5) -> Tuple[List[Dict], Iterator[str]]:
+        """Like query, but return the sources right away and the answer as a token iterator.
+
+        Retrieval happens before this returns, so sources can be shown while
+        Gemini is still writing. Timings of the last stream are kept in
+        self.last_stream_stats (time to first token, total time, chunks).
+        """
+        self.last_stream_stats = None
+        aggregated = self._aggregate_answer(question, product, aspect)
+        if aggregated is not None:
+            answer, sources = aggregated
+            return sources, iter([answer])
+        ids, docs, metas = self._retrieve(question, product, aspect, n_results)
+        if not docs:
+            return [], iter([NO_RESULTS_ANSWER])
+        return metas, self._stream_answer(question, ids, docs, metas)
+
+    def _stream_answer(self, question: str, ids: List[str], docs: List[str], metas: List[Dict]) -> Iterator[str]:
+        start = time.perf_counter()
+        key = None
+        if self.answer_cache is not None:
+            key = AnswerCache.key(question, ids, docs, metas)
+            cached = self.answer_cache.get(key)
+            if cached is not None:
+                self.last_stream_stats = {"ttft": time.perf_counter() - start,
+                                          "total": time.perf_counter() - start, "chunks": 1, "cached": True}
+                yield cached
+                return
+        parts = []
+        ttft = None
+        for chunk in self.model.generate_content(self._build_prompt(question, docs, metas), stream=True):
+            text = chunk.text
+            if not text:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            parts.append(text)
+            yield text
+        total = time.perf_counter() - start
+        self.last_stream_stats = {"ttft": total if ttft is None else ttft, "total": total,
+                                  "chunks": len(parts), "cached": False}
+        # Only complete answers are cached; an abandoned stream never reaches this point
+        if key is not None:
+            self.answer_cache.put(key, "".join(parts))
+
+    def answer_batch(self, input_path: str, output_path: str, n_results: int = 5,
+                     max_concurrency: int = 8) -> Dict[str, int]:
+        """Answer a file of (question, product, aspect) triples, streaming JSONL results.
+
+        All query strings are embedded in one call, lookups sharing a
+        product/aspect filter go to Chroma together, and Gemini calls fan out
+        over at most `max_concurrency` threads. Each result is written (and
+        flushed) as soon as its generation finishes, so the output order is
+        completion order; every line carries the input `index`. Count/ratio
+        questions are answered from the aspect aggregates and skip both.
+        """
+        items = load_question_batch(input_path)
+        print(f"📦 Answering {len(items)} questions from {input_path}")
+        start = time.perf_counter()
+        aggregated = {}
+        for i, item in enumerate(items):
+            answer = self._aggregate_answer(item["question"], item["product"], item["aspect"])
+            if answer is not None:
+                aggregated[i] = answer
+        if aggregated:
+            print(f"📊 {len(aggregated)} count/ratio questions answered from the aspect aggregates")
+        pending = [i for i in range(len(items)) if i not in aggregated]
+        vectors = self.embedding_function(
+            [f"{items[i]['product']} {items[i]['aspect']} {items[i]['question']}" for i in pending]
+        ) if pending else []
+        embeddings = dict(zip(pending, vectors))
+
+        # Group lookups by filter: Chroma applies one where clause per query call
+        retrieved: Dict[int, Tuple[List[str], List[str], List[Dict]]] = {}
+        groups: Dict[str, List[int]] = {}
+        filters: Dict[str, Dict] = {}
+        for i in pending:
+            item = items[i]
+            where = self._metadata_filter(item["product"], item["aspect"])
+            if where is None:
+                retrieved[i] = ([], [], [])
+                continue
+            key = json.dumps(where, sort_keys=True)
+            filters[key] = where
+            groups.setdefault(key, []).append(i)
+        for key, indices in groups.items():
+            results = self.collection.query(
+                query_embeddings=[embeddings[i] for i in indices],
+                n_results=self._candidate_count(n_results),
+                where=filters[key]
+            )
+            for pos, i in enumerate(indices):
+                hits = (results['ids'][pos], results['documents'][pos], results['metadatas'][pos])
+                if self.bm25 is not None:
+                    item = items[i]
+                    hits = self._fuse(f"{item['product']} {item['aspect']} {item['question']}",
+                                      item["product"], item["aspect"], *hits, n_results)
+                retrieved[i] = hits
+        print(f"🔍 Retrieved context for {len(pending)} questions with {len(groups)} vector queries")
+
+        def generate(i: int) -> Dict:
+            item = items[i]
+            if i in aggregated:
+                answer, sources = aggregated[i]
+                return {"index": i, **item, "sources": sources, "answer": answer, "seconds": 0.0}
+            ids, docs, metas = retrieved[i]
+            record = {"index": i, **item, "sources": metas}
+            started = time.perf_counter()
+            try:
+                if docs:
+                    record["answer"] = self._generate_answer(item["question"], ids, docs, metas)
+                else:
+                    record["answer"] = NO_RESULTS_ANSWER
+            except Exception as e:
+                record["error"] = str(e)
+            record["seconds"] = round(time.perf_counter() - started, 3)
+            return record
+
+        counts = {"answered": 0, "failed": 0}
+        with open(output_path, "w", encoding="utf-8") as out, \
+                ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            for future in as_completed([pool.submit(generate, i) for i in range(len(items))]):
+                record = future.result()
+                counts["failed" if "error" in record else "answered"] += 1
+                out.write(json.dumps(record, default=str) + "\n")
+                out.flush()
+        elapsed = time.perf_counter() - start
+        print(f"🎉 {counts['answered']} answered, {counts['failed']} failed in {elapsed:.2f}s -> {output_path}")
+        self.print_answer_cache_stats()
+        return counts
 
 def main():
+    parser = argparse.ArgumentParser(description="RAG QA over Amazon product reviews.")
+    parser.add_argument("--data-dir", default="/Users/subashkannan/Desktop/agentic-learning-main/day_2/task_1/data/",
+                        help="directory of review CSVs (product, review_text, reviewer_id, [sentiment])")
+    parser.add_argument("--batch", metavar="INPUT",
+                        help="answer a .csv/.jsonl file of question,product,aspect triples instead of prompting")
+    parser.add_argument("--output", default="answers.jsonl", help="JSONL file for --batch results")
+    parser.add_argument("--concurrency", type=int, default=8, help="max concurrent Gemini calls for --batch")
+    parser.add_argument("--hybrid", action="store_true", help="fuse BM25 keyword search with vector search")
+    parser.add_argument("--quantized", action="store_true",
+                        help="keep int8 vectors in memory (float re-rank from disk) instead of Chroma's float index")
+    args = parser.parse_args()
+
     print("🚀 Starting RAG System for Amazon Reviews...")
     print("=" * 50)
-    rag = RAGAmazonReviews()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    rag = RAGAmazonReviews(embedding_cache_dir=os.path.join(base_dir, ".embedding_cache"),
+                           persist_dir=os.path.join(base_dir, ".quantized_reviews" if args.quantized
+                                                    else ".chroma_reviews"),
+                           hybrid=args.hybrid, quantized=args.quantized)
     # Define product review aspects of interest
     ASPECTS = ["battery", "camera", "screen", "performance", "price", "design"]  # Expand as needed
     # Add reviews (expects data dir with CSVs: columns must be product, review_text, reviewer_id, [sentiment])
     print("\n📋 Processing Amazon review CSVs...")
-    rag.add_reviews("/Users/subashkannan/Desktop/agentic-learning-main/day_2/task_1/data/", ASPECTS)
+    rag.add_reviews(args.data_dir, ASPECTS, incremental=True)
+    if rag.embedding_cache is not None:
+        stats = rag.embedding_cache.stats()
+        print(f"🧊 Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries, {stats['bytes'] / 1e6:.1f} MB")
+
+    if args.batch:
+        rag.answer_batch(args.batch, args.output, max_concurrency=args.concurrency)
+        return
     
     print("\n" + "=" * 50)
     print("🎯 RAG System Ready! Type 'quit' to exit.")
@@ -134,22 +822,28 @@ def main():
         try:
             question = input("\n❓ Enter your question: ")
             if question.lower() in ['quit', 'exit', 'q']:
+                rag.print_answer_cache_stats()
                 print("👋 Thank you for using RAG QA for Amazon Reviews!")
                 break
             product = input("🛒 Enter product name: ")
             aspect = input("🔑 Enter aspect (battery, camera, etc.): ")
             
             print("\n🔄 Processing your query...")
-            answer, sources = rag.query(question, product, aspect)
+            sources, tokens = rag.query_stream(question, product, aspect)
             
             print("\n" + "=" * 50)
-            print("Answer:")
-            print("-" * 50)
-            print(answer)
-            print("\n📚 Sources:")
+            print("📚 Sources:")
             print("-" * 50)
             for i, source in enumerate(sources, 1):
                 print(f"{i}. {source['product']} | Reviewer: {source['reviewer_id']} | Aspects: {source['aspects_str']} | Sentiment: {source['sentiment']}")
+            print("\nAnswer:")
+            print("-" * 50)
+            for token in tokens:
+                print(token, end="", flush=True)
+            print()
+            if rag.last_stream_stats and sources:
+                stats = rag.last_stream_stats
+                print(f"⏱️ First token after {stats['ttft'] * 1000:.0f} ms, full answer in {stats['total']:.2f}s")
             print("=" * 50)
             
         except KeyboardInterrupt:
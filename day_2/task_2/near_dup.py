@@ -0,0 +1,139 @@
+"""Streaming near-duplicate filter for reviews (MinHash + LSH).
+
+Each review is reduced to a MinHash signature over k-byte shingles. The
+signature is split into bands; reviews sharing any band bucket are
+candidates, and a candidate is a duplicate when the estimated Jaccard
+similarity reaches the threshold. Only the most recent `max_signatures`
+kept reviews are remembered, so memory stays bounded on endless streams.
+"""
+from collections import deque
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 64
+DEFAULT_MAX_SIGNATURES = 1_000_000
+PASS_SHINGLES = 1_000_000  # Approximate shingles hashed per signature pass (one text may exceed it)
+PERM_SLICE = 8  # Permutations applied at once; with PASS_SHINGLES bounds the permuted matrix to ~64 MB
+
+
+def choose_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Pick (bands, rows) whose S-curve midpoint (1/b)^(1/r) is closest to threshold."""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class NearDuplicateFilter:
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                 shingle_size: int = 5, max_signatures: int = DEFAULT_MAX_SIGNATURES, seed: int = 1):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.max_signatures = max_signatures
+        self.bands, self.rows = choose_bands(threshold, num_perm)
+        self._min_matches = threshold * num_perm
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: (a * h + b) mod 2**64 keeps its top 32 bits, no modulo needed
+        self._a = rng.integers(0, np.iinfo(np.uint64).max, num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+        self._b = rng.integers(0, np.iinfo(np.uint64).max, num_perm, dtype=np.uint64, endpoint=True)
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._order: deque = deque()
+        self._next_id = 0
+        self.checked = 0
+        self.dropped = 0
+
+    def _shingle_hashes(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """32-bit hashes of every k-byte shingle, plus the start offset of each text.
+
+        All texts are joined with NUL separators and hashed with one sliding
+        window pass; windows that straddle a separator are dropped. Repeated
+        shingles are kept since they do not change the minimum.
+        """
+        k = self.shingle_size
+        cleaned = [" ".join(t.replace("\0", " ").lower().split()).encode("utf-8").ljust(k) for t in texts]
+        joined = np.frombuffer(b"\0".join(cleaned), dtype=np.uint8)
+        windows = np.lib.stride_tricks.sliding_window_view(joined, k)
+        valid = ~(windows == 0).any(axis=1)
+        powers = np.uint64(257) ** np.arange(k - 1, -1, -1, dtype=np.uint64)
+        hashes = (windows[valid].astype(np.uint64) @ powers) * np.uint64(0x9E3779B1) & np.uint64(0xFFFFFFFF)
+        counts = np.array([len(c) - k + 1 for c in cleaned])
+        return hashes, np.concatenate([[0], np.cumsum(counts[:-1])])
+
+    def _passes(self, texts: List[str]) -> List[Tuple[int, int]]:
+        """(start, stop) text ranges of about PASS_SHINGLES shingles each, whatever the review length."""
+        passes, start, size = [], 0, 0
+        for i, text in enumerate(texts):
+            if size and size + len(text) > PASS_SHINGLES:
+                passes.append((start, i))
+                start, size = i, 0
+            size += len(text)
+        if start < len(texts):
+            passes.append((start, len(texts)))
+        return passes
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """(len(texts), num_perm) MinHash signatures.
+
+        Texts are hashed in passes of about PASS_SHINGLES shingles and the
+        permutations applied PERM_SLICE at a time into one reused buffer, so
+        peak memory does not grow with the number or length of the reviews.
+        """
+        result = np.empty((len(texts), self._a.size), dtype=np.uint64)
+        for start, stop in self._passes(texts):
+            hashes, offsets = self._shingle_hashes(texts[start:stop])
+            buffer = np.empty((min(PERM_SLICE, self._a.size), hashes.size), dtype=np.uint64)
+            for first in range(0, self._a.size, PERM_SLICE):
+                a, b = self._a[first:first + PERM_SLICE], self._b[first:first + PERM_SLICE]
+                permuted = buffer[:a.size]
+                np.multiply(a[:, None], hashes, out=permuted)
+                permuted += b[:, None]
+                permuted >>= np.uint64(32)
+                result[start:stop, first:first + a.size] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        return result
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.signatures([text])[0]
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _forget_oldest(self) -> None:
+        old_id, keys = self._order.popleft()
+        del self._signatures[old_id]
+        for band, key in zip(self._buckets, keys):
+            members = band.get(key)
+            if members is not None:
+                members.remove(old_id)
+                if not members:
+                    del band[key]
+
+    def _check(self, signature: np.ndarray) -> bool:
+        """Check one signature and remember it if it is new."""
+        self.checked += 1
+        keys = self._band_keys(signature)
+        candidates = set()
+        for band, key in zip(self._buckets, keys):
+            candidates.update(band.get(key, ()))
+        for candidate in candidates:
+            if np.count_nonzero(self._signatures[candidate] == signature) >= self._min_matches:
+                self.dropped += 1
+                return True
+        doc_id = self._next_id
+        self._next_id += 1
+        self._signatures[doc_id] = signature.copy()  # A row view would keep the caller's whole block alive
+        self._order.append((doc_id, keys))
+        for band, key in zip(self._buckets, keys):
+            band.setdefault(key, []).append(doc_id)
+        if len(self._signatures) > self.max_signatures:
+            self._forget_oldest()
+        return False
+
+    def is_duplicate(self, text: str) -> bool:
+        return self._check(self.signature(text))
+
+    def filter_new(self, texts: List[str]) -> np.ndarray:
+        """Mask of reviews that are not near-duplicates of anything seen so far."""
+        if not texts:
+            return np.zeros(0, dtype=bool)
+        return np.array([not self._check(sig) for sig in self.signatures(texts)], dtype=bool)
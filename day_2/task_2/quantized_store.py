@@ -0,0 +1,297 @@
+"""Int8-quantized review store with a float re-rank, for indexes too big for RAM.
+
+Each embedding is scaled into int8 (one float scale per vector) and kept in
+memory, roughly 4x smaller than float32. The full-precision vectors are
+appended to a flat float32 file that is memory-mapped, so only the pages of
+re-ranked candidates are read. Documents and metadata live in SQLite; the
+product and aspect columns needed for filtering stay in memory as compact
+arrays, like the BM25 index.
+
+Upserts and deletes tombstone rows; once more than COMPACT_DEAD_FRACTION of
+the rows are dead, the live ones are copied to a new float file and the int8
+columns shrink to match.
+
+QuantizedReviewStore implements the subset of the Chroma collection API that
+RAGAmazonReviews uses (add, upsert, delete, get, query, count). Searches are
+exact scans over the int8 codes, not an approximate graph.
+"""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
+
+# Shared helpers live in <repo>/common
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.cache_utils import in_batches
+from ingest import aspect_mask
+
+DEFAULT_RERANK_FACTOR = 8  # Int8 candidates per requested result that get a float re-rank
+SCAN_BLOCK = 16_384  # Rows per int8 scan step; bounds the float temporary
+COMPACT_DEAD_FRACTION = 0.25  # Share of tombstoned rows that triggers a compaction
+
+
+def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8 quantization: vectors ~= codes * scales[:, None]."""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class QuantizedReviewStore:
+    def __init__(self, path: Optional[str], embedding_function: EmbeddingFunction,
+                 rerank_factor: int = DEFAULT_RERANK_FACTOR):
+        self._tmp = None
+        if path is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="quantized_reviews_")
+            path = self._tmp.name
+        os.makedirs(path, exist_ok=True)
+        self.embedding_function = embedding_function
+        self.rerank_factor = rerank_factor
+        self.path = path
+        self.db = sqlite3.connect(os.path.join(path, "reviews.sqlite3"), check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS reviews "
+                        "(id TEXT PRIMARY KEY, row INTEGER, document TEXT, metadata TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        # Compaction writes a new float file; SQLite names the current one, so a crash leaves the old or the new
+        row = self.db.execute("SELECT value FROM meta WHERE name = 'vectors_file'").fetchone()
+        self.vectors_path = os.path.join(path, row[0] if row else "vectors.f32")
+        row = self.db.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+        self.dim: Optional[int] = int(row[0]) if row else None
+        self._mmap: Optional[np.memmap] = None
+        self._rows = 0
+        self.codes = np.zeros((0, self.dim or 0), dtype=np.int8)
+        self.scales = np.zeros(0, dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float32)  # Squared norms of the float vectors
+        self.alive = np.zeros(0, dtype=bool)
+        self.products = np.zeros(0, dtype=np.int32)
+        self.aspects = np.zeros(0, dtype=np.uint64)  # Bitmask over self.aspect_codes
+        self.product_codes: Dict[str, int] = {}
+        self.aspect_codes: Dict[str, int] = {}
+        self.row_ids: Dict[int, str] = {}
+        self.id_rows: Dict[str, int] = {}
+        if self.dim is not None:
+            self._reload()
+
+    # ---- storage -----------------------------------------------------
+
+    def _grow(self, extra: int) -> None:
+        needed = self._rows + extra
+        if needed <= len(self.alive):
+            return
+        capacity = max(needed, 2 * len(self.alive), 1024)
+        codes = np.zeros((capacity, self.dim), dtype=np.int8)
+        codes[:len(self.codes)] = self.codes
+        self.codes = codes
+        for name in ("scales", "norms", "alive", "products", "aspects"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def _vectors(self) -> np.memmap:
+        """Read-only memmap of the float file, reopened when it has grown."""
+        if self._mmap is None or self._mmap.shape[0] != self._rows:
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._rows, self.dim))
+        return self._mmap
+
+    def _index_rows(self, rows: np.ndarray, vectors: np.ndarray, metadatas: List[Dict]) -> None:
+        self.codes[rows], self.scales[rows] = quantize(vectors)
+        self.norms[rows] = np.einsum("ij,ij->i", vectors, vectors)
+        self.alive[rows] = True
+        self.products[rows] = [self.product_codes.setdefault(m.get("product", ""), len(self.product_codes))
+                               for m in metadatas]
+        self.aspects[rows] = [aspect_mask(m, self.aspect_codes) for m in metadatas]
+
+    def _reload(self) -> None:
+        """Rebuild the in-memory columns from the float file and SQLite."""
+        rows = os.path.getsize(self.vectors_path) // (4 * self.dim) if os.path.exists(self.vectors_path) else 0
+        self.codes = np.zeros((0, self.dim), dtype=np.int8)
+        self._grow(rows)
+        self._rows = rows
+        vectors = self._vectors()
+        cursor = self.db.execute("SELECT id, row, metadata FROM reviews ORDER BY row")
+        while True:
+            page = cursor.fetchmany(SCAN_BLOCK)
+            if not page:
+                break
+            rows = np.array([row for _, row, _ in page])
+            self._index_rows(rows, np.asarray(vectors[rows]), [json.loads(meta) for _, _, meta in page])
+            for doc_id, row, _ in page:
+                self.row_ids[row] = doc_id
+                self.id_rows[doc_id] = row
+
+    # ---- collection API ----------------------------------------------
+
+    def count(self) -> int:
+        return len(self.id_rows)
+
+    def add(self, ids: List[str], documents: List[str], metadatas: List[Dict],
+            embeddings: Optional[List] = None) -> None:
+        duplicates = [doc_id for doc_id in ids if doc_id in self.id_rows]
+        if duplicates:
+            raise ValueError(f"IDs already stored: {duplicates[:5]}")
+        self.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict],
+               embeddings: Optional[List] = None) -> None:
+        if not ids:
+            return
+        if embeddings is None:
+            embeddings = self.embedding_function(list(documents))
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self.codes = np.zeros((0, self.dim), dtype=np.int8)
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('dim', ?)", (str(self.dim),))
+        # An upserted ID gets a fresh row; the old row is tombstoned
+        self._tombstone([doc_id for doc_id in ids if doc_id in self.id_rows])
+        rows = np.arange(self._rows, self._rows + len(ids))
+        self._grow(len(ids))
+        with open(self.vectors_path, "ab") as f:
+            f.write(vectors.tobytes())
+        self._rows += len(ids)
+        self._index_rows(rows, vectors, metadatas)
+        for doc_id, row in zip(ids, rows.tolist()):
+            self.row_ids[row] = doc_id
+            self.id_rows[doc_id] = row
+        self.db.executemany("INSERT OR REPLACE INTO reviews VALUES (?, ?, ?, ?)",
+                            [(doc_id, row, doc, json.dumps(meta))
+                             for doc_id, row, doc, meta in zip(ids, rows.tolist(), documents, metadatas)])
+        self.db.commit()
+        self._maybe_compact()
+
+    def _tombstone(self, ids: List[str]) -> None:
+        for doc_id in ids:
+            row = self.id_rows.pop(doc_id)
+            del self.row_ids[row]
+            self.alive[row] = False
+
+    def delete(self, ids: List[str]) -> None:
+        ids = [doc_id for doc_id in ids if doc_id in self.id_rows]
+        self._tombstone(ids)
+        self.db.executemany("DELETE FROM reviews WHERE id = ?", [(doc_id,) for doc_id in ids])
+        self.db.commit()
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        if self._rows - len(self.id_rows) > COMPACT_DEAD_FRACTION * self._rows:
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop tombstoned rows from the float file and the in-memory columns, renumbering the live rows."""
+        live = np.flatnonzero(self.alive[:self._rows])
+        old_path = self.vectors_path
+        parts = os.path.basename(old_path).split(".")  # vectors.f32, then vectors.<generation>.f32
+        name = f"vectors.{int(parts[1]) + 1 if len(parts) == 3 else 1}.f32"
+        new_path = os.path.join(self.path, name)
+        vectors = self._vectors()
+        with open(new_path, "wb") as f:
+            for start in range(0, len(live), SCAN_BLOCK):
+                f.write(np.ascontiguousarray(vectors[live[start:start + SCAN_BLOCK]]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self._mmap = None
+        del vectors
+        moved = [(new_row, self.row_ids[old_row]) for new_row, old_row in enumerate(live.tolist())]
+        with self.db:
+            self.db.executemany("UPDATE reviews SET row = ? WHERE id = ?", moved)
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('vectors_file', ?)", (name,))
+        self.vectors_path = new_path
+        if os.path.exists(old_path):
+            os.remove(old_path)
+        self.codes = self.codes[live]
+        for column in ("scales", "norms", "alive", "products", "aspects"):
+            setattr(self, column, getattr(self, column)[live])
+        self._rows = len(live)
+        self.row_ids = {new_row: doc_id for new_row, doc_id in moved}
+        self.id_rows = {doc_id: new_row for new_row, doc_id in moved}
+
+    def _fetch(self, ids: List[str]) -> Dict[str, Tuple[str, Dict]]:
+        found: Dict[str, Tuple[str, Dict]] = {}
+        for batch, placeholders in in_batches(ids):
+            for doc_id, doc, meta in self.db.execute(
+                    f"SELECT id, document, metadata FROM reviews WHERE id IN ({placeholders})", batch):
+                found[doc_id] = (doc, json.loads(meta))
+        return found
+
+    def get(self, ids: Optional[List[str]] = None, limit: Optional[int] = None, offset: int = 0,
+            include: Optional[List[str]] = None) -> Dict[str, List]:
+        if ids is None:
+            page = self.db.execute("SELECT id FROM reviews ORDER BY row LIMIT ? OFFSET ?",
+                                   (-1 if limit is None else limit, offset)).fetchall()
+            ids = [doc_id for doc_id, in page]
+        found = self._fetch(list(ids))
+        ids = [doc_id for doc_id in ids if doc_id in found]
+        return {
+            "ids": ids,
+            "documents": [found[doc_id][0] for doc_id in ids],
+            "metadatas": [found[doc_id][1] for doc_id in ids],
+        }
+
+    def _filter_mask(self, where: Optional[Dict]) -> np.ndarray:
+        """Rows allowed by a where clause built from $and, equality and $in."""
+        mask = self.alive[:self._rows].copy()
+        if not where:
+            return mask
+        if "$and" in where:
+            for clause in where["$and"]:
+                mask &= self._filter_mask(clause)
+            return mask
+        (field, condition), = where.items()
+        values = condition["$in"] if isinstance(condition, dict) and "$in" in condition else \
+            [condition["$eq"] if isinstance(condition, dict) else condition]
+        if field == "product":
+            codes = [self.product_codes[v] for v in values if v in self.product_codes]
+            return mask & np.isin(self.products[:self._rows], codes)
+        if field.startswith("aspect_") and values == [True]:
+            code = self.aspect_codes.get(field)
+            if code is None:
+                return np.zeros_like(mask)
+            return mask & ((self.aspects[:self._rows] >> np.uint64(code)) & np.uint64(1) == 1)
+        raise ValueError(f"QuantizedReviewStore cannot filter on {where}")
+
+    def _search(self, query: np.ndarray, candidates: np.ndarray, n_results: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top rows by squared L2 distance: int8 scan, then exact re-rank from the float file."""
+        shortlist_size = min(len(candidates), n_results * self.rerank_factor)
+        approx = np.empty(len(candidates), dtype=np.float32)
+        for start in range(0, len(candidates), SCAN_BLOCK):
+            rows = candidates[start:start + SCAN_BLOCK]
+            dots = (self.codes[rows] @ query) * self.scales[rows]
+            approx[start:start + SCAN_BLOCK] = self.norms[rows] - 2 * dots
+        shortlist = candidates[np.argpartition(approx, shortlist_size - 1)[:shortlist_size]]
+        shortlist.sort()  # Sequential reads from the memmap
+        exact = np.asarray(self._vectors()[shortlist])
+        distances = ((exact - query) ** 2).sum(axis=1)
+        top = np.argsort(distances, kind="stable")[:n_results]
+        return shortlist[top], distances[top]
+
+    def query(self, query_texts: Optional[List[str]] = None, query_embeddings: Optional[List] = None,
+              n_results: int = 10, where: Optional[Dict] = None) -> Dict[str, List]:
+        if query_embeddings is None:
+            query_embeddings = self.embedding_function(list(query_texts))
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        candidates = np.flatnonzero(self._filter_mask(where)) if self.dim is not None else np.zeros(0, dtype=int)
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query in queries:
+            if len(candidates):
+                rows, distances = self._search(query, candidates, n_results)
+            else:
+                rows, distances = np.zeros(0, dtype=int), np.zeros(0, dtype=np.float32)
+            ids = [self.row_ids[row] for row in rows.tolist()]
+            found = self._fetch(ids)
+            results["ids"].append(ids)
+            results["documents"].append([found[doc_id][0] for doc_id in ids])
+            results["metadatas"].append([found[doc_id][1] for doc_id in ids])
+            results["distances"].append(distances.tolist())
+        return results
+
+    def nbytes(self) -> int:
+        """Resident size of the int8 codes and per-row columns (the float file stays on disk)."""
+        columns = (self.codes, self.scales, self.norms, self.alive, self.products, self.aspects)
+        return sum(column[:self._rows].nbytes for column in columns)
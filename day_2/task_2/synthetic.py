@@ -0,0 +1,101 @@
+"""Synthetic review data for the benchmarks, scaled up from the bundled CSVs."""
+import glob
+import os
+import re
+import time
+import zlib
+from types import SimpleNamespace
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+PREFIXES = ["", "Honestly, ", "After two weeks: ", "Update - ", "Overall, "]
+SUFFIXES = ["", " Would recommend.", " Not sure yet.", " Returned it.", " Five stars.", " Meh."]
+MODEL_SUFFIXES = ["", " Pro", " Plus", " Ultra", " Lite"]
+
+
+def load_bundled_reviews() -> pd.DataFrame:
+    """Concatenate the CSVs shipped in data/."""
+    frames = [pd.read_csv(path) for path in sorted(glob.glob(os.path.join(DATA_DIR, "*.csv")))]
+    return pd.concat(frames, ignore_index=True)
+
+
+def make_reviews(n_rows: int, seed: int = 0, duplicate_rate: float = 0.1,
+                 base: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Build `n_rows` reviews by recombining and perturbing the bundled ones.
+
+    Roughly `duplicate_rate` of the rows repeat an earlier review verbatim so
+    the de-duplication path gets exercised.
+    """
+    rng = np.random.default_rng(seed)
+    base = load_bundled_reviews() if base is None else base
+    pick = rng.integers(0, len(base), n_rows)
+    products = base["product"].to_numpy()[pick] + np.array(MODEL_SUFFIXES, dtype=object)[
+        rng.integers(0, len(MODEL_SUFFIXES), n_rows)]
+    texts = (np.array(PREFIXES, dtype=object)[rng.integers(0, len(PREFIXES), n_rows)]
+             + base["review_text"].to_numpy()[pick]
+             + np.array(SUFFIXES, dtype=object)[rng.integers(0, len(SUFFIXES), n_rows)]
+             + " #" + rng.integers(0, n_rows, n_rows).astype(str).astype(object))
+    dup = rng.random(n_rows) < duplicate_rate
+    dup[0] = False
+    texts[dup] = texts[rng.integers(0, n_rows, n_rows) % np.maximum(np.arange(n_rows), 1)][dup]
+    return pd.DataFrame({
+        "product": products,
+        "review_text": texts,
+        "reviewer_id": [f"syn{i:08d}" for i in range(n_rows)],
+        "sentiment": base["sentiment"].to_numpy()[pick],
+    })
+
+
+def write_reviews_csv(path: str, n_rows: int, seed: int = 0, duplicate_rate: float = 0.1) -> str:
+    make_reviews(n_rows, seed=seed, duplicate_rate=duplicate_rate).to_csv(path, index=False)
+    return path
+
+
+class HashingEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Cheap deterministic bag-of-words embeddings so benchmarks need no model download."""
+
+    def __init__(self, dim: int = 128):
+        self.dim = dim
+
+    def __call__(self, input: Documents) -> Embeddings:
+        vectors = np.zeros((len(input), self.dim), dtype=np.float32)
+        for i, text in enumerate(input):
+            for token in re.findall(r"\w+", text.lower()):
+                h = zlib.crc32(token.encode("utf-8"))
+                vectors[i, h % self.dim] += 1.0 if h & 1 << 31 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return list(vectors / np.maximum(norms, 1e-9))
+
+
+class FakeStreamingModel:
+    """Stand-in for genai.GenerativeModel that emits a canned answer on a timer.
+
+    The first token arrives after `first_token_delay` seconds and each later
+    token `token_interval` seconds apart, roughly like a hosted LLM.
+    """
+
+    def __init__(self, n_tokens: int = 200, first_token_delay: float = 0.5, token_interval: float = 0.02):
+        self.n_tokens = n_tokens
+        self.first_token_delay = first_token_delay
+        self.token_interval = token_interval
+        self.calls = 0
+
+    def _tokens(self, prompt: str) -> Iterator[str]:
+        words = re.findall(r"\w+", prompt) or ["ok"]
+        time.sleep(self.first_token_delay)
+        for i in range(self.n_tokens):
+            if i:
+                time.sleep(self.token_interval)
+            yield words[i % len(words)] + " "
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        self.calls += 1
+        chunks = (SimpleNamespace(text=token) for token in self._tokens(prompt))
+        if stream:
+            return chunks
+        return SimpleNamespace(text="".join(chunk.text for chunk in chunks))
@@ -0,0 +1,97 @@
+"""Batch mode: build resource lists for many topics with one compiled workflow.
+
+Topics run concurrently in a single event loop, at most `workers` at a time
+(each topic still fans its own questions out, see research.py). A topic that
+fails is recorded in the run summary and does not stop the batch; rerunning
+the batch resumes it from its journal, and finished topics cost nothing.
+With `resume`, topics continue from their last checkpointed node instead.
+"""
+import asyncio
+import os
+import time
+from typing import Dict, Iterable, List
+
+from research import _describe
+from workflow import NoCheckpointError, ResourceListWorkflow, topic_filename
+
+DEFAULT_WORKERS = 4  # Topics in flight at once
+SUMMARY_FILENAME = "run_summary.md"
+
+
+def read_topics(path: str) -> List[str]:
+    """One topic per line; blank lines and '#' comments are skipped."""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+
+def unique_topics(topics: Iterable[str]) -> List[str]:
+    """Drop topics that would overwrite an earlier topic's file ("Data Analytics" vs "data analytics")."""
+    seen = {}
+    for topic in topics:
+        seen.setdefault(topic_filename(topic), topic.strip())
+    return list(seen.values())
+
+
+async def _run_topic(workflow: ResourceListWorkflow, topic: str, output_dir: str, fresh: bool, resume: bool,
+                     limiter: asyncio.Semaphore) -> Dict:
+    async with limiter:
+        start = time.perf_counter()
+        result = {'topic': topic, 'file': None, 'questions': 0, 'incomplete': 0, 'error': None}
+        try:
+            state = None
+            if resume:
+                try:
+                    state = await workflow.aresume(topic)
+                except NoCheckpointError:  # The topic never started
+                    pass
+            if state is None:
+                state = await workflow.arun(topic, output_dir, fresh)
+            result['questions'] = len(state['resources'])
+            result['incomplete'] = sum('error' in r for r in state['resources'])
+            result['file'] = state['file']
+            print(f"Markdown file saved as: {state['file']}")
+        except Exception as e:
+            result['error'] = _describe(e)
+            print(f"Warning: topic '{topic}' failed ({result['error']})")
+        result['seconds'] = time.perf_counter() - start
+        return result
+
+
+async def arun_batch(workflow: ResourceListWorkflow, topics: Iterable[str], output_dir: str = ".",
+                     workers: int = DEFAULT_WORKERS, fresh: bool = False, resume: bool = False) -> List[Dict]:
+    limiter = asyncio.Semaphore(workers)
+    return list(await asyncio.gather(*(_run_topic(workflow, topic, output_dir, fresh, resume, limiter)
+                                       for topic in unique_topics(topics))))
+
+
+def run_batch(workflow: ResourceListWorkflow, topics: Iterable[str], output_dir: str = ".",
+              workers: int = DEFAULT_WORKERS, fresh: bool = False, resume: bool = False) -> str:
+    """Generate every topic's resource list, then write the run summary; returns its path."""
+    start = time.perf_counter()
+    results = asyncio.run(arun_batch(workflow, topics, output_dir, workers, fresh, resume))
+    return write_summary(results, output_dir, time.perf_counter() - start, workers)
+
+
+def write_summary(results: List[Dict], output_dir: str, wall_seconds: float, workers: int) -> str:
+    failed = sum(r['error'] is not None for r in results)
+    topic_seconds = sum(r['seconds'] for r in results)
+    lines = [
+        "# Resource List Run Summary\n",
+        f"- Topics: {len(results)} ({len(results) - failed} succeeded, {failed} failed)",
+        f"- Workers: {workers}",
+        f"- Wall time: {wall_seconds:.1f}s (sum of topic times {topic_seconds:.1f}s)\n",
+        "| Topic | Status | Seconds | Questions | Incomplete | File |",
+        "|---|---|---:|---:|---:|---|",
+    ]
+    for r in results:
+        status = f"failed: {r['error']}" if r['error'] else "ok"
+        file = os.path.basename(r['file']) if r['file'] else ""
+        topic, status = (cell.replace('|', '\\|') for cell in (r['topic'], status))
+        lines.append(f"| {topic} | {status} | {r['seconds']:.1f} | {r['questions']} "
+                     f"| {r['incomplete']} | {file} |")
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, SUMMARY_FILENAME)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"Batch of {len(results)} topics finished in {wall_seconds:.1f}s ({failed} failed), summary: {path}")
+    return path
@@ -0,0 +1,80 @@
+"""Benchmark: recovering from a failure in gather_resources with the SQLite checkpointer.
+
+A topic is abandoned while its fifth summary hangs, as a crashed or killed
+process would be. It is then rerun from scratch, resumed from the last
+checkpoint (question generation is skipped), and resumed with the
+Markdown journal as well (finished questions are skipped too). Calls are
+counted with the offline fakes; the checkpointing overhead is measured on
+zero-latency runs.
+
+Usage: python bench_checkpoint.py --search-latency 0.2 --llm-latency 0.5 --topics 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from fakes import FakeChatModel, FakeSearchTool
+from workflow import ResourceListWorkflow
+
+TOPIC = "data analytics"
+
+
+def crash(checkpoint_path, output_dir, search_latency, llm_latency):
+    hanging = FakeChatModel(llm_latency, hang_on=["Research question 5 "])
+    # Per-question summaries, so four of them finish before the fifth hangs
+    workflow = ResourceListWorkflow(hanging, FakeSearchTool(search_latency), timeout=None,
+                                    checkpoint_path=checkpoint_path, dedupe_sources=False)
+    try:
+        asyncio.run(asyncio.wait_for(workflow.arun(TOPIC, output_dir), 4 * (search_latency + llm_latency) + 1))
+    except asyncio.TimeoutError:
+        pass
+
+
+def recover(checkpoint_path, search_latency, llm_latency, resume):
+    llm, search_tool = FakeChatModel(llm_latency), FakeSearchTool(search_latency)
+    workflow = ResourceListWorkflow(llm, search_tool, checkpoint_path=checkpoint_path, dedupe_sources=False)
+    start = time.perf_counter()
+    state = workflow.resume(TOPIC) if resume else workflow.run(TOPIC, fresh=True)
+    return time.perf_counter() - start, llm.calls, search_tool.calls, len(state['resources'])
+
+
+def overhead(tmp, topics):
+    """Seconds per topic with and without checkpoints, on zero-latency fakes."""
+    timings = {}
+    for name, checkpoint_path in (("plain", None), ("checkpointed", os.path.join(tmp, "overhead.sqlite3"))):
+        workflow = ResourceListWorkflow(FakeChatModel(0.0), FakeSearchTool(0.0), checkpoint_path=checkpoint_path)
+        start = time.perf_counter()
+        for i in range(topics):
+            workflow.run(f"topic {i}")
+        timings[name] = (time.perf_counter() - start) / topics
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--search-latency", type=float, default=0.2)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--topics", type=int, default=20, help="topics for the overhead measurement")
+    args = parser.parse_args()
+
+    rows = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = (("rerun from scratch", None, False), ("resume (checkpoint)", None, True),
+                 ("resume (checkpoint+journal)", os.path.join(tmp, "out"), True))
+        for i, (name, output_dir, resume) in enumerate(cases):
+            checkpoint_path = os.path.join(tmp, f"case{i}.sqlite3")
+            crash(checkpoint_path, output_dir, args.search_latency, args.llm_latency)
+            rows[name] = recover(checkpoint_path, args.search_latency, args.llm_latency, resume)
+        timings = overhead(tmp, args.topics)
+
+    print(f"\n{'after the failure':<30}{'seconds':>10}{'LLM calls':>11}{'searches':>10}{'resources':>11}")
+    for name, (seconds, llm_calls, search_calls, resources) in rows.items():
+        print(f"{name:<30}{seconds:>10.2f}{llm_calls:>11}{search_calls:>10}{resources:>11}")
+    print(f"checkpointing overhead: {(timings['checkpointed'] - timings['plain']) * 1000:.1f} ms/topic "
+          f"({timings['plain'] * 1000:.1f} -> {timings['checkpointed'] * 1000:.1f} ms on zero-latency fakes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark: sequential vs. concurrent gather_resources with fake search and LLM.
+
+Runs the research step for one topic's questions with max_concurrency=1
+(the old one-question-at-a-time loop) and with the default fan-out, then
+repeats the concurrent run with one failing search and one hanging summary to
+show that partial results come back within the timeout.
+
+Usage: python bench_gather.py --questions 5 --search-latency 0.5 --llm-latency 1.0 --timeout 3
+"""
+import argparse
+import asyncio
+import time
+
+from fakes import FakeChatModel, FakeSearchTool
+from research import DEFAULT_MAX_CONCURRENCY, gather_answers
+
+
+def timed(questions, search_tool, llm, max_concurrency, timeout):
+    start = time.perf_counter()
+    resources = asyncio.run(gather_answers(questions, search_tool, llm, max_concurrency, timeout))
+    return resources, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--search-latency", type=float, default=0.5)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=3.0, help="per-call timeout for the failure run")
+    args = parser.parse_args()
+
+    questions = [f"Research question {i} about data analytics?" for i in range(1, args.questions + 1)]
+    sequential, sequential_s = timed(questions, FakeSearchTool(args.search_latency),
+                                     FakeChatModel(args.llm_latency), 1, None)
+    concurrent, concurrent_s = timed(questions, FakeSearchTool(args.search_latency),
+                                     FakeChatModel(args.llm_latency), args.concurrency, None)
+    assert [r["question"] for r in concurrent] == questions, "question order changed"
+    assert concurrent == sequential, "concurrent results differ from sequential ones"
+
+    partial, partial_s = timed(questions, FakeSearchTool(args.search_latency, fail_on=[questions[0]]),
+                               FakeChatModel(args.llm_latency, hang_on=[questions[1]]), args.concurrency, args.timeout)
+    complete = sum("error" not in r for r in partial)
+
+    print(f"\n{'mode':<28}{'seconds':>10}")
+    print(f"{'sequential':<28}{sequential_s:>10.2f}")
+    print(f"{f'concurrent (limit {args.concurrency})':<28}{concurrent_s:>10.2f}")
+    print(f"{'concurrent, 2 failures':<28}{partial_s:>10.2f}")
+    print(f"speedup: {sequential_s / concurrent_s:.1f}x; with failures {complete}/{len(questions)} "
+          f"questions complete, {len(partial[1]['sources'])} sources kept for the timed-out summary")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark: rerunning a topic that crashed after 4 of 5 questions, from scratch vs. from the journal.
+
+The crash is simulated by a summary call that never returns and a deadline on
+the whole run, so the process state is lost exactly as in a kill; the four
+finished questions are already in the journal. The rerun with `fresh=True`
+pays for everything again, the resumed one only for the missing question.
+Both must produce the same Markdown as an uninterrupted run. With source
+de-duplication one combined call answers every question, so it is that call
+that hangs: no answer is finished, but the journaled search results are, and
+the resumed run only repeats the combined call.
+
+Usage: python bench_journal.py --search-latency 0.2 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from fakes import FakeChatModel, FakeSearchTool
+from workflow import ResourceListWorkflow
+
+TOPIC = "data analytics"
+
+
+def crash(output_dir, search_latency, llm_latency, dedupe_sources):
+    """Run the topic until the summary of question 5 hangs, then abandon it."""
+    hanging = FakeChatModel(llm_latency, hang_on=["Research question 5 "])
+    workflow = ResourceListWorkflow(hanging, FakeSearchTool(search_latency), timeout=None,
+                                    dedupe_sources=dedupe_sources)
+    try:
+        asyncio.run(asyncio.wait_for(workflow.arun(TOPIC, output_dir), 4 * (search_latency + llm_latency) + 1))
+    except asyncio.TimeoutError:
+        pass
+
+
+def rerun(output_dir, search_latency, llm_latency, fresh, dedupe_sources):
+    llm, search_tool = FakeChatModel(llm_latency), FakeSearchTool(search_latency)
+    start = time.perf_counter()
+    state = ResourceListWorkflow(llm, search_tool, dedupe_sources=dedupe_sources).run(TOPIC, output_dir, fresh=fresh)
+    return time.perf_counter() - start, llm.calls, search_tool.calls, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--search-latency", type=float, default=0.2)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    for mode, dedupe_sources in (("per-question summaries", False), ("source registry", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            reference = rerun(os.path.join(tmp, "reference"), args.search_latency, args.llm_latency, False,
+                              dedupe_sources)[3]
+            rows = {}
+            for name, fresh in (("rerun from scratch", True), ("resume from journal", False)):
+                output_dir = os.path.join(tmp, name.split()[0])
+                crash(output_dir, args.search_latency, args.llm_latency, dedupe_sources)
+                with open(os.path.join(output_dir, "data_analytics.md"), encoding='utf-8') as f:
+                    sections_on_disk = f.read().count("\n## ")
+                seconds, llm_calls, search_calls, state = rerun(output_dir, args.search_latency, args.llm_latency,
+                                                                fresh, dedupe_sources)
+                with open(state['file'], encoding='utf-8') as f:
+                    assert f.read() == reference['markdown'], f"{name}: output differs from an uninterrupted run"
+                rows[name] = (sections_on_disk, seconds, llm_calls, search_calls)
+
+        print(f"\n{mode}")
+        print(f"{'after the crash':<22}{'sections kept':>14}{'seconds':>10}{'LLM calls':>11}{'searches':>10}")
+        for name, (sections, seconds, llm_calls, search_calls) in rows.items():
+            print(f"{name:<22}{sections:>14}{seconds:>10.2f}{llm_calls:>11}{search_calls:>10}")
+        scratch, resumed = rows["rerun from scratch"], rows["resume from journal"]
+        print(f"resume: {scratch[2] - resumed[2]} LLM calls and {scratch[3] - resumed[3]} searches saved, "
+              "identical Markdown")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark: LLM calls per topic, numbered-list parsing vs. JSON schema with one repair call.
+
+Each case replays recorded question-generation replies through the full
+workflow with the offline fakes. Numbered mode reruns the whole topic (up to
+--attempts times) while fewer than 5 questions come back, as we do by hand
+today; structured mode validates the JSON reply and spends at most one
+repair call. Summaries are one LLM call per question in both modes
+(dedupe_sources=False), so only question generation differs.
+
+Usage: python bench_questions.py --attempts 3
+"""
+import argparse
+import json
+
+from fakes import FakeChatModel, FakeSearchTool
+from workflow import ResourceListWorkflow
+
+QUESTIONS = ["What is {t}?", "Which methods does {t} rely on?", "How did {t} develop historically?",
+             "Where is {t} applied in industry?", "What are open problems in {t}?"]
+
+
+def numbered(questions, fmt="{i}. {q}", preamble=""):
+    return preamble + "\n".join(fmt.format(i=i, q=q) for i, q in enumerate(questions, 1))
+
+
+def as_json(questions):
+    return json.dumps({"questions": questions})
+
+
+def recorded_cases(topic):
+    """(name, numbered-mode replies, structured-mode replies), one reply per question-generation call."""
+    q = [question.format(t=topic) for question in QUESTIONS]
+    return [
+        ("clean", [numbered(q)], [as_json(q)]),
+        ("chatty preamble", [numbered(q, preamble="Sure! Here are five questions:\n\n")],
+         [f"Sure! Here is the JSON:\n{as_json(q)}"]),
+        ("bold numbers / code fence", [numbered(q, "**{i}.** {q}"), numbered(q)],
+         [f"```json\n{as_json(q)}\n```"]),
+        ("parenthesis numbers / prose", [numbered(q, "{i}) {q}"), numbered(q)], [numbered(q), as_json(q)]),
+        ("'Question 1:' twice / trailing comma", [numbered(q, "Question {i}: {q}"), numbered(q, "{i}) {q}"), numbered(q)],
+         [as_json(q).replace('"]', '",]'), as_json(q)]),
+        ("only four questions", [numbered(q[:4]), numbered(q)], [as_json(q[:4]), as_json(q)]),
+        ("bullets / duplicate question", [numbered(q, "- {q}"), numbered(q)], [as_json(q[:4] + q[:1]), as_json(q)]),
+        ("persistently short", [numbered(q[:4]), numbered(q[:4]), numbered(q[:4])],
+         [as_json(q[:4]), as_json(q[:4])]),
+    ]
+
+
+def run_numbered(topic, replies, attempts):
+    llm, search_tool = FakeChatModel(0.0, script=replies), FakeSearchTool(0.0)
+    workflow = ResourceListWorkflow(llm, search_tool, structured_questions=False, dedupe_sources=False)
+    for _ in range(attempts):
+        state = workflow.run(topic)
+        if len(state['questions']) == 5:
+            break
+    return llm.calls, search_tool.calls, len(state['questions'])
+
+
+def run_structured(topic, replies):
+    llm, search_tool = FakeChatModel(0.0, script=replies), FakeSearchTool(0.0)
+    state = ResourceListWorkflow(llm, search_tool, structured_questions=True, dedupe_sources=False).run(topic)
+    return llm.calls, search_tool.calls, len(state['questions'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=3, help="full reruns allowed in numbered mode")
+    args = parser.parse_args()
+
+    topic = "data analytics"
+    totals = {"numbered": [0, 0, 0], "structured": [0, 0, 0]}
+    print(f"\n{'recorded case':<38}{'numbered calls':>16}{'questions':>11}{'json calls':>12}{'questions':>11}")
+    for name, numbered_replies, json_replies in recorded_cases(topic):
+        rows = {"numbered": run_numbered(topic, numbered_replies, args.attempts),
+                "structured": run_structured(topic, json_replies)}
+        for mode, (llm_calls, search_calls, questions) in rows.items():
+            totals[mode][0] += llm_calls
+            totals[mode][1] += search_calls
+            totals[mode][2] += questions == 5
+        print(f"{name:<38}{rows['numbered'][0]:>16}{rows['numbered'][2]:>11}"
+              f"{rows['structured'][0]:>12}{rows['structured'][2]:>11}")
+
+    cases = len(recorded_cases(topic))
+    print(f"\n{'mode':<14}{'LLM calls/topic':>17}{'searches/topic':>16}{'complete topics':>17}")
+    for mode, (llm_calls, search_calls, complete) in totals.items():
+        print(f"{mode:<14}{llm_calls / cases:>17.2f}{search_calls / cases:>16.2f}{f'{complete}/{cases}':>17}")
+    print(f"LLM calls: {1 - totals['structured'][0] / totals['numbered'][0]:.0%} fewer with schema validation")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark: LLM prompt size per topic, per-question summaries vs. the source registry.
+
+The fake search draws every question's results from a small pool of shared
+pages, spelled with http/https, www., tracking parameters or fragments, so
+the same documents come back under several questions. Per-question mode
+sends each question its own top 3 results; registry mode canonicalizes the
+URLs and sends every distinct document to one LLM call. Prompt size is
+counted in characters (roughly 4 per token) over all LLM calls of a topic;
+question generation is identical in both modes.
+
+Usage: python bench_sources.py --topics 10 --pool 8 --content-chars 800
+"""
+import argparse
+
+from fakes import FakeChatModel, FakeSearchTool
+from research import RESULTS_PER_QUESTION
+from sources import canonical_url
+from workflow import ResourceListWorkflow
+
+
+def run(topics, pool, content_chars, dedupe_sources):
+    llm, search_tool = FakeChatModel(0.0), FakeSearchTool(0.0, pool=pool, content_chars=content_chars)
+    workflow = ResourceListWorkflow(llm, search_tool, dedupe_sources=dedupe_sources)
+    listed = distinct_urls = distinct_documents = 0
+    for topic in topics:
+        state = workflow.run(topic)
+        assert all(r['answer'] and 'error' not in r for r in state['resources']), f"unanswered question in {topic}"
+        urls = [src['url'] for r in state['resources'] for src in r['sources']]
+        listed += len(urls)
+        distinct_urls += len(set(urls))
+        distinct_documents += len({canonical_url(url) for url in urls})
+    return llm.calls, llm.prompt_chars, listed, distinct_urls, distinct_documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics", type=int, default=10)
+    parser.add_argument("--pool", type=int, default=8, help="shared pages each topic's results come from")
+    parser.add_argument("--content-chars", type=int, default=800, help="length of each search result's content")
+    args = parser.parse_args()
+
+    topics = [f"topic {i}" for i in range(args.topics)]
+    rows = {name: run(topics, args.pool, args.content_chars, dedupe)
+            for name, dedupe in (("per question", False), ("source registry", True))}
+
+    n = len(topics)
+    print(f"\n{'summaries':<18}{'LLM calls/topic':>17}{'prompt chars/topic':>20}{'~tokens/topic':>15}")
+    for name, (calls, chars, *_) in rows.items():
+        print(f"{name:<18}{calls / n:>17.1f}{chars / n:>20.0f}{chars / n / 4:>15.0f}")
+    _, _, listed, distinct_urls, distinct_documents = rows["per question"]
+    print(f"sources per topic: {listed / n:.1f} listed ({RESULTS_PER_QUESTION} per question), "
+          f"{distinct_urls / n:.1f} distinct URLs, {distinct_documents / n:.1f} distinct documents after canonicalization")
+    print(f"prompt size: {1 - rows['source registry'][1] / rows['per question'][1]:.0%} smaller "
+          "with the source registry")
+
+
+if __name__ == "__main__":
+    main()
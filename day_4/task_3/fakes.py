@@ -0,0 +1,110 @@
+"""Offline stand-ins for TavilySearch and ChatGoogleGenerativeAI used by the benchmarks.
+
+Both sleep for a fixed latency per call (time.sleep for invoke, asyncio.sleep
+for ainvoke) and count their calls, so wall-clock and call-count effects can
+be measured without API keys. The chat model also counts prompt characters.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Dict, Iterable, Optional
+
+from langchain_core.messages import AIMessage
+
+
+# Spellings of one page that canonicalize to the same URL
+URL_VARIANTS = ["https://www.example.edu/pages/{k}", "http://example.edu/pages/{k}/",
+                "https://example.edu/pages/{k}?utm_source=search", "https://example.edu/pages/{k}#overview"]
+
+
+class FakeSearchTool:
+    def __init__(self, latency: float = 0.5, results: int = 5, fail_on: Iterable[str] = (),
+                 pool: Optional[int] = None, content_chars: int = 800):
+        self.latency = latency
+        self.results = results
+        self.fail_on = set(fail_on)  # Queries that raise
+        self.pool = pool  # When set, results come from this many pages shared by all queries
+        self.content_chars = content_chars
+        self.calls = 0
+
+    def _shared_results(self, query: str) -> Dict:
+        rng = random.Random(query)
+        pages = rng.sample(range(self.pool), min(self.results, self.pool))
+        return {"query": query, "results": [
+            {"title": f"Shared page {k}", "url": rng.choice(URL_VARIANTS).format(k=k),
+             "content": (f"Page {k} explains a core concept in depth. " * 50)[:self.content_chars]}
+            for k in pages]}
+
+    def _results(self, query: str) -> Dict:
+        if query in self.fail_on:
+            raise ConnectionError(f"fake search outage for {query!r}")
+        if self.pool:
+            return self._shared_results(query)
+        slug = hashlib.sha1(query.encode("utf-8")).hexdigest()[:8]
+        return {"query": query, "results": [
+            {"title": f"Result {i} for {query}", "url": f"https://example.edu/{slug}/{i}",
+             "content": f"Educational content {i} about {query}."}
+            for i in range(self.results)]}
+
+    def invoke(self, query: str) -> Dict:
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._results(query)
+
+    async def ainvoke(self, query: str) -> Dict:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self._results(query)
+
+
+class FakeChatModel:
+    def __init__(self, latency: float = 1.0, reply: Optional[str] = None, hang_on: Iterable[str] = (),
+                 script: Iterable[str] = ()):
+        self.latency = latency
+        self.reply = reply
+        self.hang_on = list(hang_on)  # Prompts containing any of these never return (to exercise timeouts)
+        self.script = list(script)  # Recorded replies for question generation and repair calls, used in order
+        self.calls = 0
+        self.prompt_chars = 0
+
+    @staticmethod
+    def _prompt(messages) -> str:
+        return messages[-1].content if isinstance(messages, list) else str(messages)
+
+    def _reply(self, messages) -> AIMessage:
+        prompt = self._prompt(messages)
+        if self.reply is not None:
+            return AIMessage(content=self.reply)
+        if prompt.startswith("Question: "):
+            return AIMessage(content=f"Summary of: {prompt[:60]}")
+        if prompt.startswith("Sources:"):
+            # One call for all of a topic's questions: answer each numbered question
+            numbers = re.findall(r"^(\d+)\. ", prompt.split("\nQuestions:", 1)[-1], re.MULTILINE)
+            return AIMessage(content=json.dumps({"answers": [
+                {"question": int(n), "answer": f"Summary for question {n}."} for n in numbers]}))
+        if self.script:
+            return AIMessage(content=self.script.pop(0))
+        # Question generation: follow the format the system prompt asks for
+        topic = next((m.content[len("Topic: "):] for m in messages if m.content.startswith("Topic: ")), prompt)
+        questions = [f"Research question {i} about {topic}?" for i in range(1, 6)]
+        if "JSON" in messages[0].content:
+            return AIMessage(content=json.dumps({"questions": questions}))
+        return AIMessage(content="\n".join(f"{i}. {q}" for i, q in enumerate(questions, 1)))
+
+    def _count(self, messages) -> None:
+        self.calls += 1
+        self.prompt_chars += sum(len(m.content) for m in messages) if isinstance(messages, list) else len(messages)
+
+    def invoke(self, messages) -> AIMessage:
+        self._count(messages)
+        time.sleep(self.latency)
+        return self._reply(messages)
+
+    async def ainvoke(self, messages) -> AIMessage:
+        self._count(messages)
+        hangs = any(marker in self._prompt(messages) for marker in self.hang_on)
+        await asyncio.sleep(3600 if hangs else self.latency)
+        return self._reply(messages)
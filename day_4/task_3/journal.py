@@ -0,0 +1,130 @@
+"""Incremental, resumable Markdown output for one topic.
+
+Next to `<topic>.md` the workflow keeps an append-only JSON-lines journal
+(`.<topic>.journal.jsonl`) recording the generated questions and every
+resource as it is produced; each record is fsync'd before the matching
+section is appended to the Markdown file. A rerun reads the journal back and
+only researches the questions that have no successful resource yet. With
+source de-duplication, each question's search results are recorded too
+before the topic's combined summary call, so a rerun after a crash in that
+call does not search again. When the topic finishes, the Markdown file is
+rewritten in question order.
+"""
+import json
+import os
+from typing import Dict, List, Optional
+
+
+def markdown_header(topic: str) -> str:
+    return f"# Academic Resource List for {topic.title()}\n\n"
+
+
+def markdown_section(item: Dict) -> str:
+    lines = [f"## {item['question']}", f"**Answer:** {item['answer']}", "**Resources:**"]
+    for src in item['sources']:
+        # De-duplicated sources carry the ID the answers cite, e.g. [S2]
+        label = f"[{src['id']}] " if 'id' in src else ""
+        lines.append(f"- {label}{src['title']} ({src['url']})")
+    return "\n".join(lines) + "\n\n"
+
+
+def render_markdown(topic: str, resources: List[Dict]) -> str:
+    # Skip empty questions
+    return markdown_header(topic) + "".join(markdown_section(item) for item in resources if item['question'])
+
+
+def _append(path: str, text: str) -> None:
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_atomic(path: str, content: str) -> None:
+    """Replace `path` with `content` so readers see the old or the new file, never half of one."""
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class ResourceJournal:
+    def __init__(self, markdown_path: str):
+        self.markdown_path = markdown_path
+        directory, name = os.path.split(markdown_path)
+        self.path = os.path.join(directory, f".{os.path.splitext(name)[0]}.journal.jsonl")
+        self.questions: Optional[List[str]] = None
+        self.resources: Dict[str, Dict] = {}  # Latest resource per question
+        self.searched: Dict[str, List[Dict]] = {}  # Sources found for a question whose answer is pending
+        self.done = False
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        valid = 0
+        for line in data.splitlines(keepends=True):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("unterminated record")
+                record = json.loads(line)
+            except ValueError:
+                break  # A crash mid-write leaves at most one torn record at the end
+            valid += len(line)
+            if 'questions' in record:
+                self.questions = record['questions']
+            elif 'resource' in record:
+                self.resources[record['resource']['question']] = record['resource']
+            elif 'searched' in record:
+                self.searched[record['searched']['question']] = record['searched']['sources']
+            elif record.get('done'):
+                self.done = True
+        if valid < len(data):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid)
+
+    def _record(self, record: Dict) -> None:
+        _append(self.path, json.dumps(record) + "\n")
+
+    def completed(self) -> Dict[str, Dict]:
+        """Resources that need no further work, by question."""
+        return {q: r for q, r in self.resources.items() if 'error' not in r}
+
+    def start(self, topic: str, questions: List[str]) -> None:
+        """Record the questions and begin the Markdown file with the title."""
+        os.makedirs(os.path.dirname(self.markdown_path) or ".", exist_ok=True)
+        self._record({'questions': questions})
+        self.questions = questions
+        write_atomic(self.markdown_path, markdown_header(topic))
+
+    def resume(self, topic: str) -> None:
+        """Rewrite the Markdown file from the journal so new sections append after the completed ones."""
+        completed = self.completed()
+        write_atomic(self.markdown_path, render_markdown(topic, [completed[q] for q in self.questions
+                                                                 if q in completed]))
+
+    def add(self, resource: Dict) -> None:
+        self._record({'resource': resource})
+        self.resources[resource['question']] = resource
+        if resource['question']:
+            _append(self.markdown_path, markdown_section(resource))
+
+    def add_searched(self, resource: Dict) -> None:
+        """Record a question's sources before its answer exists; no Markdown section is written."""
+        self._record({'searched': {'question': resource['question'], 'sources': resource['sources']}})
+        self.searched[resource['question']] = resource['sources']
+
+    def finish(self, markdown: str) -> None:
+        write_atomic(self.markdown_path, markdown)
+        self._record({'done': True})
+        self.done = True
+
+    def discard(self) -> None:
+        """Forget earlier progress so the topic is researched from scratch."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.questions, self.resources, self.searched, self.done = None, {}, {}, False
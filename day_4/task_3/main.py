@@ -1,10 +1,14 @@
+import argparse
 import os
-from typing import TypedDict, Annotated, List, Dict
-from langgraph.graph import StateGraph, START, END
-from langchain_tavily import TavilySearch
+import sys
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from dotenv import load_dotenv
+from batch import DEFAULT_WORKERS, read_topics, run_batch
+from workflow import NoCheckpointError, ResourceListWorkflow
+
+# Shared helpers live in <repo>/common
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.cached_tavily import CachedTavilySearch
 
 # Load environment variables (API keys)
 load_dotenv()
@@ -18,123 +22,77 @@ if not GEMINI_API_KEY or not TAVILY_API_KEY:
 # Initialize Gemini LLM
 llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", api_key=GEMINI_API_KEY, temperature=0.7)
 
-# Initialize Tavily Search Tool
-search_tool = TavilySearch(api_key=TAVILY_API_KEY, max_results=5, include_domains=[".edu", "khanacademy.org"], topic="general")
-
-# Define the state structure
-class State(TypedDict):
-    topic: str
-    questions: List[str]
-    resources: List[Dict]
-    markdown: str
-    messages: Annotated[list, "Messages for LLM context"]
-
-# System Prompt for generating questions
-QUESTION_SYSTEM_PROMPT = """
-You are an expert academic researcher. Generate exactly 5 clear, concise research questions for the given topic. 
-Format them as a numbered list (1. Question one, 2. Question two, etc.). 
-Focus on fundamental, theoretical, and applied aspects suitable for educational resources.
-"""
-
-# System Prompt for synthesizing answers
-SUMMARY_SYSTEM_PROMPT = """
-You are a knowledgeable educator summarizing answers for academic study. 
-Provide a concise, accurate summary based only on the provided search results from educational sources.
-Keep the summary to 3-5 sentences, emphasizing key concepts.
-"""
-
-# Node 1: Input Topic
-def input_topic(state: State) -> State:
-    state['topic'] = state.get('topic', '')
-    state['messages'] = [SystemMessage(content=QUESTION_SYSTEM_PROMPT),
-                         HumanMessage(content=f"Topic: {state['topic']}")]
-    return state
-
-# Node 2: Generate Research Questions using Gemini with System Prompt
-def generate_questions(state: State) -> State:
-    response = llm.invoke(state['messages'])
-    # Parse the response into a list of questions
-    questions = []
-    for line in response.content.split('\n'):
-        if line.strip().startswith(tuple(str(i) + '.' for i in range(1, 6))):
-            questions.append(line.split('.', 1)[1].strip())
-    state['questions'] = questions[:5]  # Ensure exactly 5
-    state['messages'].append(AIMessage(content=response.content))
-    return state
-
-# Node 3: Gather Resources using Tavily Search
-def gather_resources(state: State) -> State:
-    resources = []
-    for question in state['questions']:
-        search_results = search_tool.invoke(question)
-        # Remove domain filtering: include all results
-        filtered_results = search_results.get('results', [])[:3]  # Limit to 3 results per question
-        # Use Gemini with system prompt to synthesize a concise answer
-        messages = [SystemMessage(content=SUMMARY_SYSTEM_PROMPT),
-                    HumanMessage(content=f"Question: {question}\nSearch Results: {filtered_results}")]
-        summary_response = llm.invoke(messages)
-        summary = summary_response.content
-        resources.append({
-            'question': question,
-            'answer': summary,
-            'sources': filtered_results
-        })
-    state['resources'] = resources
-    return state
-
-# Node 4: Compile Markdown Resource List
-def compile_markdown(state: State) -> State:
-    markdown = f"# Academic Resource List for {state['topic'].title()}\n\n"
-    for item in state['resources']:
-        if not item['question']:  # Skip empty questions
-            continue
-        markdown += f"## {item['question']}\n"
-        markdown += f"**Answer:** {item['answer']}\n"
-        markdown += "**Resources:**\n"
-        for src in item['sources']:
-            markdown += f"- {src['title']} ({src['url']})\n"
-        markdown += "\n"
-    state['markdown'] = markdown
-    return state
-
-# Function to save the markdown to a file
-def save_markdown_file(topic: str, content: str) -> str:
-    # Sanitize filename by replacing spaces and lowering case
-    filename = topic.replace(' ', '_').lower() + '.md'
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(content)
-    print(f"Markdown file saved as: {filename}")
-    return filename
-
-# Build the LangGraph Workflow
-workflow = StateGraph(state_schema=State)
-workflow.add_node("input", input_topic)
-workflow.add_node("questions", generate_questions)
-workflow.add_node("gather", gather_resources)
-workflow.add_node("output", compile_markdown)
-
-# Define edges
-workflow.add_edge(START, "input")
-workflow.add_edge("input", "questions")
-workflow.add_edge("questions", "gather")
-workflow.add_edge("gather", "output")
-workflow.add_edge("output", END)
-
-# Compile the workflow
-compiled_workflow = workflow.compile()
-
-# Example Run
-def generate_resource_list(topic: str) -> str:
-    initial_state = {"topic": topic, "questions": [], "resources": [], "markdown": "", "messages": []}
-    final_state = compiled_workflow.invoke(initial_state)
-    markdown_content = final_state['markdown']
-    
-    # Save the markdown to a file named after the topic
-    saved_file = save_markdown_file(topic, markdown_content)
-    
+# Initialize Tavily Search Tool (results are cached on disk and shared with the other agents)
+search_tool = CachedTavilySearch(api_key=TAVILY_API_KEY, max_results=5, include_domains=[".edu", "khanacademy.org"], topic="general")
+
+# LangGraph checkpoints (one thread per topic) so a failed run can resume() after its last completed node
+CHECKPOINT_PATH = os.getenv("RESOURCE_CHECKPOINT_PATH",
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), ".checkpoints", "resource_lists.sqlite3"))
+
+# The LangGraph workflow is compiled on first use (not at import, so --help stays cheap)
+# and every topic after that reuses it (see workflow.py)
+_resource_workflow = None
+
+
+def get_resource_workflow() -> ResourceListWorkflow:
+    global _resource_workflow
+    if _resource_workflow is None:
+        _resource_workflow = ResourceListWorkflow(llm, search_tool, checkpoint_path=CHECKPOINT_PATH)
+    return _resource_workflow
+
+
+def generate_resource_list(topic: str, output_dir: str = ".", fresh: bool = False) -> str:
+    # Sections are written to a file named after the topic as they are produced;
+    # an interrupted topic resumes where it stopped unless fresh is set
+    final_state = get_resource_workflow().run(topic, output_dir, fresh)
+    saved_file = final_state['file']
+    print(f"Markdown file saved as: {saved_file}")
+    print(search_tool.search_cache.report())
+
     return f"Resource list generated and saved to {saved_file}"
 
-# Test with a sample topic
-topic = "Data Analytics"
-result = generate_resource_list(topic)
-print(result)
+
+def resume(topic: str) -> str:
+    """Continue a topic whose last run failed, from the node after the last completed one."""
+    final_state = get_resource_workflow().resume(topic)
+    print(search_tool.search_cache.report())
+    return f"Resource list resumed and saved to {final_state['file'] or '(not saved: run had no output dir)'}"
+
+
+def generate_resource_lists(topics, output_dir: str = ".", workers: int = DEFAULT_WORKERS,
+                            fresh: bool = False, from_checkpoint: bool = False) -> str:
+    """Batch mode: one markdown file per topic plus run_summary.md with per-topic timings.
+
+    With from_checkpoint, failed topics continue from their last checkpointed node (like resume()).
+    """
+    summary_file = run_batch(get_resource_workflow(), topics, output_dir, workers, fresh, from_checkpoint)
+    print(search_tool.search_cache.report())
+    return f"Resource lists generated, run summary saved to {summary_file}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile Markdown resource lists for academic topics.")
+    parser.add_argument("topics", nargs="*", help="topics to research (default: Data Analytics)")
+    parser.add_argument("--topics-file", help="file with one topic per line; runs in batch mode")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="topics researched at once in batch mode")
+    parser.add_argument("--output-dir", default=".", help="where the markdown files are written")
+    parser.add_argument("--fresh", action="store_true", help="ignore progress saved by earlier, interrupted runs")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue failed runs from their last checkpointed node (topics never started run normally)")
+    args = parser.parse_args()
+
+    topics = args.topics + (read_topics(args.topics_file) if args.topics_file else [])
+    if len(topics) > 1 or args.topics_file:
+        result = generate_resource_lists(topics, args.output_dir, args.workers, args.fresh, args.resume)
+    else:
+        # Test with a sample topic
+        topic = topics[0] if topics else "Data Analytics"
+        result = None
+        if args.resume:
+            try:
+                result = resume(topic)
+            except NoCheckpointError:
+                print(f"No checkpoint for '{topic}', starting a new run")
+        if result is None:
+            result = generate_resource_list(topic, args.output_dir, args.fresh)
+    print(result)
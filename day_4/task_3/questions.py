@@ -0,0 +1,116 @@
+"""Research-question generation with a JSON schema and a single repair call.
+
+The model is asked for a JSON object matching `ResearchQuestions`. A reply
+that does not parse or validate gets one targeted follow-up quoting the
+validation errors, instead of a silent short list that forces a full rerun.
+The numbered-list parser is kept for the plain-text mode and as a last
+resort when the repaired reply is still invalid.
+"""
+import json
+import re
+from typing import Annotated, List, Optional, Tuple, Type
+
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import BaseModel, Field, StringConstraints, ValidationError, field_validator
+
+QUESTION_COUNT = 5
+
+# System Prompt for generating questions
+QUESTION_SYSTEM_PROMPT = """
+You are an expert academic researcher. Generate exactly 5 clear, concise research questions for the given topic.
+Format them as a numbered list (1. Question one, 2. Question two, etc.).
+Focus on fundamental, theoretical, and applied aspects suitable for educational resources.
+"""
+
+
+class ResearchQuestions(BaseModel):
+    questions: List[Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]] = Field(
+        min_length=QUESTION_COUNT, max_length=QUESTION_COUNT,
+        description="Distinct research questions about the topic")
+
+    @field_validator("questions")
+    @classmethod
+    def distinct(cls, questions: List[str]) -> List[str]:
+        if len({q.lower() for q in questions}) != len(questions):
+            raise ValueError("questions must be distinct")
+        return questions
+
+
+QUESTION_SCHEMA = json.dumps(ResearchQuestions.model_json_schema())
+
+STRUCTURED_QUESTION_SYSTEM_PROMPT = f"""
+You are an expert academic researcher. Generate exactly {QUESTION_COUNT} clear, concise research questions for the given topic.
+Focus on fundamental, theoretical, and applied aspects suitable for educational resources.
+Reply with only a JSON object matching this JSON schema, with no other text:
+{QUESTION_SCHEMA}
+"""
+
+REPAIR_PROMPT = """Your reply could not be used: {errors}
+Reply again with only a JSON object matching this JSON schema, with no other text:
+{schema}"""
+
+
+def parse_numbered_questions(text: str) -> List[str]:
+    """Questions from a "1. ..." to "5. ..." numbered list (the plain-text format)."""
+    questions = []
+    for line in text.split('\n'):
+        if line.strip().startswith(tuple(str(i) + '.' for i in range(1, QUESTION_COUNT + 1))):
+            questions.append(line.split('.', 1)[1].strip())
+    return questions[:QUESTION_COUNT]
+
+
+def parse_json_reply(text: str, model: Type[BaseModel], list_field: Optional[str] = None) -> BaseModel:
+    """Validate the JSON in an LLM reply against `model`; raises ValueError describing what is wrong.
+
+    Markdown code fences and text around the JSON are tolerated, and a bare
+    JSON array is read as the `list_field` of the model.
+    """
+    match = re.search(r"[\[{].*[\]}]", text, re.DOTALL)
+    if match is None:
+        raise ValueError("the reply contains no JSON object")
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"the reply is not valid JSON ({e})") from None
+    if isinstance(data, list) and list_field:
+        data = {list_field: data}
+    try:
+        return model.model_validate(data)
+    except ValidationError as e:
+        errors = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'reply'}: {err['msg']}" for err in e.errors())
+        raise ValueError(errors) from None
+
+
+def parse_questions(text: str) -> List[str]:
+    """Validate a JSON reply against ResearchQuestions; raises ValueError describing what is wrong."""
+    return parse_json_reply(text, ResearchQuestions, "questions").questions
+
+
+def generate_structured_questions(llm, messages: list) -> Tuple[List[str], list]:
+    """Ask for schema-valid questions, with at most one repair call.
+
+    Returns the questions and the messages exchanged after `messages`. When
+    the repaired reply is still invalid, whatever a lenient parse recovers is
+    returned (possibly fewer than QUESTION_COUNT questions).
+    """
+    response = llm.invoke(messages)
+    exchanged = [AIMessage(content=response.content)]
+    try:
+        return parse_questions(response.content), exchanged
+    except ValueError as e:
+        errors = str(e)
+    exchanged.append(HumanMessage(content=REPAIR_PROMPT.format(errors=errors, schema=QUESTION_SCHEMA)))
+    response = llm.invoke(messages + exchanged)
+    exchanged.append(AIMessage(content=response.content))
+    try:
+        return parse_questions(response.content), exchanged
+    except ValueError as e:
+        print(f"Warning: question generation is still invalid after a repair ({e})")
+    try:
+        data = json.loads(re.search(r"[\[{].*[\]}]", response.content, re.DOTALL).group(0))
+        questions = data.get("questions") if isinstance(data, dict) else data
+        salvaged = [q.strip() for q in questions if isinstance(q, str) and q.strip()]
+    except (AttributeError, TypeError, ValueError):
+        salvaged = []
+    salvaged = salvaged or parse_numbered_questions(response.content)
+    return list(dict.fromkeys(salvaged))[:QUESTION_COUNT], exchanged
@@ -0,0 +1,198 @@
+"""Concurrent search and summary for one topic's questions.
+
+Every question is searched through Tavily and its top results summarized by
+the LLM, with all questions in flight at once under a shared concurrency
+limit and per-call timeout. A failed search or summary only marks its own
+question as incomplete. With source de-duplication, the searches finish
+first and one LLM call answers every question from the topic's combined
+source list (see sources.py), falling back to per-question summaries.
+"""
+import asyncio
+import json
+from typing import Annotated, Callable, Dict, Iterable, List, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel, Field, StringConstraints
+
+from questions import parse_json_reply
+from sources import SourceRegistry
+
+# System Prompt for synthesizing answers
+SUMMARY_SYSTEM_PROMPT = """
+You are a knowledgeable educator summarizing answers for academic study.
+Provide a concise, accurate summary based only on the provided search results from educational sources.
+Keep the summary to 3-5 sentences, emphasizing key concepts.
+"""
+
+RESULTS_PER_QUESTION = 3  # Search results kept per question and sent to the summarizer
+DEFAULT_MAX_CONCURRENCY = 5  # Search/LLM calls in flight at once
+DEFAULT_TIMEOUT = 60.0  # Seconds allowed for a single search or summary call
+
+
+class QuestionAnswer(BaseModel):
+    question: int = Field(description="Number of the question being answered")
+    answer: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+
+
+class TopicAnswers(BaseModel):
+    answers: List[QuestionAnswer]
+
+
+# System Prompt for answering all of a topic's questions from one de-duplicated source list
+TOPIC_SUMMARY_SYSTEM_PROMPT = f"""
+You are a knowledgeable educator summarizing answers for academic study.
+You get several questions about one topic and the search results from educational sources found for them.
+Each source is listed once with an ID such as S1, and each question names the sources found for it.
+For every question, provide a concise, accurate summary based only on the provided sources,
+3-5 sentences emphasizing key concepts, citing the source IDs used in brackets like [S1].
+Reply with only a JSON object matching this JSON schema, with no other text:
+{json.dumps(TopicAnswers.model_json_schema())}
+"""
+
+
+def _describe(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+
+async def _search(question: str, search_tool, limiter: asyncio.Semaphore, timeout: Optional[float]) -> List[Dict]:
+    async with limiter:
+        search_results = await asyncio.wait_for(search_tool.ainvoke(question), timeout)
+    return search_results.get('results', [])
+
+
+def _search_failed(resource: Dict, error: Exception) -> Dict:
+    resource['error'] = f"search failed: {_describe(error)}"
+    resource['answer'] = "No answer: the search for this question failed."
+    return resource
+
+
+async def _summarize(resource: Dict, llm, limiter: asyncio.Semaphore, timeout: Optional[float]) -> Dict:
+    """Summarize one question's sources in its own LLM call."""
+    messages = [SystemMessage(content=SUMMARY_SYSTEM_PROMPT),
+                HumanMessage(content=f"Question: {resource['question']}\nSearch Results: {resource['sources']}")]
+    try:
+        async with limiter:
+            summary_response = await asyncio.wait_for(llm.ainvoke(messages), timeout)
+        resource['answer'] = summary_response.content
+    except Exception as e:
+        resource['error'] = f"summary failed: {_describe(e)}"
+        resource['answer'] = "No answer: summarizing the sources failed, see the links below."
+    return resource
+
+
+async def research_question(question: str, search_tool, llm, limiter: asyncio.Semaphore,
+                            timeout: Optional[float] = DEFAULT_TIMEOUT) -> Dict:
+    """Search for one question and summarize the top results.
+
+    Failures are kept local: a failed search yields no sources, a failed
+    summary keeps the sources and records the error instead of an answer.
+    """
+    resource = {'question': question, 'answer': '', 'sources': []}
+    try:
+        resource['sources'] = (await _search(question, search_tool, limiter, timeout))[:RESULTS_PER_QUESTION]
+    except Exception as e:
+        return _search_failed(resource, e)
+    return await _summarize(resource, llm, limiter, timeout)
+
+
+def topic_prompt(resources: List[Dict]) -> str:
+    """Every distinct source once, then the numbered questions with the IDs of their sources."""
+    documents = {src['id']: src for resource in resources for src in resource['sources']}
+    lines = ["Sources:"]
+    for source_id, src in documents.items():
+        lines.append(f"[{source_id}] {src.get('title', '')} ({src.get('url', '')})\n{src.get('content', '')}\n")
+    lines.append("Questions:")
+    for i, resource in enumerate(resources, 1):
+        cited = ", ".join(src['id'] for src in resource['sources']) or "none found"
+        lines.append(f"{i}. {resource['question']} (sources: {cited})")
+    return "\n".join(lines)
+
+
+async def summarize_topic(resources: List[Dict], llm, limiter: asyncio.Semaphore,
+                          timeout: Optional[float] = DEFAULT_TIMEOUT) -> List[Dict]:
+    """Answer all questions in one LLM call; returns the resources it did not answer."""
+    messages = [SystemMessage(content=TOPIC_SUMMARY_SYSTEM_PROMPT), HumanMessage(content=topic_prompt(resources))]
+    try:
+        async with limiter:
+            response = await asyncio.wait_for(llm.ainvoke(messages), timeout)
+        answers = {a.question: a.answer for a in parse_json_reply(response.content, TopicAnswers, "answers").answers}
+    except Exception as e:
+        print(f"Warning: the combined summary failed ({_describe(e)}), summarizing questions one by one")
+        return resources
+    for i, resource in enumerate(resources, 1):
+        if i in answers:
+            resource['answer'] = answers[i]
+    return [resource for i, resource in enumerate(resources, 1) if i not in answers]
+
+
+async def gather_answers(questions: List[str], search_tool, llm,
+                         max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                         timeout: Optional[float] = DEFAULT_TIMEOUT,
+                         on_resource: Optional[Callable[[Dict], None]] = None,
+                         dedupe_sources: bool = False, known_sources: Iterable[Dict] = (),
+                         on_searched: Optional[Callable[[Dict], None]] = None,
+                         searched: Optional[Dict[str, List[Dict]]] = None) -> List[Dict]:
+    """Research all questions concurrently, keeping the input order.
+
+    At most `max_concurrency` search/LLM calls run at once, so a topic takes
+    roughly as long as its slowest question instead of the sum of all of them.
+    `on_resource` is called with each resource as soon as it is finished.
+
+    With `dedupe_sources`, all searches finish first; their results go through
+    a SourceRegistry (sources.py) and one LLM call answers every question from
+    the de-duplicated source list, so each document is sent once. Questions
+    that call leaves unanswered are summarized one by one. `known_sources`
+    (with IDs, from questions answered in an earlier run) keep their IDs.
+    Since no answer is finished before that call returns, `on_searched` gets
+    each question's resource with its sources (and no answer yet) as soon as
+    the searches are done; a rerun passes them back as `searched` (sources by
+    question), and those questions are not searched again.
+    """
+    limiter = asyncio.Semaphore(max_concurrency)
+
+    def report(resource: Dict) -> Dict:
+        if on_resource is not None:
+            on_resource(resource)
+        return resource
+
+    if not dedupe_sources:
+        async def research(question: str) -> Dict:
+            return report(await research_question(question, search_tool, llm, limiter, timeout))
+
+        resources = list(await asyncio.gather(*(research(q) for q in questions)))
+    else:
+        searched = searched or {}
+
+        async def search(question: str):
+            resource = {'question': question, 'answer': '', 'sources': []}
+            if question in searched:
+                return resource, None
+            try:
+                return resource, await _search(question, search_tool, limiter, timeout)
+            except Exception as e:
+                return report(_search_failed(resource, e)), None
+
+        found = await asyncio.gather(*(search(q) for q in questions))
+        registry = SourceRegistry()
+        registry.restore(known_sources)
+        registry.restore(src for sources in searched.values() for src in sources)
+        # Registered in question order, so source IDs do not depend on which search finished first
+        for resource, results in found:
+            if resource['question'] in searched:
+                resource['sources'] = searched[resource['question']]
+            elif results is not None:
+                resource['sources'] = [dict(registry.documents[source_id], id=source_id)
+                                       for source_id in registry.select(results, RESULTS_PER_QUESTION)]
+                if on_searched is not None:
+                    on_searched(resource)
+        resources = [resource for resource, _ in found]
+        answerable = [resource for resource in resources if 'error' not in resource]
+        unanswered = await summarize_topic(answerable, llm, limiter, timeout) if answerable else []
+        await asyncio.gather(*(_summarize(resource, llm, limiter, timeout) for resource in unanswered))
+        for resource in answerable:
+            report(resource)
+
+    for resource in resources:
+        if 'error' in resource:
+            print(f"Warning: '{resource['question']}' is incomplete ({resource['error']})")
+    return resources
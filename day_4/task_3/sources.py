@@ -0,0 +1,100 @@
+"""Per-topic source registry: canonical URLs and de-duplicated documents.
+
+Search results for a topic's questions overlap heavily (the same .edu page
+under several questions, reached through http/https, www., tracking
+parameters or a trailing slash). The registry gives every distinct document
+one short ID (S1, S2, ...), matched by canonical URL or by identical content,
+so the summarizer receives each document once and answers cite the IDs.
+"""
+import hashlib
+import re
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|dclid|msclkid|mc_cid|mc_eid|ref|ref_src|source|_ga|_hsenc|_hsmi)$",
+                             re.IGNORECASE)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings of one page compare equal.
+
+    Lowercases scheme and host, treats http as https, drops "www.", default
+    ports, fragments, tracking parameters and trailing slashes, and sorts the
+    remaining query parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url.strip()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[len("www."):]
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def content_key(text: str) -> Optional[str]:
+    """Hash of the whitespace- and case-normalized text; None for text too short to be a document."""
+    normalized = re.sub(r"\s+", " ", text or "").strip().lower()
+    if len(normalized) < 40:  # Snippets this short are too generic to call duplicates
+        return None
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class SourceRegistry:
+    def __init__(self):
+        self.documents: Dict[str, Dict] = {}  # Source ID -> first search result seen for it
+        self._ids: Dict[str, str] = {}  # Canonical URL or content hash -> source ID
+        self._next_id = 1
+        self.results_seen = 0
+
+    @staticmethod
+    def _keys(result: Dict) -> List[str]:
+        keys = [canonical_url(result.get('url', ''))]
+        if content_key(result.get('content', '')):
+            keys.append(content_key(result['content']))
+        return keys
+
+    def _register(self, source_id: str, result: Dict) -> None:
+        self.documents[source_id] = result
+        for key in self._keys(result):
+            self._ids.setdefault(key, source_id)
+
+    def restore(self, sources: Iterable[Dict]) -> None:
+        """Keep the IDs of sources cited by answers from an earlier, interrupted run."""
+        for src in sources:
+            if 'id' in src and src['id'] not in self.documents:
+                self._register(src['id'], {k: v for k, v in src.items() if k != 'id'})
+                if src['id'][1:].isdigit():
+                    self._next_id = max(self._next_id, int(src['id'][1:]) + 1)
+
+    def add(self, result: Dict) -> str:
+        """Source ID for a search result, registering it if it is a new document."""
+        self.results_seen += 1
+        source_id = next((self._ids[key] for key in self._keys(result) if key in self._ids), None)
+        if source_id is None:
+            source_id = f"S{self._next_id}"
+            self._next_id += 1
+            self._register(source_id, result)
+        return source_id
+
+    def select(self, results: List[Dict], limit: int) -> List[str]:
+        """IDs of the first `limit` distinct documents among one question's results."""
+        selected = []
+        for result in results:
+            source_id = self.add(result)
+            if source_id not in selected:
+                selected.append(source_id)
+            if len(selected) == limit:
+                break
+        return selected
+
+    def stats(self) -> Dict[str, int]:
+        return {"results": self.results_seen, "documents": len(self.documents),
+                "duplicates": self.results_seen - len(self.documents)}
@@ -0,0 +1,203 @@
+"""The resource-list LangGraph workflow, built around an injected LLM and search tool.
+
+main.py wires it to Gemini and Tavily; the benchmarks pass the offline fakes
+from fakes.py. The graph is compiled once per ResourceListWorkflow and reused
+for every topic it runs. Given an output directory, a run writes the topic's
+Markdown file section by section and resumes from its journal (journal.py).
+Given a checkpoint path, the graph state is saved to SQLite after every node
+(one LangGraph thread per topic), and `resume(topic)` continues an
+interrupted run from the node after the last completed one.
+"""
+import asyncio
+import contextlib
+import os
+import re
+from typing import TypedDict, Annotated, List, Dict, Optional
+
+from langgraph.graph import StateGraph, START, END
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+
+from journal import ResourceJournal, render_markdown
+from questions import (QUESTION_SYSTEM_PROMPT, STRUCTURED_QUESTION_SYSTEM_PROMPT,
+                       generate_structured_questions, parse_numbered_questions)
+from research import DEFAULT_MAX_CONCURRENCY, DEFAULT_TIMEOUT, gather_answers
+
+
+# Define the state structure
+class State(TypedDict):
+    topic: str
+    questions: List[str]
+    resources: List[Dict]
+    markdown: str
+    messages: Annotated[list, "Messages for LLM context"]
+    output_dir: str  # Empty: keep the result in memory only
+    file: str
+
+
+class NoCheckpointError(LookupError):
+    """resume() was asked for a topic that has no checkpoint."""
+
+
+def topic_filename(topic: str) -> str:
+    """Markdown file name for a topic: lowercase, runs of other characters become '_'."""
+    return re.sub(r"[^\w-]+", "_", topic.lower()).strip("_") + ".md"
+
+
+class ResourceListWorkflow:
+    def __init__(self, llm, search_tool, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT, structured_questions: bool = True,
+                 checkpoint_path: Optional[str] = None, dedupe_sources: bool = True):
+        self.llm = llm
+        self.search_tool = search_tool
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        # JSON questions validated against a schema (questions.py); False keeps the numbered-list format
+        self.structured_questions = structured_questions
+        # Send each distinct document to the summarizer once per topic (sources.py); False summarizes per question
+        self.dedupe_sources = dedupe_sources
+        # SQLite file for LangGraph checkpoints (needs langgraph-checkpoint-sqlite); None disables them
+        self.checkpoint_path = checkpoint_path
+        self.graph = self._build()
+
+    @staticmethod
+    def _journal(state: State) -> Optional[ResourceJournal]:
+        if not state.get('output_dir'):
+            return None
+        return ResourceJournal(os.path.join(state['output_dir'], topic_filename(state['topic'])))
+
+    # Node 1: Input Topic
+    def input_topic(self, state: State) -> State:
+        state['topic'] = state.get('topic', '')
+        system_prompt = STRUCTURED_QUESTION_SYSTEM_PROMPT if self.structured_questions else QUESTION_SYSTEM_PROMPT
+        state['messages'] = [SystemMessage(content=system_prompt),
+                             HumanMessage(content=f"Topic: {state['topic']}")]
+        return state
+
+    # Node 2: Generate Research Questions using Gemini with System Prompt
+    def generate_questions(self, state: State) -> State:
+        journal = self._journal(state)
+        if journal is not None and journal.questions is not None:
+            # Questions from an earlier, interrupted run
+            state['questions'] = journal.questions
+            print(f"Resuming '{state['topic']}': {len(journal.completed())}/{len(journal.questions)} "
+                  "questions already researched")
+            journal.resume(state['topic'])
+            return state
+        if self.structured_questions:
+            # One targeted repair call if the JSON reply does not validate
+            state['questions'], exchanged = generate_structured_questions(self.llm, state['messages'])
+            state['messages'].extend(exchanged)
+        else:
+            response = self.llm.invoke(state['messages'])
+            # Parse the response into a list of questions
+            state['questions'] = parse_numbered_questions(response.content)
+            state['messages'].append(AIMessage(content=response.content))
+        if journal is not None:
+            journal.start(state['topic'], state['questions'])
+        return state
+
+    # Node 3: Gather Resources using Tavily Search
+    # Searches and Gemini summaries for all questions run concurrently (see research.py);
+    # a question whose search or summary fails keeps whatever it got.
+    # Each finished resource goes to the journal right away; questions it already holds are skipped,
+    # and with dedupe_sources the search results it holds are reused
+    async def gather_resources(self, state: State) -> State:
+        journal = self._journal(state)
+        completed = journal.completed() if journal is not None else {}
+        pending = [q for q in state['questions'] if q not in completed]
+        researched = await gather_answers(pending, self.search_tool, self.llm,
+                                          max_concurrency=self.max_concurrency, timeout=self.timeout,
+                                          on_resource=journal.add if journal is not None else None,
+                                          dedupe_sources=self.dedupe_sources,
+                                          known_sources=[src for r in completed.values() for src in r['sources']],
+                                          on_searched=journal.add_searched if journal is not None else None,
+                                          searched={q: journal.searched[q] for q in pending
+                                                    if q in journal.searched} if journal is not None else None)
+        by_question = {**completed, **{r['question']: r for r in researched}}
+        state['resources'] = [by_question[q] for q in state['questions']]
+        return state
+
+    # Node 4: Compile Markdown Resource List
+    # The sections are already on disk; this rewrites the file in question order
+    def compile_markdown(self, state: State) -> State:
+        state['markdown'] = render_markdown(state['topic'], state['resources'])
+        journal = self._journal(state)
+        if journal is not None:
+            journal.finish(state['markdown'])
+            state['file'] = journal.markdown_path
+        return state
+
+    def _build(self):
+        # Build the LangGraph Workflow
+        workflow = StateGraph(state_schema=State)
+        workflow.add_node("input", self.input_topic)
+        workflow.add_node("questions", self.generate_questions)
+        workflow.add_node("gather", self.gather_resources)
+        workflow.add_node("output", self.compile_markdown)
+
+        # Define edges
+        workflow.add_edge(START, "input")
+        workflow.add_edge("input", "questions")
+        workflow.add_edge("questions", "gather")
+        workflow.add_edge("gather", "output")
+        workflow.add_edge("output", END)
+        return workflow.compile()
+
+    @staticmethod
+    def _config(topic: str) -> Dict:
+        # One checkpoint thread per topic, named like its Markdown file
+        return {"configurable": {"thread_id": os.path.splitext(topic_filename(topic))[0]}}
+
+    @contextlib.asynccontextmanager
+    async def _checkpointed_graph(self):
+        """The compiled graph, bound to the SQLite checkpointer when one is configured."""
+        if self.checkpoint_path is None:
+            yield self.graph
+            return
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.checkpoint_path)), exist_ok=True)
+        async with AsyncSqliteSaver.from_conn_string(self.checkpoint_path) as saver:
+            # copy() swaps the checkpointer in without recompiling the graph
+            yield self.graph.copy(update={"checkpointer": saver})
+
+    @staticmethod
+    def _durability(graph) -> Dict:
+        # Commit each node's checkpoint before the next node starts (only valid with a checkpointer)
+        return {"durability": "sync"} if graph.checkpointer else {}
+
+    async def arun(self, topic: str, output_dir: Optional[str] = None, fresh: bool = False) -> State:
+        """Research one topic; with `output_dir`, write <topic>.md there and resume earlier progress
+        unless `fresh` is set."""
+        if output_dir and fresh:
+            ResourceJournal(os.path.join(output_dir, topic_filename(topic))).discard()
+        initial_state = {"topic": topic, "questions": [], "resources": [], "markdown": "", "messages": [],
+                         "output_dir": output_dir or "", "file": ""}
+        async with self._checkpointed_graph() as graph:
+            if fresh and graph.checkpointer:
+                await graph.checkpointer.adelete_thread(self._config(topic)["configurable"]["thread_id"])
+            # ainvoke because gather_resources is async; the other nodes run in a thread pool
+            return await graph.ainvoke(initial_state, self._config(topic), **self._durability(graph))
+
+    def run(self, topic: str, output_dir: Optional[str] = None, fresh: bool = False) -> State:
+        return asyncio.run(self.arun(topic, output_dir, fresh))
+
+    async def aresume(self, topic: str) -> State:
+        """Continue the topic's checkpointed run after its last completed node.
+
+        A finished run is returned as is; raises NoCheckpointError when the topic has none.
+        """
+        if self.checkpoint_path is None:
+            raise ValueError("resume needs a workflow created with checkpoint_path")
+        config = self._config(topic)
+        async with self._checkpointed_graph() as graph:
+            snapshot = await graph.aget_state(config)
+            if not snapshot.values:
+                raise NoCheckpointError(f"No checkpoint for topic '{topic}' in {self.checkpoint_path}")
+            if not snapshot.next:
+                return snapshot.values
+            print(f"Resuming '{topic}' at the '{snapshot.next[0]}' node")
+            return await graph.ainvoke(None, config, **self._durability(graph))
+
+    def resume(self, topic: str) -> State:
+        return asyncio.run(self.aresume(topic))
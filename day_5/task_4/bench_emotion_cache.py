@@ -0,0 +1,58 @@
+"""Benchmark: weekly journal reports with and without the persistent emotion cache.
+
+A journal of --entries daily entries gets a report, then one more week of
+entries is added and the report rebuilt, --weeks times. Without the cache
+every report maps all chunks again; with it only the chunks that changed
+(the last page or two) reach the LLM. Gemini is replaced with a fake model
+that takes --llm-latency per call and counts calls and prompt characters.
+
+Usage: python bench_emotion_cache.py --entries 365 --weeks 4 --llm-latency 1.0
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from emotion_cache import EmotionCache
+from extract import iter_chunks
+from report import build_report, cache_namespace
+from synthetic import FakeChatModel, make_entries, write_journal_pdf
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=365, help="daily entries before the first report")
+    parser.add_argument("--weeks", type=int, default=4, help="weekly reports after the first one")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="fake model seconds per call")
+    args = parser.parse_args()
+
+    print(f"\n{'entries':>8}{'chunks':>8}  {'emotion cache':<14}{'LLM calls':>10}{'prompt chars':>14}{'seconds':>9}")
+    totals = {"off": [0, 0], "on": [0, 0]}
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "analyses.sqlite3")
+        for week in range(args.weeks + 1):
+            n_entries = args.entries + 7 * week
+            path = os.path.join(tmp, "journal.pdf")
+            write_journal_pdf(path, make_entries(n_entries))
+            chunks = list(iter_chunks(path, workers=1))
+            reports = {}
+            for name in totals:
+                llm = FakeChatModel(args.llm_latency)
+                cache = EmotionCache(cache_path, cache_namespace(llm)) if name == "on" else None
+                start = time.perf_counter()
+                reports[name] = build_report(chunks, llm, cache=cache)
+                seconds = time.perf_counter() - start
+                totals[name][0] += llm.calls
+                totals[name][1] += llm.prompt_chars
+                print(f"{n_entries:>8}{len(chunks):>8}  {name:<14}{llm.calls:>10}{llm.prompt_chars:>14}{seconds:>9.2f}")
+            # Cached labels must give the same report body as analyzing everything again
+            assert reports["on"].split("\n---\n")[0] == reports["off"].split("\n---\n")[0]
+            print(f"{'':>18}{reports['on'].strip().splitlines()[-1]}")
+
+    off, on = totals["off"], totals["on"]
+    print(f"\nweekly reports after the first: {args.weeks}; over all reports the cache saves "
+          f"{off[0] - on[0]} of {off[0]} LLM calls and {1 - on[1] / off[1]:.0%} of prompt characters")
+
+
+if __name__ == "__main__":
+    main()
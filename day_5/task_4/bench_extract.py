@@ -0,0 +1,69 @@
+"""Benchmark: load_and_split-style ingest vs. page-parallel extraction streamed into the vector store.
+
+The baseline mirrors the notebook's old path: extract every page in one
+thread, split everything, then embed all chunks. The streaming path uses
+extract.index_pdf, which extracts page ranges in a process pool and embeds
+batches as soon as their pages are done. Embeddings are offline hashing
+vectors with a fixed latency per call, standing in for the Gemini API.
+
+Usage: python bench_extract.py --entries 20000 --workers 1 2 4 --embed-latency 0.05
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from langchain_core.documents import Document
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from pypdf import PdfReader
+
+from extract import DEFAULT_CHUNK_OVERLAP, DEFAULT_CHUNK_SIZE, DEFAULT_EMBED_BATCH, index_pdf
+from synthetic import HashingEmbeddings, make_entries, write_journal_pdf
+
+
+def baseline(path, embeddings, batch_size):
+    """Returns (seconds, seconds until the first embedding call, chunks)."""
+    start = time.perf_counter()
+    reader = PdfReader(path)
+    pages = [Document(page_content=page.extract_text() or "", metadata={"source": path, "page": i})
+             for i, page in enumerate(reader.pages)]
+    chunks = RecursiveCharacterTextSplitter(chunk_size=DEFAULT_CHUNK_SIZE,
+                                            chunk_overlap=DEFAULT_CHUNK_OVERLAP).split_documents(pages)
+    first_embed = time.perf_counter() - start
+    store = InMemoryVectorStore(embeddings)
+    for i in range(0, len(chunks), batch_size):
+        store.add_documents(chunks[i:i + batch_size])
+    return time.perf_counter() - start, first_embed, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=20000, help="daily journal entries in the PDF")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="seconds per embedding call")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_EMBED_BATCH)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "journal.pdf")
+        n_pages = write_journal_pdf(path, make_entries(args.entries))
+        print(f"{args.entries} entries, {n_pages} pages, {os.cpu_count()} CPUs")
+
+        seconds, first_embed, chunks = baseline(path, HashingEmbeddings(latency=args.embed_latency), args.batch_size)
+        print(f"\n{'ingest':<22}{'seconds':>9}{'pages/s':>9}{'first embed (s)':>17}{'chunks':>8}")
+        print(f"{'load_and_split':<22}{seconds:>9.2f}{n_pages / seconds:>9.0f}{first_embed:>17.2f}{len(chunks):>8}")
+        expected = [chunk.page_content for chunk in chunks]
+
+        for workers in args.workers:
+            store = InMemoryVectorStore(HashingEmbeddings(latency=args.embed_latency))
+            stats = index_pdf(path, store, batch_size=args.batch_size, workers=workers)
+            stored = sorted(store.store.values(), key=lambda doc: doc["metadata"]["page"])
+            assert [doc["text"] for doc in stored] == expected, f"{workers} workers: chunks differ from the baseline"
+            label = f"streamed, {workers} worker{'s' if workers > 1 else ''}"
+            print(f"{label:<22}{stats.seconds:>9.2f}{stats.pages_per_second:>9.0f}"
+                  f"{stats.first_batch_seconds:>17.2f}{stats.chunks:>8}")
+
+
+if __name__ == "__main__":
+    main()
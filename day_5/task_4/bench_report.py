@@ -0,0 +1,92 @@
+"""Benchmark: the notebook's three agent runs vs. the single-pass map/reduce report.
+
+The agent baseline replays the shortest ReAct trajectory that answers each
+of the notebook's three report questions with its tools: a thought calling
+find_themes (similarity search, k=5, one LLM call), a thought calling
+detect_emotions on the retrieved text (one LLM call) and the final answer,
+each thought prompt carrying the scratchpad so far. Real agent runs often
+take more steps, so its numbers are a lower bound. Gemini is replaced with
+a fake model that takes --llm-latency per call and counts calls and prompt
+characters; "excerpts read" is how many distinct chunks reached the LLM.
+
+Usage: python bench_report.py --entries 7 30 90 365 --llm-latency 1.0
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from extract import iter_chunks
+from report import build_report, map_batches
+from synthetic import FakeChatModel, HashingEmbeddings, make_entries, write_journal_pdf
+
+# The notebook's report questions, one agent run each
+QUESTIONS = ["Provide a complete analysis of the journal, including recurring themes and key emotions "
+             "with patterns and shifts.",
+             "Detect key emotions in the journal entries.",
+             "Find recurring themes across all entries."]
+AGENT_PROMPT = ("Answer the following questions as best you can. You have access to the following tools:\n"
+                "detect_emotions: Detect emotions in a journal entry.\n"
+                "find_themes: Find recurring themes across entries.\n"
+                "Use the format Question/Thought/Action/Action Input/Observation ... Final Answer.\n")
+
+
+def agent_report(chunks, llm):
+    """Returns the set of chunk texts the LLM saw."""
+    vectorstore = InMemoryVectorStore(HashingEmbeddings())
+    vectorstore.add_documents(chunks)
+    seen = set()
+    for question in QUESTIONS:
+        scratchpad = f"{AGENT_PROMPT}\nQuestion: {question}\n"
+        llm.invoke(scratchpad)  # Thought -> find_themes
+        results = vectorstore.similarity_search(question, k=5)
+        seen.update(doc.page_content for doc in results)
+        combined_text = " ".join(doc.page_content for doc in results)
+        themes = llm.invoke(f"Identify recurring themes in: {combined_text}.").content
+        scratchpad += f"Action: find_themes\nAction Input: {question}\nObservation: {themes}\n"
+        llm.invoke(scratchpad)  # Thought -> detect_emotions
+        emotions = llm.invoke(f"Analyze the emotions in this text: {combined_text}. Summarize key emotions.").content
+        scratchpad += f"Action: detect_emotions\nAction Input: {combined_text}\nObservation: {emotions}\n"
+        llm.invoke(scratchpad)  # Final answer
+    return seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[7, 30, 90, 365],
+                        help="journal lengths in daily entries")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="fake model seconds per call")
+    args = parser.parse_args()
+
+    print(f"\n{'entries':>8}{'chunks':>8}  {'report':<12}{'LLM calls':>10}{'prompt chars':>14}"
+          f"{'seconds':>9}{'excerpts read':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_entries in args.entries:
+            path = os.path.join(tmp, f"journal_{n_entries}.pdf")
+            write_journal_pdf(path, make_entries(n_entries))
+            chunks = list(iter_chunks(path, workers=1))
+            rows = {}
+
+            llm = FakeChatModel(args.llm_latency)
+            start = time.perf_counter()
+            seen = agent_report(chunks, llm)
+            rows["3 agent runs"] = (llm.calls, llm.prompt_chars, time.perf_counter() - start, len(seen))
+
+            llm = FakeChatModel(args.llm_latency)
+            start = time.perf_counter()
+            report = build_report(chunks, llm)
+            assert f"{len(chunks)} of {len(chunks)} excerpts analyzed" in report
+            assert llm.calls == len(map_batches(chunks)) + 1
+            rows["single pass"] = (llm.calls, llm.prompt_chars, time.perf_counter() - start, len(chunks))
+
+            for name, (calls, chars, seconds, read) in rows.items():
+                print(f"{n_entries:>8}{len(chunks):>8}  {name:<12}{calls:>10}{chars:>14}{seconds:>9.2f}"
+                      f"{read:>10}/{len(chunks)}")
+            fewer = rows["3 agent runs"][0] / rows["single pass"][0]
+            print(f"{'':>18}{fewer:.1f}x fewer LLM calls with the single pass")
+
+
+if __name__ == "__main__":
+    main()
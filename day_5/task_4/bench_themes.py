@@ -0,0 +1,77 @@
+"""Benchmark: find_themes from the top-5 similar chunks vs. clustering every chunk.
+
+Synthetic journals are ingested one chunk per entry and embedded with
+offline hashing embeddings. The old find_themes sends the 5 chunks most
+similar to the notebook's theme question to the LLM; the theme engine
+clusters all vectors (mini-batch k-means) and sends the medoids of each
+cluster. A fake LLM names themes from the synthetic sentences it sees, so
+the named themes can be checked against the generator's ground truth.
+
+Usage: python bench_themes.py --entries 90 365 3650 --clusters 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from extract import iter_entries
+from synthetic import THEMES, FakeChatModel, HashingEmbeddings, label_text, make_entries, write_journal_pdf
+from themes import discover_themes, minibatch_kmeans
+
+QUERY = "Find recurring themes across all entries."
+
+
+def top_k_themes(vectorstore, llm, k=5):
+    """The old tool: similarity search, then one LLM call over the combined text; returns themes named."""
+    results = vectorstore.similarity_search(QUERY, k=k)
+    combined_text = " ".join(doc.page_content for doc in results)
+    llm.invoke(f"Identify recurring themes in: {combined_text}.")
+    return set(label_text(combined_text)), len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[90, 365, 3650], help="journal lengths")
+    parser.add_argument("--clusters", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"\n{'entries':>8}  {'find_themes':<14}{'entries seen':>13}{'themes found':>14}{'prompt chars':>14}"
+          f"{'seconds':>9}")
+    for n_entries in args.entries:
+        entries = make_entries(n_entries)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "journal.pdf")
+            write_journal_pdf(path, entries)
+            chunks = list(iter_entries(path, workers=1))
+        vectors = np.array(HashingEmbeddings().embed_documents([chunk.page_content for chunk in chunks]))
+
+        vectorstore = InMemoryVectorStore(HashingEmbeddings())
+        vectorstore.add_documents(chunks)
+        llm = FakeChatModel()
+        start = time.perf_counter()
+        found, seen = top_k_themes(vectorstore, llm)
+        print(f"{n_entries:>8}  {'top-5 search':<14}{seen:>13}{len(found):>10}/{len(THEMES)}"
+              f"{llm.prompt_chars:>14}{time.perf_counter() - start:>9.2f}")
+
+        llm = FakeChatModel()
+        start = time.perf_counter()
+        themes = discover_themes(chunks, vectors, llm, args.clusters)
+        seconds = time.perf_counter() - start
+        found = {theme["name"] for theme in themes} & set(THEMES)
+        assert llm.calls == 1 and sum(theme["entries"] for theme in themes) == len(chunks)
+        print(f"{n_entries:>8}  {'clusters':<14}{len(chunks):>13}{len(found):>10}/{len(THEMES)}"
+              f"{llm.prompt_chars:>14}{seconds:>9.2f}")
+
+        # How well the clusters follow the generator's themes
+        _, labels = minibatch_kmeans(vectors, args.clusters)
+        truth = np.array([entry["theme"] for entry in entries])
+        purity = sum(Counter(truth[labels == c]).most_common(1)[0][1] for c in np.unique(labels)) / len(truth)
+        print(f"{'':>10}cluster purity {purity:.0%}")
+
+
+if __name__ == "__main__":
+    main()
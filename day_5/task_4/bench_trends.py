@@ -0,0 +1,86 @@
+"""Benchmark: emotion trends from all dated entries vs. the agent's top-k sample.
+
+A synthetic journal is ingested one chunk per entry (extract.iter_entries),
+labelled by the report's map step with a fake LLM, and the trend engine's
+shifts are checked against the same computation on the generator's
+ground-truth emotions. The agent baseline sees what find_themes retrieves:
+k=5 chunks, by entry or by page. The engine is then timed on larger
+label sets to show it stays linear in the number of entries.
+
+Usage: python bench_trends.py --entries 730 --scale 10000 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from extract import iter_chunks, iter_entries
+from report import analyze_chunks, dated_emotions
+from synthetic import FakeChatModel, HashingEmbeddings, make_entries, write_journal_pdf
+from trends import emotion_series, find_shifts, periods
+
+QUERY = "Provide a complete analysis of the journal, including recurring themes and key emotions with patterns and shifts."
+
+
+def sampled_dates(chunks, k=5):
+    """Distinct entry dates in the k chunks a similarity search returns for the report question."""
+    vectorstore = InMemoryVectorStore(HashingEmbeddings())
+    vectorstore.add_documents(chunks)
+    texts = " ".join(doc.page_content for doc in vectorstore.similarity_search(QUERY, k=k))
+    return sum(line.strip()[-6:-4] == ", " for line in texts.splitlines())  # Date lines end in ", YYYY"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=730, help="daily entries in the PDF journal")
+    parser.add_argument("--scale", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="label counts the trend engine is timed on")
+    args = parser.parse_args()
+
+    entries = make_entries(args.entries)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "journal.pdf")
+        write_journal_pdf(path, entries)
+        start = time.perf_counter()
+        chunks = list(iter_entries(path, workers=1))
+        ingest_seconds = time.perf_counter() - start
+        page_chunks = list(iter_chunks(path, workers=1))
+
+    assert [chunk.metadata["date"] for chunk in chunks] == [e["date"].isoformat() for e in entries]
+    llm = FakeChatModel()
+    analyses = analyze_chunks(chunks, llm)
+    start = time.perf_counter()
+    series = emotion_series(dated_emotions(chunks, analyses))
+    shifts = find_shifts(series)
+    engine_seconds = time.perf_counter() - start
+    truth = find_shifts(emotion_series([(e["date"].isoformat(), [e["emotion"]]) for e in entries]))
+    assert shifts == truth, "shifts from the LLM labels differ from the ground truth"
+
+    print(f"\n{args.entries} entries ingested by date in {ingest_seconds:.2f}s; "
+          f"{len(periods(series))} periods, {len(shifts)} shifts, identical to the ground truth; "
+          f"trend engine {engine_seconds * 1000:.1f} ms, {llm.calls} map calls")
+    print(f"\n{'trend input':<32}{'entries seen':>13}{'coverage':>10}")
+    print(f"{'trend engine (all entries)':<32}{int(series.entries.sum()):>13}{series.entries.sum() / len(entries):>10.0%}")
+    for name, pool in (("agent, k=5 entry chunks", chunks), ("agent, k=5 page chunks", page_chunks)):
+        seen = sampled_dates(pool)
+        print(f"{name:<32}{seen:>13}{seen / len(entries):>10.1%}")
+
+    print(f"\n{'labelled entries':>17}{'days':>8}{'engine ms':>11}{'ms per 100k':>13}")
+    rng = np.random.default_rng(0)
+    emotions = np.array(["anxiety", "gratitude", "optimism", "joy", "sadness", "calm", "anger", "hope"])
+    for n in args.scale:
+        days = np.datetime64("2000-01-01") + np.sort(rng.integers(0, max(n // 3, 1), n))
+        dated = [(str(day), [emotion]) for day, emotion in zip(days, rng.choice(emotions, n))]
+        start = time.perf_counter()
+        series = emotion_series(dated)
+        find_shifts(series)
+        periods(series)
+        ms = (time.perf_counter() - start) * 1000
+        print(f"{n:>17}{len(series.days):>8}{ms:>11.1f}{ms / n * 100_000:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
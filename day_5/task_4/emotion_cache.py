@@ -0,0 +1,68 @@
+"""Persistent, content-addressed cache of per-chunk emotion/theme analyses.
+
+A journal only grows at the end, so when new entries are added the chunks
+of the earlier pages are unchanged. Their analyses are stored in SQLite
+under sha256(model name + map prompt + chunk text); a report over a year of
+entries then sends only the new chunks to the LLM. Changing the model or
+the map prompt changes every key, so stale labels are never served.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Shared helpers live in <repo>/common
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.cache_utils import HitCounter, in_batches
+
+DEFAULT_CACHE_PATH = os.path.join(".emotion_cache", "analyses.sqlite3")
+
+
+def analysis_key(namespace: str, text: str) -> str:
+    return hashlib.sha256(f"{namespace}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmotionCache(HitCounter):
+    """Chunk analyses for one model and prompt, with hit/miss counters for the current run."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, namespace: str = ""):
+        self.namespace = namespace
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, analysis TEXT, created REAL)")
+        self.reset_hits()
+        self.stored = 0
+
+    def get_many(self, texts: List[str]) -> List[Optional[Dict]]:
+        """Look up cached analyses; returns None for each miss."""
+        keys = [analysis_key(self.namespace, text) for text in texts]
+        found: Dict[str, str] = {}
+        for batch, placeholders in in_batches(keys):
+            found.update(self.db.execute(
+                f"SELECT key, analysis FROM analyses WHERE key IN ({placeholders})", batch).fetchall())
+        results = [json.loads(found[key]) if key in found else None for key in keys]
+        self.record_lookups(len(texts), sum(result is not None for result in results))
+        return results
+
+    def put_many(self, texts: List[str], analyses: List[Dict]) -> None:
+        now = time.time()
+        rows = [(analysis_key(self.namespace, text), json.dumps(analysis), now)
+                for text, analysis in zip(texts, analyses)]
+        self.db.executemany("INSERT OR REPLACE INTO analyses VALUES (?, ?, ?)", rows)
+        self.db.commit()
+        self.stored += len(rows)
+
+    def reset_stats(self) -> None:
+        self.reset_hits()
+        self.stored = 0
+
+    def stats(self) -> Dict:
+        return {
+            **self.hit_stats(),
+            "stored": self.stored,
+            "entries": self.db.execute("SELECT COUNT(*) FROM analyses").fetchone()[0],
+        }
@@ -0,0 +1,215 @@
+"""Page-parallel text extraction and chunking for journal PDFs.
+
+`PyPDFLoader.load_and_split()` reads every page in one thread and returns
+only once the whole file is split, so embedding cannot start before the last
+page is parsed. Here a process pool extracts and splits page ranges, and the
+chunks are yielded in page order as soon as their range is done; `index_pdf`
+embeds them in batches while later ranges are still being read.
+
+`iter_entries` chunks by journal entry instead of by page: each entry
+starts at a date line such as "July 1, 2025", and its date goes into the
+chunk metadata (ISO format) for the trend engine in trends.py.
+"""
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from pypdf import PdfReader
+
+DEFAULT_PAGES_PER_TASK = 16  # Pages extracted per pool task
+DEFAULT_CHUNK_SIZE = 4000  # load_and_split's default splitter settings
+DEFAULT_CHUNK_OVERLAP = 200
+DEFAULT_EMBED_BATCH = 64  # Chunks per add_documents call
+
+# A line holding only an entry date, e.g. "July 1, 2025"
+DATE_LINE = re.compile(r"^[ \t]*((?:January|February|March|April|May|June|July|August|September|October|November"
+                       r"|December) \d{1,2}, \d{4})[ \t]*$", re.MULTILINE)
+
+
+@dataclass
+class ExtractionStats:
+    pages: int = 0
+    chunks: int = 0
+    embed_seconds: float = 0.0
+    first_chunk_seconds: Optional[float] = None
+    first_batch_seconds: Optional[float] = None  # When the first add_documents call started
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+
+    @property
+    def seconds(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    def report(self) -> str:
+        return (f"{self.pages} pages -> {self.chunks} chunks in {self.seconds:.2f}s "
+                f"({self.pages_per_second:.0f} pages/s, first chunk after {self.first_chunk_seconds or 0:.2f}s, "
+                f"{self.embed_seconds:.2f}s embedding)")
+
+
+@lru_cache(maxsize=4)
+def _reader(path: str, mtime: float) -> PdfReader:
+    # Opening flattens the whole page tree, so each process does it once per file version
+    return PdfReader(path)
+
+
+def open_pdf(path: str) -> PdfReader:
+    return _reader(path, os.path.getmtime(path))
+
+
+def page_count(path: str) -> int:
+    return len(open_pdf(path).pages)
+
+
+def extract_chunks(path: str, start: int, stop: int, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   chunk_overlap: int = DEFAULT_CHUNK_OVERLAP) -> List[Document]:
+    """Extract pages [start, stop) and split them; runs in a worker process.
+
+    Chunks carry the same metadata as PyPDFLoader's (source, 0-based page).
+    """
+    reader = open_pdf(path)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    pages = [Document(page_content=reader.pages[i].extract_text() or "", metadata={"source": path, "page": i})
+             for i in range(start, stop)]
+    return splitter.split_documents(pages)
+
+
+def extract_pages(path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop); runs in a worker process."""
+    reader = open_pdf(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def parse_entry_date(text: str) -> Optional[date]:
+    try:
+        return datetime.strptime(text.strip(), "%B %d, %Y").date()
+    except ValueError:  # Looks like a date line but is not a real date, e.g. "February 30, 2025"
+        return None
+
+
+def _page_ranges(n_pages: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + pages_per_task, n_pages)) for start in range(0, n_pages, pages_per_task)]
+
+
+def _in_page_order(task: Callable, path: str, pages_per_task: int, workers: Optional[int], *args) -> Iterator:
+    """Run `task(path, start, stop, *args)` over all page ranges; yields (start, stop, result) in page order.
+
+    `workers` defaults to the CPU count; with one worker (or one page range)
+    everything runs in this process. At most two ranges per worker are in
+    flight, so memory stays bounded for very long journals.
+    """
+    ranges = _page_ranges(page_count(path), pages_per_task)
+    workers = min(workers or os.cpu_count() or 1, len(ranges)) or 1
+    if workers == 1:
+        for start, stop in ranges:
+            yield start, stop, task(path, start, stop, *args)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        todo = iter(ranges)
+        for start, stop in todo:
+            pending.append((start, stop, pool.submit(task, path, start, stop, *args)))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            start, stop, future = pending.popleft()
+            next_range = next(todo, None)
+            if next_range is not None:
+                pending.append((*next_range, pool.submit(task, path, *next_range, *args)))
+            yield start, stop, future.result()
+
+
+def _emit(stats: ExtractionStats, chunks: List[Document]) -> Iterator[Document]:
+    for chunk in chunks:
+        if stats.first_chunk_seconds is None:
+            stats.first_chunk_seconds = time.perf_counter() - stats.started
+        stats.chunks += 1
+        yield chunk
+
+
+def iter_chunks(path: str, workers: Optional[int] = None, pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+                chunk_size: int = DEFAULT_CHUNK_SIZE, chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+                stats: Optional[ExtractionStats] = None) -> Iterator[Document]:
+    """Yield the PDF's chunks in page order while later pages are still being extracted."""
+    stats = stats if stats is not None else ExtractionStats()
+    for start, stop, chunks in _in_page_order(extract_chunks, path, pages_per_task, workers, chunk_size, chunk_overlap):
+        stats.pages += stop - start
+        yield from _emit(stats, chunks)
+    stats.finished = time.perf_counter()
+
+
+def iter_entries(path: str, workers: Optional[int] = None, pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+                 stats: Optional[ExtractionStats] = None) -> Iterator[Document]:
+    """Yield one chunk per journal entry, in journal order, with its date in the metadata.
+
+    Pages are extracted in the pool as in iter_chunks; entries may continue
+    across pages, so they are cut at date lines here. The metadata is
+    {source, page (where the entry starts), date (ISO)}; text before the
+    first date line gets no date. Entries longer than `chunk_size` are
+    split, each part keeping the entry's metadata.
+    """
+    stats = stats if stats is not None else ExtractionStats()
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    text, metadata = "", {"source": path, "page": 0}
+
+    def entry() -> List[Document]:
+        if not text.strip():
+            return []
+        return splitter.split_documents([Document(page_content=text.strip(), metadata=metadata)])
+
+    for start, _, pages in _in_page_order(extract_pages, path, pages_per_task, workers):
+        for page, page_text in enumerate(pages, start):
+            position = 0
+            for match in DATE_LINE.finditer(page_text):
+                entry_date = parse_entry_date(match.group(1))
+                if entry_date is None:
+                    continue
+                text += page_text[position:match.start()]
+                yield from _emit(stats, entry())
+                text, metadata = "", {"source": path, "page": page, "date": entry_date.isoformat()}
+                position = match.start()
+            text += page_text[position:] + "\n"
+            stats.pages += 1
+    yield from _emit(stats, entry())
+    stats.finished = time.perf_counter()
+
+
+def index_pdf(path: str, vectorstore, batch_size: int = DEFAULT_EMBED_BATCH, by_entry: bool = False,
+              **extract_options) -> ExtractionStats:
+    """Stream the PDF's chunks into `vectorstore.add_documents` in batches; returns the run's stats.
+
+    Any LangChain vector store works (Chroma in the notebook). Extraction of
+    later pages continues in the pool while a batch is being embedded. With
+    `by_entry`, chunks are dated journal entries (iter_entries) instead of pages.
+    """
+    stats = ExtractionStats()
+    batch = []
+
+    def flush():
+        start = time.perf_counter()
+        if stats.first_batch_seconds is None:
+            stats.first_batch_seconds = start - stats.started
+        vectorstore.add_documents(batch)
+        stats.embed_seconds += time.perf_counter() - start
+        batch.clear()
+
+    for chunk in (iter_entries if by_entry else iter_chunks)(path, stats=stats, **extract_options):
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    stats.finished = time.perf_counter()
+    return stats
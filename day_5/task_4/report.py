@@ -0,0 +1,287 @@
+"""Single-pass journal report: analyze every chunk once, then reduce to the report sections.
+
+The notebook's old report ran the agent three times ("complete analysis",
+"key emotions", "recurring themes"); every run re-retrieved a handful of
+entries and re-summarized them through detect_emotions and find_themes.
+Here the chunks are read from the vector store once, a map step labels the
+emotions and themes of every chunk in batched LLM calls, the labels are
+counted in Python, and one reduce call writes the three sections from the
+counts and a sample of the per-chunk summaries. With an EmotionCache
+(emotion_cache.py) only chunks not analyzed in an earlier run are mapped.
+When the chunks are dated entries (extract.iter_entries), emotion shifts
+over time are computed in trends.py and the reduce call only narrates them.
+"""
+import hashlib
+import json
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Type
+
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel, Field, ValidationError
+
+from emotion_cache import EmotionCache
+from trends import DEFAULT_WINDOW_DAYS, emotion_series, find_shifts, periods, shift_table, trend_lines
+
+DEFAULT_MAP_BATCH_CHARS = 24000  # Excerpt characters per map call (~6k tokens)
+DEFAULT_MAX_CONCURRENCY = 4  # Map calls in flight at once
+REDUCE_SUMMARIES = 60  # Per-chunk summaries sent to the reduce call, spread over the journal
+TOP_LABELS = 10  # Emotions/themes listed with their counts
+
+
+class ChunkAnalysis(BaseModel):
+    excerpt: int = Field(description="Number of the excerpt being analyzed")
+    emotions: List[str] = Field(description="Dominant emotions, one or two words each, most prominent first")
+    themes: List[str] = Field(description="Recurring themes or life areas, a few words each")
+    summary: str = Field(description="One sentence on what the excerpt is about")
+
+
+class ChunkAnalyses(BaseModel):
+    excerpts: List[ChunkAnalysis]
+
+
+class ReportSections(BaseModel):
+    summary: str = Field(description="Complete analysis of the journal with patterns and shifts over time, Markdown")
+    emotions: str = Field(description="Key emotions and how they change, Markdown")
+    themes: str = Field(description="Recurring themes and how often they appear, Markdown")
+
+
+# System Prompt for the map step: label each excerpt of a batch
+MAP_SYSTEM_PROMPT = f"""
+You are analyzing excerpts from a personal journal.
+For every numbered excerpt, identify the dominant emotions and the recurring themes it touches on,
+and summarize it in one sentence. Use short, consistent labels (e.g. "anxiety", "work stress").
+Reply with only a JSON object matching this JSON schema, with no other text:
+{json.dumps(ChunkAnalyses.model_json_schema())}
+"""
+
+# System Prompt for the reduce step: write the report from the aggregated labels
+REDUCE_SYSTEM_PROMPT = f"""
+You are writing an analysis report of a personal journal.
+You get how often each emotion and theme was found across all journal excerpts,
+and one-sentence summaries of excerpts in journal order.
+Write a complete analysis including patterns and shifts over time, the key emotions, and the recurring themes.
+Base every statement on the provided data. When emotion trends computed from the entry dates are given,
+describe patterns and shifts over time from those figures only: they are exact, the summaries are a sample.
+Reply with only a JSON object matching this JSON schema, with no other text:
+{json.dumps(ReportSections.model_json_schema())}
+"""
+
+
+def parse_json_reply(text: str, model: Type[BaseModel]) -> BaseModel:
+    """Validate the JSON in an LLM reply against `model`; raises ValueError describing what is wrong."""
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if match is None:
+        raise ValueError("the reply contains no JSON object")
+    try:
+        return model.model_validate(json.loads(match.group(0)))
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise ValueError(f"the reply does not match the schema ({e})") from None
+
+
+def stored_chunks(vectorstore) -> List[Document]:
+    """All chunks in a Chroma vector store, in page order: the report's single retrieval."""
+    stored = vectorstore.get(include=["documents", "metadatas"])
+    chunks = [Document(page_content=text, metadata=metadata or {})
+              for text, metadata in zip(stored["documents"], stored["metadatas"])]
+    return sorted(chunks, key=lambda chunk: chunk.metadata.get("page", 0))
+
+
+def cache_namespace(llm) -> str:
+    """EmotionCache namespace for this model and map prompt: changing either invalidates the cached labels."""
+    model = getattr(llm, "model", None) or type(llm).__name__
+    return f"{model}:{hashlib.sha256(MAP_SYSTEM_PROMPT.encode('utf-8')).hexdigest()[:16]}"
+
+
+def map_batches(chunks: List[Document], max_chars: int = DEFAULT_MAP_BATCH_CHARS,
+                indexes: Optional[List[int]] = None) -> List[List[int]]:
+    """Group chunk indexes (all by default) into batches of at most `max_chars` excerpt characters.
+
+    Every batch has at least one chunk, however long.
+    """
+    batches, size = [[]], 0
+    for i in range(len(chunks)) if indexes is None else indexes:
+        if batches[-1] and size + len(chunks[i].page_content) > max_chars:
+            batches.append([])
+            size = 0
+        batches[-1].append(i)
+        size += len(chunks[i].page_content)
+    return [batch for batch in batches if batch]
+
+
+def map_prompt(chunks: List[Document], batch: List[int]) -> str:
+    return "\n\n".join(f"Excerpt {i + 1}:\n{chunks[i].page_content}" for i in batch)
+
+
+def analyze_chunks(chunks: List[Document], llm, batch_chars: int = DEFAULT_MAP_BATCH_CHARS,
+                   max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                   cache: Optional[EmotionCache] = None) -> List[Optional[Dict]]:
+    """Map step: emotions, themes and a summary for every chunk, in one batched pass.
+
+    Returns one entry per chunk; None for chunks whose batch failed or whose
+    analysis was missing from the reply. Chunks found in `cache` are not sent
+    to the LLM, and new analyses are added to it.
+    """
+    analyses: List[Optional[Dict]] = [None] * len(chunks)
+    if cache is not None:
+        analyses = cache.get_many([chunk.page_content for chunk in chunks])
+    missing = [i for i, analysis in enumerate(analyses) if analysis is None]
+    if not missing:
+        return analyses
+    batches = map_batches(chunks, batch_chars, missing)
+    prompts = [[SystemMessage(content=MAP_SYSTEM_PROMPT), HumanMessage(content=map_prompt(chunks, batch))]
+               for batch in batches]
+    replies = llm.batch(prompts, config={"max_concurrency": max_concurrency}, return_exceptions=True)
+    for batch, reply in zip(batches, replies):
+        try:
+            if isinstance(reply, Exception):
+                raise reply
+            found = parse_json_reply(reply.content, ChunkAnalyses).excerpts
+        except Exception as e:
+            print(f"Warning: analyzing excerpts {batch[0] + 1}-{batch[-1] + 1} failed ({type(e).__name__}: {e})")
+            continue
+        for analysis in found:
+            if analysis.excerpt - 1 in batch:
+                # Excerpt numbers are only valid within this run, so they are not kept
+                analyses[analysis.excerpt - 1] = analysis.model_dump(exclude={"excerpt"})
+    if cache is not None:
+        fresh = [i for i in missing if analyses[i] is not None]
+        cache.put_many([chunks[i].page_content for i in fresh], [analyses[i] for i in fresh])
+    return analyses
+
+
+def detect_chunk_emotions(text: str, llm, cache: Optional[EmotionCache] = None) -> str:
+    """Emotions and themes of one text via the map step and its cache, for the agent's detect_emotions tool."""
+    analysis = analyze_chunks([Document(page_content=text)], llm, cache=cache)[0]
+    if analysis is None:
+        return "The emotions in this text could not be analyzed."
+    return (f"Key emotions: {', '.join(analysis['emotions'])}. Themes: {', '.join(analysis['themes'])}. "
+            f"{analysis['summary']}")
+
+
+def _labels(values: List[str]) -> List[str]:
+    return [re.sub(r"\s+", " ", value).strip().lower() for value in values if value.strip()]
+
+
+def aggregate(analyses: List[Optional[Dict]]) -> Dict[str, Counter]:
+    """Count each emotion and theme once per chunk it was found in."""
+    emotions, themes = Counter(), Counter()
+    for analysis in analyses:
+        if analysis is not None:
+            emotions.update(set(_labels(analysis["emotions"])))
+            themes.update(set(_labels(analysis["themes"])))
+    return {"emotions": emotions, "themes": themes}
+
+
+def dated_emotions(chunks: List[Document], analyses: List[Optional[Dict]]) -> List[Tuple[str, List[str]]]:
+    """(ISO date, emotion labels) per analyzed dated entry; parts of a split entry are merged."""
+    entries: Dict[Tuple, set] = {}
+    for chunk, analysis in zip(chunks, analyses):
+        if analysis is not None and chunk.metadata.get("date"):
+            key = (chunk.metadata["date"], chunk.metadata.get("page"))
+            entries.setdefault(key, set()).update(_labels(analysis["emotions"]))
+    return [(day, sorted(labels)) for (day, _), labels in entries.items()]
+
+
+def emotion_trends(chunks: List[Document], analyses: List[Optional[Dict]],
+                   window: int = DEFAULT_WINDOW_DAYS) -> Optional[Tuple[List[str], str]]:
+    """Prompt lines and a Markdown shift table for the dated entries; None when no chunk has a date."""
+    series = emotion_series(dated_emotions(chunks, analyses))
+    if series is None:
+        return None
+    shifts = find_shifts(series, window)
+    return trend_lines(series, shifts, periods(series, window)), shift_table(shifts, window)
+
+
+def journal_trends(chunks: List[Document], llm, cache: Optional[EmotionCache] = None) -> str:
+    """The computed emotion trends as text, for the agent's emotion_trends tool."""
+    trends = emotion_trends(chunks, analyze_chunks(chunks, llm, cache=cache))
+    if trends is None:
+        return "The journal entries have no dates, so trends over time cannot be computed."
+    return "\n".join(trends[0])
+
+
+def _position(chunk: Document) -> str:
+    return chunk.metadata.get("date") or f"page {chunk.metadata.get('page', 0) + 1}"
+
+
+def reduce_prompt(chunks: List[Document], analyses: List[Optional[Dict]], counts: Dict[str, Counter],
+                  trends: Optional[List[str]] = None) -> str:
+    analyzed = [i for i, analysis in enumerate(analyses) if analysis is not None]
+    step = max(1, len(analyzed) / REDUCE_SUMMARIES)
+    sampled = sorted({analyzed[int(k * step)] for k in range(min(REDUCE_SUMMARIES, len(analyzed)))})
+    lines = [f"Excerpts analyzed: {len(analyzed)}"]
+    for field in ("emotions", "themes"):
+        lines.append(f"\n{field.capitalize()} (excerpts found in):")
+        lines += [f"- {label}: {count}" for label, count in counts[field].most_common(TOP_LABELS)]
+    if trends:
+        lines.append("\nEmotion trends computed from the entry dates (exact):")
+        lines += trends
+    lines.append("\nExcerpt summaries in journal order:")
+    lines += [f"- ({_position(chunks[i])}) {analyses[i]['summary']}" for i in sampled]
+    return "\n".join(lines)
+
+
+def reduce_report(chunks: List[Document], analyses: List[Optional[Dict]], llm,
+                  trends: Optional[List[str]] = None) -> ReportSections:
+    """Reduce step: one LLM call writes the three sections from the aggregated analyses and trends."""
+    counts = aggregate(analyses)
+    messages = [SystemMessage(content=REDUCE_SYSTEM_PROMPT),
+                HumanMessage(content=reduce_prompt(chunks, analyses, counts, trends))]
+    return parse_json_reply(llm.invoke(messages).content, ReportSections)
+
+
+def render_report(sections: ReportSections, analyses: List[Optional[Dict]],
+                  cache_stats: Optional[Dict] = None, shifts: Optional[str] = None) -> str:
+    counts = aggregate(analyses)
+    emotion_counts = ", ".join(f"{label} ({count})" for label, count in counts["emotions"].most_common(TOP_LABELS))
+    theme_counts = ", ".join(f"{label} ({count})" for label, count in counts["themes"].most_common(TOP_LABELS))
+    analyzed = sum(analysis is not None for analysis in analyses)
+    footer = f"{analyzed} of {len(analyses)} excerpts analyzed."
+    if cache_stats is not None:
+        footer += (f" Emotion cache: {cache_stats['hits']} excerpts reused ({cache_stats['hit_rate']:.0%} hit rate), "
+                   f"{cache_stats['stored']} newly analyzed, {cache_stats['entries']} cached in total.")
+    summary = sections.summary
+    if shifts is not None:
+        summary += f"\n\nEmotion shifts computed from the entry dates (share of entries per window):\n\n{shifts}"
+    return f"""
+# Complete Journal Entry Analysis Report
+
+## Summary of Journal Entries
+{summary}
+
+## Key Emotions Detected
+{sections.emotions}
+
+Excerpts per emotion: {emotion_counts}
+
+## Recurring Themes
+{sections.themes}
+
+Excerpts per theme: {theme_counts}
+
+---
+{footer}
+"""
+
+
+def build_report(chunks: List[Document], llm, batch_chars: int = DEFAULT_MAP_BATCH_CHARS,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, cache: Optional[EmotionCache] = None) -> str:
+    """The Markdown report for the journal chunks: batched map calls plus one reduce call.
+
+    With a `cache`, only chunks it does not know yet are mapped, and the
+    cache statistics of this report go into its footer. Dated chunks add
+    the computed emotion shifts to the summary section.
+    """
+    if cache is not None:
+        cache.reset_stats()
+    analyses = analyze_chunks(chunks, llm, batch_chars, max_concurrency, cache)
+    if not any(analyses):
+        raise ValueError("no journal excerpt could be analyzed")
+    cache_stats = cache.stats() if cache is not None else None
+    trends = emotion_trends(chunks, analyses)
+    if trends is None:
+        return render_report(reduce_report(chunks, analyses, llm), analyses, cache_stats)
+    lines, shifts = trends
+    return render_report(reduce_report(chunks, analyses, llm, lines), analyses, cache_stats, shifts)
@@ -0,0 +1,216 @@
+"""Synthetic journals for the benchmarks: dated entries, a minimal PDF writer, offline embeddings and a fake LLM."""
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage
+
+# theme -> (emotion, sentences an entry on that theme is built from)
+THEMES = {
+    "work stress": ("anxiety", [
+        "Deadlines are piling up and I feel anxious about meeting expectations.",
+        "The project review kept me up last night worrying about every detail.",
+        "Another long meeting where my ideas were not heard, which was frustrating.",
+        "My inbox never seems to shrink and the pressure at work keeps building.",
+    ]),
+    "gratitude": ("gratitude", [
+        "Grateful for small joys like a warm coffee and a quiet morning.",
+        "Thankful for the support from family when things get hard.",
+        "I wrote down three good things today and felt calmer afterwards.",
+        "A kind message from a friend lifted my spirits this afternoon.",
+    ]),
+    "personal growth": ("optimism", [
+        "I am learning to speak up more and it is starting to pay off.",
+        "Building better habits slowly, one small step at a time.",
+        "Reflecting on how far I have come since the start of the year.",
+        "Read a chapter of a new book and felt curious and motivated.",
+    ]),
+    "health and exercise": ("joy", [
+        "A long hike today pushed my limits and left me feeling empowered.",
+        "Went for an evening run and my head felt clear afterwards.",
+        "Slept eight hours for once and the whole day felt lighter.",
+        "Yoga in the park helped me shake off the tension in my shoulders.",
+    ]),
+    "loneliness": ("sadness", [
+        "The apartment felt very quiet tonight and I missed having company.",
+        "Scrolled through old photos and felt a little homesick.",
+        "Plans with friends fell through again and I spent the evening alone.",
+        "Some days it feels like nobody really notices how I am doing.",
+    ]),
+}
+
+
+def make_entries(n_entries: int, start: date = date(2025, 1, 1), seed: int = 0) -> List[Dict]:
+    """One entry per day; the mix of themes drifts slowly so there are shifts to find.
+
+    Each entry carries its ground-truth theme and dominant emotion.
+    """
+    rng = random.Random(seed)
+    names = list(THEMES)
+    entries = []
+    for day in range(n_entries):
+        # Work stress peaks every ~90 days, loneliness lags it by a month
+        weights = [1.5 + np.sin(2 * np.pi * day / 90), 1.0, 1.0, 1.0, 0.8 + 0.7 * np.sin(2 * np.pi * (day - 30) / 90)]
+        theme = rng.choices(names, weights=weights)[0]
+        emotion, sentences = THEMES[theme]
+        text = " ".join(rng.sample(sentences, 3))
+        entries.append({"date": start + timedelta(days=day), "theme": theme, "emotion": emotion, "text": text})
+    return entries
+
+
+def format_entry(entry: Dict) -> str:
+    """The layout of journal-entries.pdf: a "July 1, 2025" line, then the text."""
+    return f"{entry['date']:%B} {entry['date'].day}, {entry['date'].year}\n{entry['text']}"
+
+
+def _pdf_string(text: str) -> str:
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def write_journal_pdf(path: str, entries: List[Dict], lines_per_page: int = 48, width: int = 95) -> int:
+    """Write entries as a text PDF (Helvetica, ASCII only); returns the page count."""
+    lines = []
+    for entry in entries:
+        for paragraph in format_entry(entry).split("\n"):
+            words, line = paragraph.split(), ""
+            for word in words:
+                if line and len(line) + 1 + len(word) > width:
+                    lines.append(line)
+                    line = word
+                else:
+                    line = f"{line} {word}" if line else word
+            lines.append(line)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    objects = {1: "<< /Type /Catalog /Pages 2 0 R >>",
+               3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"}
+    kids = []
+    for i, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{page_id} 0 R")
+        stream = "BT /F1 11 Tf 14 TL 50 760 Td " + " ".join(f"{_pdf_string(l)} Tj T*" for l in page_lines) + " ET"
+        objects[page_id] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        objects[content_id] = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += f"{obj_id} 0 obj\n{objects[obj_id]}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offsets[i]:010d} 00000 n \n" for i in sorted(objects)).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+    return len(pages)
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic bag-of-words embeddings standing in for the Gemini embedding API.
+
+    `latency` seconds are spent per embed call, like a remote batch request.
+    """
+
+    def __init__(self, dim: int = 128, latency: float = 0.0):
+        self.dim = dim
+        self.latency = latency
+        self.calls = 0
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        time.sleep(self.latency)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in re.findall(r"\w+", text.lower()):
+                h = zlib.crc32(token.encode("utf-8"))
+                vectors[i, h % self.dim] += 1.0 if h & 1 << 31 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.maximum(norms, 1e-9)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text])[0]
+
+
+def label_text(text: str) -> Counter:
+    """Ground-truth theme counts of a text, from the synthetic sentences it contains."""
+    return Counter(theme for theme, (_, sentences) in THEMES.items() for sentence in sentences
+                   if sentence in re.sub(r"\s+", " ", text))
+
+
+class FakeChatModel:
+    """Stand-in for ChatGoogleGenerativeAI that labels synthetic journal text and counts its calls.
+
+    Each call sleeps `latency` seconds; `batch` runs calls on a thread pool
+    like the real client. Excerpts are labelled with the themes and emotions
+    of the synthetic sentences they contain, any other prompt gets a short
+    canned answer.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _analysis(text: str) -> Dict:
+        themes = [theme for theme, _ in label_text(text).most_common()] or ["daily life"]
+        emotions = [THEMES[theme][0] if theme in THEMES else "calm" for theme in themes]
+        return {"emotions": emotions, "themes": themes, "summary": f"Mostly about {themes[0]}."}
+
+    def _reply(self, prompt: str) -> str:
+        excerpts = re.findall(r"^Excerpt (\d+):\n(.*?)(?=\n\nExcerpt \d+:\n|\Z)", prompt, re.MULTILINE | re.DOTALL)
+        if excerpts:
+            return json.dumps({"excerpts": [dict(self._analysis(text), excerpt=int(n)) for n, text in excerpts]})
+        clusters = re.findall(r"^Cluster (\d+) \(.*?\n(.*?)(?=\nCluster \d+ \(|\Z)", prompt, re.MULTILINE | re.DOTALL)
+        if clusters:
+            themes = []
+            for n, text in clusters:
+                theme = next(iter(label_text(text).most_common(1)), ("daily life", 0))[0]
+                themes.append({"cluster": int(n), "name": theme, "description": f"Entries about {theme}."})
+            return json.dumps({"themes": themes})
+        if prompt.startswith("Excerpts analyzed:"):
+            emotions, themes = (", ".join(re.findall(r"^- ([^:]+): \d+$", part, re.MULTILINE)[:3]) or "none"
+                                for part in prompt.split("\nThemes (")[:2])
+            return json.dumps({"summary": f"The journal centers on {themes}, with {emotions} most often felt.",
+                               "emotions": f"Most frequent: {emotions}.", "themes": f"Most frequent: {themes}."})
+        counts = label_text(prompt)
+        if counts:
+            return f"Key emotions: {', '.join(THEMES[theme][0] for theme, _ in counts.most_common())}."
+        return "The entries describe everyday life."
+
+    def invoke(self, messages) -> AIMessage:
+        prompt = messages[-1].content if isinstance(messages, list) else str(messages)
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += sum(len(m.content) for m in messages) if isinstance(messages, list) else len(prompt)
+        time.sleep(self.latency)
+        return AIMessage(content=self._reply(prompt))
+
+    def batch(self, inputs: List, config: Optional[Dict] = None, return_exceptions: bool = False) -> List:
+        def call(messages):
+            try:
+                return self.invoke(messages)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return e
+
+        with ThreadPoolExecutor((config or {}).get("max_concurrency") or len(inputs) or 1) as pool:
+            return list(pool.map(call, inputs))
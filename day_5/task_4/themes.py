@@ -0,0 +1,160 @@
+"""Theme discovery over every chunk: mini-batch k-means on the stored embeddings.
+
+find_themes used to ask the LLM to name themes from the five chunks closest
+to a query. Here all chunk vectors are clustered, each cluster is
+represented by its medoid chunks, and one LLM call names the themes from
+those representatives, so every entry counts towards a theme (by its
+cluster's size) while the prompt stays bounded by clusters x medoids.
+"""
+import json
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel, Field
+
+from report import parse_json_reply
+
+DEFAULT_CLUSTERS = 8
+MEDOIDS_PER_CLUSTER = 2  # Representative chunks sent to the LLM per cluster
+MEDOID_CHARS = 1200  # Characters kept of each representative
+BATCH_SIZE = 256  # Vectors per mini-batch update
+ITERATIONS = 100  # Mini-batch updates
+ASSIGN_BLOCK = 8192  # Vectors assigned per matrix product, to bound memory
+
+
+class Theme(BaseModel):
+    cluster: int = Field(description="Number of the cluster being named")
+    name: str = Field(description="Short name of the recurring theme")
+    description: str = Field(description="One or two sentences on what the entries in this cluster share")
+
+
+class Themes(BaseModel):
+    themes: List[Theme]
+
+
+# System Prompt for naming clusters of journal entries
+THEME_SYSTEM_PROMPT = f"""
+You are identifying recurring themes in a personal journal.
+All entries were grouped into clusters of similar content; each cluster is shown with its size
+and its most representative excerpts. Name the recurring theme of every cluster and describe it briefly.
+Reply with only a JSON object matching this JSON schema, with no other text:
+{json.dumps(Themes.model_json_schema())}
+"""
+
+
+def stored_vectors(vectorstore) -> Tuple[List[Document], np.ndarray]:
+    """All chunks of a Chroma vector store with their embeddings."""
+    stored = vectorstore.get(include=["documents", "metadatas", "embeddings"])
+    chunks = [Document(page_content=text, metadata=metadata or {})
+              for text, metadata in zip(stored["documents"], stored["metadatas"])]
+    return chunks, np.asarray(stored["embeddings"], dtype=np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+
+def assign(vectors: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """Nearest center (by cosine similarity) of every vector, in blocks."""
+    return np.concatenate([np.argmax(vectors[start:start + ASSIGN_BLOCK] @ centers.T, axis=1)
+                           for start in range(0, len(vectors), ASSIGN_BLOCK)])
+
+
+def minibatch_kmeans(vectors: np.ndarray, k: int, batch_size: int = BATCH_SIZE, iterations: int = ITERATIONS,
+                     seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical mini-batch k-means (Sculley, 2010); returns (unit centers, label per vector).
+
+    Centers start from k-means++ on a sample and move towards each
+    mini-batch with a per-center learning rate of 1/(points seen).
+    """
+    rng = np.random.default_rng(seed)
+    vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+    k = min(k, len(vectors))
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), 20 * k), replace=False)]
+    centers = [sample[rng.integers(len(sample))]]
+    for _ in range(1, k):
+        distance = np.maximum(1.0 - np.max(sample @ np.array(centers).T, axis=1), 0.0)
+        probabilities = distance / distance.sum() if distance.sum() > 0 else None
+        centers.append(sample[rng.choice(len(sample), p=probabilities)])
+    centers = np.array(centers)
+    seen = np.zeros(k)
+    for _ in range(iterations):
+        batch = vectors[rng.choice(len(vectors), min(batch_size, len(vectors)), replace=False)]
+        labels = np.argmax(batch @ centers.T, axis=1)
+        for cluster in np.unique(labels):
+            members = batch[labels == cluster]
+            seen[cluster] += len(members)
+            rate = len(members) / seen[cluster]
+            centers[cluster] = (1 - rate) * centers[cluster] + rate * members.mean(axis=0)
+        centers = _normalize(centers)
+    return centers, assign(vectors, centers)
+
+
+def medoids(vectors: np.ndarray, labels: np.ndarray, per_cluster: int = MEDOIDS_PER_CLUSTER) -> Dict[int, List[int]]:
+    """Indexes of each cluster's `per_cluster` most central members, largest clusters first.
+
+    The member closest to the cluster mean minimizes the summed squared
+    distance to all other members, so it is the medoid without the O(n^2)
+    pairwise search; the next closest members follow it.
+    """
+    vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+    result = {}
+    for cluster in np.argsort(-np.bincount(labels), kind="stable"):
+        members = np.flatnonzero(labels == cluster)
+        if len(members):
+            distance = np.linalg.norm(vectors[members] - vectors[members].mean(axis=0), axis=1)
+            result[int(cluster)] = [int(i) for i in members[np.argsort(distance, kind="stable")[:per_cluster]]]
+    return result
+
+
+def theme_prompt(chunks: List[Document], labels: np.ndarray, representatives: Dict[int, List[int]]) -> str:
+    sizes = np.bincount(labels)
+    lines = []
+    for n, (cluster, members) in enumerate(representatives.items(), 1):
+        lines.append(f"Cluster {n} ({sizes[cluster]} of {len(labels)} entries):")
+        lines += ["- " + re.sub(r"\s+", " ", chunks[i].page_content)[:MEDOID_CHARS] for i in members]
+        lines.append("")
+    return "\n".join(lines)
+
+
+def discover_themes(chunks: List[Document], vectors: np.ndarray, llm, clusters: int = DEFAULT_CLUSTERS,
+                    per_cluster: int = MEDOIDS_PER_CLUSTER) -> List[Dict]:
+    """Recurring themes across all chunks, largest first: one LLM call over the cluster medoids.
+
+    Each theme has its name, description, number of entries and share of the
+    journal. Clusters the LLM gives the same name are merged; clusters it did
+    not name are left out.
+    """
+    if not chunks:
+        return []
+    _, labels = minibatch_kmeans(vectors, clusters)
+    representatives = medoids(vectors, labels, per_cluster)
+    messages = [SystemMessage(content=THEME_SYSTEM_PROMPT),
+                HumanMessage(content=theme_prompt(chunks, labels, representatives))]
+    named = {theme.cluster: theme for theme in parse_json_reply(llm.invoke(messages).content, Themes).themes}
+    sizes = np.bincount(labels)
+    themes: Dict[str, Dict] = {}
+    for n, cluster in enumerate(representatives, 1):
+        if n in named:
+            theme = themes.setdefault(named[n].name.strip().lower(), {
+                "name": named[n].name.strip(), "description": named[n].description, "entries": 0})
+            theme["entries"] += int(sizes[cluster])
+    for theme in themes.values():
+        theme["share"] = theme["entries"] / len(labels)
+    return sorted(themes.values(), key=lambda theme: -theme["entries"])
+
+
+def format_themes(themes: List[Dict]) -> str:
+    if not themes:
+        return "No recurring themes could be identified."
+    return "\n".join(f"- {theme['name']} ({theme['entries']} entries, {theme['share']:.0%}): {theme['description']}"
+                     for theme in themes)
+
+
+def find_journal_themes(vectorstore, llm, clusters: int = DEFAULT_CLUSTERS) -> str:
+    """Themes across every chunk of a Chroma vector store, for the agent's find_themes tool."""
+    chunks, vectors = stored_vectors(vectorstore)
+    return format_themes(discover_themes(chunks, vectors, llm, clusters))
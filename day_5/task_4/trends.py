@@ -0,0 +1,163 @@
+"""Emotion trends over entry dates, computed locally with NumPy.
+
+Each dated chunk (extract.iter_entries) contributes its emotion labels from
+the report's map step. The labels become a day-by-emotion count matrix;
+rolling windows over its cumulative sums give the share of entries showing
+each emotion, and shifts are the largest changes between adjacent windows.
+Everything is exact and O(entries + days); the LLM only narrates the result.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_WINDOW_DAYS = 28  # Length of the windows compared for shifts
+DEFAULT_MIN_CHANGE = 0.15  # Smallest change in the share of entries reported as a shift
+MAX_SHIFTS = 6
+TRACKED_EMOTIONS = 8  # Most frequent emotions followed over time
+MAX_PERIODS = 24  # Periods in the overview; long journals get longer periods
+
+
+@dataclass
+class EmotionSeries:
+    days: np.ndarray  # datetime64[D], every calendar day from the first to the last entry
+    emotions: List[str]
+    counts: np.ndarray  # (days, emotions): entries on that day showing the emotion
+    entries: np.ndarray  # (days,): entries on that day
+
+
+@dataclass
+class Shift:
+    emotion: str
+    start: date  # First day of the earlier window
+    middle: date  # First day of the later window
+    end: date  # Last day of the later window
+    before: float  # Share of entries showing the emotion in the earlier window
+    after: float
+
+    @property
+    def change(self) -> float:
+        return self.after - self.before
+
+
+@dataclass
+class Period:
+    start: date
+    end: date
+    entries: int
+    emotion: Optional[str]  # Most frequent emotion, None without entries
+    share: float
+
+
+def emotion_series(dated: Iterable[Tuple[str, List[str]]], top: int = TRACKED_EMOTIONS) -> Optional[EmotionSeries]:
+    """Day-by-emotion counts from (ISO date, emotion labels) pairs, one pair per dated entry.
+
+    Only the `top` most frequent emotions are tracked. Returns None without
+    dated entries.
+    """
+    dated = list(dated)
+    if not dated:
+        return None
+    labels, inverse = np.unique([label for _, emotions in dated for label in set(emotions)], return_inverse=True)
+    emotion_totals = np.bincount(inverse, minlength=len(labels))
+    order = np.argsort(-emotion_totals, kind="stable")[:top]
+    column = np.full(len(labels), -1)
+    column[order] = np.arange(len(order))
+
+    days = np.array([day for day, _ in dated], dtype="datetime64[D]")
+    first = days.min()
+    n_days = int((days.max() - first).astype(int)) + 1
+    day_index = (days - first).astype(int)
+    entries = np.bincount(day_index, minlength=n_days)
+
+    # One (day, emotion) pair per label of each entry, for a single scatter-add
+    label_days = np.repeat(day_index, [len(set(emotions)) for _, emotions in dated])
+    label_columns = column[inverse]
+    tracked = label_columns >= 0
+    counts = np.zeros((n_days, len(order)), dtype=np.int64)
+    np.add.at(counts, (label_days[tracked], label_columns[tracked]), 1)
+    return EmotionSeries(first + np.arange(n_days), [str(labels[i]) for i in order], counts, entries)
+
+
+def rolling_shares(series: EmotionSeries, window: int = DEFAULT_WINDOW_DAYS) -> np.ndarray:
+    """(days, emotions) share of entries showing each emotion in the `window` days ending on each day.
+
+    NaN where the window is incomplete or holds no entries.
+    """
+    counts = np.vstack([np.zeros((1, len(series.emotions)), dtype=np.int64), np.cumsum(series.counts, axis=0)])
+    entries = np.concatenate([[0], np.cumsum(series.entries)])
+    window_counts = counts[window:] - counts[:-window]
+    window_entries = (entries[window:] - entries[:-window]).astype(float)
+    shares = np.full(series.counts.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares[window - 1:] = np.where(window_entries[:, None] > 0, window_counts / window_entries[:, None], np.nan)
+    return shares
+
+
+def find_shifts(series: EmotionSeries, window: int = DEFAULT_WINDOW_DAYS, min_change: float = DEFAULT_MIN_CHANGE,
+                limit: int = MAX_SHIFTS) -> List[Shift]:
+    """The largest changes between two adjacent `window`-day windows, in date order.
+
+    At most one shift per emotion is reported within any `window` days, so
+    one change is not reported again from overlapping windows.
+    """
+    shares = rolling_shares(series, window)
+    if len(shares) <= window:
+        return []
+    change = shares[window:] - shares[:-window]  # Row t: window ending t + window vs. window ending t
+    magnitude = np.nan_to_num(np.abs(change), nan=0.0)
+    ends, columns = np.nonzero(magnitude >= min_change)
+    picked: List[Tuple[int, int]] = []
+    for k in np.argsort(-magnitude[ends, columns], kind="stable"):
+        end, col = int(ends[k]), int(columns[k])
+        if all(col != c or abs(end - e) >= window for e, c in picked):
+            picked.append((end, col))
+            if len(picked) == limit:
+                break
+    shifts = []
+    for end, col in sorted(picked):
+        last = end + window  # Index of the later window's last day
+        shifts.append(Shift(series.emotions[col], series.days[last - 2 * window + 1].item(),
+                            series.days[last - window + 1].item(), series.days[last].item(),
+                            float(shares[end, col]), float(shares[last, col])))
+    return shifts
+
+
+def periods(series: EmotionSeries, window: int = DEFAULT_WINDOW_DAYS, max_periods: int = MAX_PERIODS) -> List[Period]:
+    """Consecutive periods of at least `window` days with their most frequent emotion."""
+    n_days = len(series.days)
+    length = max(window, -(-n_days // max_periods))
+    starts = np.arange(0, n_days, length)
+    counts = np.add.reduceat(series.counts, starts, axis=0)
+    entries = np.add.reduceat(series.entries, starts)
+    result = []
+    for i, start in enumerate(starts):
+        top = int(np.argmax(counts[i])) if counts.shape[1] else 0
+        has_emotion = entries[i] > 0 and counts.shape[1] and counts[i, top] > 0
+        result.append(Period(series.days[start].item(), series.days[min(start + length, n_days) - 1].item(),
+                             int(entries[i]), series.emotions[top] if has_emotion else None,
+                             float(counts[i, top] / entries[i]) if has_emotion else 0.0))
+    return result
+
+
+def trend_lines(series: EmotionSeries, shifts: List[Shift], overview: List[Period]) -> List[str]:
+    """The computed trends as prompt lines for the LLM to narrate."""
+    lines = [f"Entries from {series.days[0]} to {series.days[-1]}: {int(series.entries.sum())}",
+             "Most frequent emotion per period (share of entries):"]
+    lines += [f"- {p.start} to {p.end}, {p.entries} entries: {p.emotion or 'none'} ({p.share:.0%})" for p in overview]
+    lines.append("Emotion shifts between adjacent windows (share of entries):")
+    lines += [f"- {s.emotion}: {s.before:.0%} in the window from {s.start}, {s.after:.0%} in the window from {s.middle} "
+              f"to {s.end}" for s in shifts] or ["- no shifts"]
+    return lines
+
+
+def shift_table(shifts: List[Shift], window: int = DEFAULT_WINDOW_DAYS, min_change: float = DEFAULT_MIN_CHANGE) -> str:
+    """Markdown table of the shifts for the report."""
+    if not shifts:
+        return f"No emotion changed by {min_change:.0%} of entries or more between {window}-day windows."
+    rows = [f"| Emotion | {window} days from | Share | next {window} days from | Share | Change |",
+            "|---|---|---|---|---|---|"]
+    rows += [f"| {s.emotion} | {s.start} | {s.before:.0%} | {s.middle} | {s.after:.0%} | {s.change:+.0%} |"
+             for s in shifts]
+    return "\n".join(rows)
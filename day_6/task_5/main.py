@@ -1,11 +1,15 @@
 import os
+import sys
 from langchain.tools import Tool
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain.agents import initialize_agent, AgentType
 from langchain_community.vectorstores import Chroma
 from langchain.schema import Document
-from langchain_tavily import TavilySearch
+
+# Shared helpers live in <repo>/common
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.cached_tavily import CachedTavilySearch
 import warnings
 import datetime  # Added for timestamps
 from PyPDF2 import PdfReader  # Added for PDF text extraction
@@ -24,9 +28,9 @@ def get_gemini_llm():
 
 # === 2. Tavily Search Tool (Updated to use langchain_tavily) ===
 def create_tavily_tool() -> Tool:
-    # Instantiate official TavilySearch tool
+    # Instantiate official TavilySearch tool, with repeated queries served from the shared search cache
     # Note: Assumes TAVILY_API_KEY is set in environment
-    tavily = TavilySearch(
+    tavily = CachedTavilySearch(
         max_results=5, 
         topic="general",  
         description="Useful to search up-to-date web information about languages."
@@ -185,6 +189,7 @@ def main():
         chat_history.append(f"User: {user_query}")
         chat_history.append(f"Agent: {agent_output}")
 
+    print(tavily_tool.search_cache.report())
     print("Conversation ended.")
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 from typing import List, Dict, Any, TypedDict
 from datetime import datetime, timezone
@@ -17,8 +18,9 @@ from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmb
 # Vector DB
 from langchain_chroma import Chroma
 
-# Tavily search
-from langchain_tavily import TavilySearch
+# Tavily search, cached on disk and shared with the other agents (<repo>/common)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.cached_tavily import CachedTavilySearch
 
 # ---------------- ENVIRONMENT ----------------
 PRIMARY_KEY = os.environ.get("GOOGLE_API_KEY")
@@ -60,7 +62,7 @@ vectorstore = Chroma(collection_name="historical_agent",
                      persist_directory=CHROMA_DIR)
 
 # Tavily Search
-tavily_search_tool = TavilySearch(
+tavily_search_tool = CachedTavilySearch(
     max_results=5, topic="general",
     include_answer=True, include_raw_content=True,
     search_depth="advanced"
@@ -262,11 +264,13 @@ if __name__ == "__main__":
         try:
             user_input = input("\nYou: ").strip()
             if user_input.lower() in ["exit", "quit"]:
+                print(tavily_search_tool.search_cache.report())
                 print("Exiting chat. Transcript saved.")
                 break
             response = chat(thread_id, user_input)
             print("\nAssistant:", response["answer"])
             print("(Transcript updated:", response["transcript_path"], ")")
         except KeyboardInterrupt:
-            print("\nExiting chat. Transcript saved.")
+            print("\n" + tavily_search_tool.search_cache.report())
+            print("Exiting chat. Transcript saved.")
             break